@@ -9,6 +9,13 @@ class ApiClient {
 
   final http.Client _http;
 
+  // After a write the API returns a signed "<until ms>.<signature>" token in
+  // X-Primary-Until. Sending it back until then keeps this client's reads on
+  // the primary database, so they see the write despite replica lag. Shared
+  // by every ApiClient, since screens create their own.
+  static const _primaryUntilHeader = 'x-primary-until';
+  static String? _primaryUntil;
+
   Uri _uri(String path, [Map<String, String>? query]) {
     final base = AppConfig.apiBaseUrl.endsWith('/')
         ? AppConfig.apiBaseUrl.substring(0, AppConfig.apiBaseUrl.length - 1)
@@ -19,11 +26,13 @@ class ApiClient {
   Future<Map<String, dynamic>> getJson(
     String path, {
     required String? bearerToken,
+    Map<String, String>? query,
   }) async {
     final resp = await _http.get(
-      _uri(path),
+      _uri(path, query),
       headers: _headers(bearerToken),
     );
+    _rememberPrimaryUntil(resp);
     return _handleJson(resp);
   }
 
@@ -37,16 +46,35 @@ class ApiClient {
       headers: _headers(bearerToken),
       body: body == null ? null : jsonEncode(body),
     );
+    _rememberPrimaryUntil(resp);
     return _handleJson(resp);
   }
 
   Map<String, String> _headers(String? bearerToken) {
+    final primaryUntil = _livePrimaryUntil();
     return {
       'content-type': 'application/json',
       if (bearerToken != null) 'authorization': 'Bearer $bearerToken',
+      if (primaryUntil != null) _primaryUntilHeader: primaryUntil,
     };
   }
 
+  static void _rememberPrimaryUntil(http.Response resp) {
+    final token = resp.headers[_primaryUntilHeader];
+    if (token != null && token.isNotEmpty) _primaryUntil = token;
+  }
+
+  static String? _livePrimaryUntil() {
+    final token = _primaryUntil;
+    if (token == null) return null;
+    final untilMs = int.tryParse(token.split('.').first);
+    if (untilMs == null || untilMs <= DateTime.now().millisecondsSinceEpoch) {
+      _primaryUntil = null;
+      return null;
+    }
+    return token;
+  }
+
   Map<String, dynamic> _handleJson(http.Response resp) {
     final decoded = resp.body.isEmpty ? null : jsonDecode(resp.body);
     if (resp.statusCode >= 200 && resp.statusCode < 300) {
@@ -7,16 +7,29 @@ class BuyerApi {
 
   final ApiClient _client;
 
-  Future<List<Product>> listProducts() async {
-    final json = await _client.getJson('/products', bearerToken: null);
-    final data = json['data'];
-    if (data is List) {
-      return data
-          .whereType<Map<String, dynamic>>()
-          .map(Product.fromJson)
-          .toList(growable: false);
-    }
-    return const [];
+  Future<ProductPage> listProducts({String? cursor, int limit = 20}) async {
+    final json = await _client.getJson(
+      '/products',
+      bearerToken: null,
+      query: {
+        'limit': '$limit',
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
+    return ProductPage.fromJson(json);
+  }
+
+  Future<ProductPage> searchProducts(String query, {String? cursor, int limit = 20}) async {
+    final json = await _client.getJson(
+      '/products/search',
+      bearerToken: null,
+      query: {
+        'q': query,
+        'limit': '$limit',
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
+    return ProductPage.fromJson(json);
   }
 
   Future<Order> createOrder({
@@ -38,16 +51,26 @@ class BuyerApi {
     return Order.fromJson(data);
   }
 
-  Future<List<Order>> listOrders({required String bearerToken}) async {
-    final json = await _client.getJson('/orders', bearerToken: bearerToken);
-    final data = json['data'];
-    if (data is List) {
-      return data
-          .whereType<Map<String, dynamic>>()
-          .map(Order.fromJson)
-          .toList(growable: false);
-    }
-    return const [];
+  Future<OrderSummaryPage> listOrders({
+    required String bearerToken,
+    String? cursor,
+    int limit = 20,
+  }) async {
+    final json = await _client.getJson(
+      '/orders',
+      bearerToken: bearerToken,
+      query: {
+        'view': 'summary',
+        'limit': '$limit',
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
+    return OrderSummaryPage.fromJson(json);
+  }
+
+  Future<Order> getOrder({required String bearerToken, required int orderId}) async {
+    final json = await _client.getJson('/orders/$orderId', bearerToken: bearerToken);
+    return Order.fromJson(json);
   }
 
   Future<CheckoutInfo> checkoutOrder({
@@ -87,6 +87,34 @@ class SellerApi {
     );
   }
 
+  /// Presigns several uploads in one request (up to 20 files).
+  Future<List<PresignResult>> presignProductImageUploads({
+    required String bearerToken,
+    required int productId,
+    required List<({String filename, String contentType})> files,
+  }) async {
+    final json = await _client.postJson(
+      '/seller/products/$productId/images/presign-batch',
+      bearerToken: bearerToken,
+      body: {
+        'files': [
+          for (final f in files) {'filename': f.filename, 'content_type': f.contentType},
+        ],
+      },
+    );
+    final data = (json['data'] as Map<String, dynamic>? ?? json);
+    return (data['uploads'] as List<dynamic>)
+        .whereType<Map<String, dynamic>>()
+        .map(
+          (u) => PresignResult(
+            s3Key: u['s3_key'] as String,
+            uploadUrl: u['upload_url'] as String,
+            publicUrl: u['public_url'] as String?,
+          ),
+        )
+        .toList();
+  }
+
   Future<Product> attachProductImages({
     required String bearerToken,
     required int productId,
@@ -15,11 +15,38 @@ class BuyerCatalogScreen extends ConsumerStatefulWidget {
 
 class _BuyerCatalogScreenState extends ConsumerState<BuyerCatalogScreen> {
   late Future<List<Product>> _future;
+  final List<Product> _items = [];
+  String? _nextCursor;
+  bool _loadingMore = false;
 
   @override
   void initState() {
     super.initState();
-    _future = BuyerApi(ApiClient()).listProducts();
+    _future = _loadFirstPage();
+  }
+
+  Future<List<Product>> _loadFirstPage() async {
+    final page = await BuyerApi(ApiClient()).listProducts();
+    _items
+      ..clear()
+      ..addAll(page.items);
+    _nextCursor = page.nextCursor;
+    return _items;
+  }
+
+  Future<void> _loadMore() async {
+    final cursor = _nextCursor;
+    if (cursor == null || _loadingMore) return;
+    setState(() => _loadingMore = true);
+    try {
+      final page = await BuyerApi(ApiClient()).listProducts(cursor: cursor);
+      setState(() {
+        _items.addAll(page.items);
+        _nextCursor = page.nextCursor;
+      });
+    } finally {
+      if (mounted) setState(() => _loadingMore = false);
+    }
   }
 
   @override
@@ -35,17 +62,26 @@ class _BuyerCatalogScreenState extends ConsumerState<BuyerCatalogScreen> {
 
         return RefreshIndicator(
           onRefresh: () async {
-            setState(() => _future = BuyerApi(ApiClient()).listProducts());
+            setState(() => _future = _loadFirstPage());
             await _future;
           },
           child: ListView.separated(
             padding: const EdgeInsets.all(16),
-            itemCount: items.length,
+            itemCount: items.length + (_nextCursor != null ? 1 : 0),
             separatorBuilder: (_, __) => const SizedBox(height: 12),
             itemBuilder: (context, i) {
+              if (i == items.length) {
+                return Center(
+                  child: _loadingMore
+                      ? const CircularProgressIndicator()
+                      : TextButton(onPressed: _loadMore, child: const Text('Load more')),
+                );
+              }
               final p = items[i];
               final price = (p.priceCents / 100).toStringAsFixed(2);
-              final imageUrl = p.images.isNotEmpty ? p.images.first.url : null;
+              final imageUrl = p.images.isNotEmpty
+                  ? p.images.first.urlForWidth(56 * MediaQuery.devicePixelRatioOf(context))
+                  : null;
               return Card(
                 child: ListTile(
                   leading: imageUrl == null
@@ -15,23 +15,48 @@ class BuyerOrdersScreen extends ConsumerStatefulWidget {
 }
 
 class _BuyerOrdersScreenState extends ConsumerState<BuyerOrdersScreen> {
-  late Future<List<Order>> _future;
+  late Future<List<OrderSummary>> _future;
+  final List<OrderSummary> _items = [];
+  String? _nextCursor;
+  bool _loadingMore = false;
 
   @override
   void initState() {
     super.initState();
-    _future = _load();
+    _future = _loadFirstPage();
   }
 
-  Future<List<Order>> _load() async {
+  Future<List<OrderSummary>> _loadFirstPage() async {
     final token = await ref.read(authControllerProvider).getIdToken();
     if (token == null) return [];
-    return BuyerApi(ApiClient()).listOrders(bearerToken: token);
+    final page = await BuyerApi(ApiClient()).listOrders(bearerToken: token);
+    _items
+      ..clear()
+      ..addAll(page.items);
+    _nextCursor = page.nextCursor;
+    return _items;
+  }
+
+  Future<void> _loadMore() async {
+    final cursor = _nextCursor;
+    if (cursor == null || _loadingMore) return;
+    setState(() => _loadingMore = true);
+    try {
+      final token = await ref.read(authControllerProvider).getIdToken();
+      if (token == null) return;
+      final page = await BuyerApi(ApiClient()).listOrders(bearerToken: token, cursor: cursor);
+      setState(() {
+        _items.addAll(page.items);
+        _nextCursor = page.nextCursor;
+      });
+    } finally {
+      if (mounted) setState(() => _loadingMore = false);
+    }
   }
 
   @override
   Widget build(BuildContext context) {
-    return FutureBuilder<List<Order>>(
+    return FutureBuilder<List<OrderSummary>>(
       future: _future,
       builder: (context, snapshot) {
         if (!snapshot.hasData) {
@@ -42,21 +67,28 @@ class _BuyerOrdersScreenState extends ConsumerState<BuyerOrdersScreen> {
 
         return RefreshIndicator(
           onRefresh: () async {
-            setState(() => _future = _load());
+            setState(() => _future = _loadFirstPage());
             await _future;
           },
           child: ListView.separated(
             padding: const EdgeInsets.all(16),
-            itemCount: orders.length,
+            itemCount: orders.length + (_nextCursor != null ? 1 : 0),
             separatorBuilder: (_, __) => const SizedBox(height: 12),
             itemBuilder: (context, i) {
+              if (i == orders.length) {
+                return Center(
+                  child: _loadingMore
+                      ? const CircularProgressIndicator()
+                      : TextButton(onPressed: _loadMore, child: const Text('Load more')),
+                );
+              }
               final o = orders[i];
               final total = (o.totalCents / 100).toStringAsFixed(2);
               final payable = o.status == 'PENDING_PAYMENT';
               return Card(
                 child: ListTile(
                   title: Text('Order #${o.id}'),
-                  subtitle: Text('${o.status} • $total ${o.currency}'),
+                  subtitle: Text('${o.status} • ${o.itemCount} items • $total ${o.currency}'),
                   trailing: payable
                       ? TextButton(
                           onPressed: () async {
@@ -60,3 +60,47 @@ class Order {
   }
 }
 
+
+class OrderSummary {
+  OrderSummary({
+    required this.id,
+    required this.status,
+    required this.currency,
+    required this.totalCents,
+    required this.itemCount,
+  });
+
+  final int id;
+  final String status;
+  final String currency;
+  final int totalCents;
+  final int itemCount;
+
+  static OrderSummary fromJson(Map<String, dynamic> json) {
+    return OrderSummary(
+      id: json['id'] as int,
+      status: json['status'] as String,
+      currency: json['currency'] as String,
+      totalCents: json['total_cents'] as int,
+      itemCount: json['item_count'] as int,
+    );
+  }
+}
+
+class OrderSummaryPage {
+  OrderSummaryPage({required this.items, this.nextCursor});
+
+  final List<OrderSummary> items;
+  final String? nextCursor;
+
+  static OrderSummaryPage fromJson(Map<String, dynamic> json) {
+    final itemsJson = (json['items'] as List<dynamic>? ?? const []);
+    return OrderSummaryPage(
+      items: itemsJson
+          .whereType<Map<String, dynamic>>()
+          .map(OrderSummary.fromJson)
+          .toList(growable: false),
+      nextCursor: json['next_cursor'] as String?,
+    );
+  }
+}
@@ -1,9 +1,26 @@
+class ImageVariant {
+  ImageVariant({required this.url, required this.width, required this.format});
+
+  final String url;
+  final int width;
+  final String format;
+
+  static ImageVariant fromJson(Map<String, dynamic> json) {
+    return ImageVariant(
+      url: json['url'] as String,
+      width: json['width'] as int,
+      format: json['format'] as String,
+    );
+  }
+}
+
 class ProductImage {
   ProductImage({
     required this.id,
     required this.s3Key,
     required this.sortOrder,
     this.url,
+    this.variants = const [],
   });
 
   final int id;
@@ -11,12 +28,32 @@ class ProductImage {
   final int sortOrder;
   final String? url;
 
+  /// Resized copies, narrowest first.
+  final List<ImageVariant> variants;
+
+  /// Smallest variant at least [width] physical pixels wide (Flutter decodes
+  /// WebP everywhere, AVIF only on some platforms). Falls back to the widest
+  /// variant, then to the original.
+  String? urlForWidth(double width, {String format = 'webp'}) {
+    final candidates = variants.where((v) => v.format == format).toList();
+    if (candidates.isEmpty) return url;
+    for (final v in candidates) {
+      if (v.width >= width) return v.url;
+    }
+    return candidates.last.url;
+  }
+
   static ProductImage fromJson(Map<String, dynamic> json) {
+    final variantsJson = (json['variants'] as List<dynamic>? ?? const []);
     return ProductImage(
       id: json['id'] as int,
       s3Key: json['s3_key'] as String,
       sortOrder: json['sort_order'] as int,
       url: json['url'] as String?,
+      variants: variantsJson
+          .whereType<Map<String, dynamic>>()
+          .map(ImageVariant.fromJson)
+          .toList(),
     );
   }
 }
@@ -25,22 +62,26 @@ class Product {
   Product({
     required this.id,
     required this.sellerId,
+    this.sku,
     required this.title,
     required this.description,
     required this.priceCents,
     required this.currency,
     required this.stockQty,
+    required this.availableQty,
     required this.isActive,
     required this.images,
   });
 
   final int id;
   final int sellerId;
+  final String? sku;
   final String title;
   final String? description;
   final int priceCents;
   final String currency;
   final int stockQty;
+  final int availableQty;
   final bool isActive;
   final List<ProductImage> images;
 
@@ -49,11 +90,13 @@ class Product {
     return Product(
       id: json['id'] as int,
       sellerId: json['seller_id'] as int,
+      sku: json['sku'] as String?,
       title: json['title'] as String,
       description: json['description'] as String?,
       priceCents: json['price_cents'] as int,
       currency: json['currency'] as String,
       stockQty: json['stock_qty'] as int,
+      availableQty: (json['available_qty'] ?? json['stock_qty']) as int,
       isActive: json['is_active'] as bool,
       images: imagesJson
           .whereType<Map<String, dynamic>>()
@@ -63,3 +106,21 @@ class Product {
   }
 }
 
+
+class ProductPage {
+  ProductPage({required this.items, this.nextCursor});
+
+  final List<Product> items;
+  final String? nextCursor;
+
+  static ProductPage fromJson(Map<String, dynamic> json) {
+    final itemsJson = (json['items'] as List<dynamic>? ?? const []);
+    return ProductPage(
+      items: itemsJson
+          .whereType<Map<String, dynamic>>()
+          .map(Product.fromJson)
+          .toList(growable: false),
+      nextCursor: json['next_cursor'] as String?,
+    );
+  }
+}
@@ -0,0 +1,48 @@
+"""product keyset pagination indexes
+
+Revision ID: 0005_product_keyset_indexes
+Revises: 0004_stripe_events
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_product_keyset_indexes"
+down_revision = "0004_stripe_events"
+branch_labels = None
+depends_on = None
+
+_INDEXES = [
+    ("ix_products_active_created_id", ["created_at", "id"]),
+    ("ix_products_active_price_id", ["price_cents", "id"]),
+    ("ix_products_active_seller_created_id", ["seller_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so a large catalog is not write-locked during the deploy.
+    with op.get_context().autocommit_block():
+        for name, columns in _INDEXES:
+            op.create_index(
+                name,
+                "products",
+                columns,
+                unique=False,
+                postgresql_where=sa.text("is_active"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name="products",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
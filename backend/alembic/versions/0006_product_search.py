@@ -0,0 +1,82 @@
+"""product full-text search
+
+Revision ID: 0006_product_search
+Revises: 0005_product_keyset_indexes
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0006_product_search"
+down_revision = "0005_product_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+
+    bind = op.get_bind()
+    has_trgm = bind.scalar(
+        sa.text("select exists(select 1 from pg_available_extensions where name = 'pg_trgm')")
+    )
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_active_search_vector",
+            "products",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        if has_trgm:
+            op.create_index(
+                "ix_products_active_title_trgm",
+                "products",
+                ["title"],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={"title": "gin_trgm_ops"},
+                postgresql_where=sa.text("is_active"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_active_title_trgm",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_products_active_search_vector",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("products", "search_vector")
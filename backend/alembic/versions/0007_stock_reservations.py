@@ -0,0 +1,80 @@
+"""stock reservations
+
+Revision ID: 0007_stock_reservations
+Revises: 0006_product_search
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_stock_reservations"
+down_revision = "0006_product_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="HELD"),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_stock_reservations_order_id", "stock_reservations", ["order_id"], unique=False
+    )
+    op.create_index(
+        "ix_stock_reservations_held_product",
+        "stock_reservations",
+        ["product_id", "expires_at"],
+        unique=False,
+        postgresql_include=["quantity"],
+        postgresql_where=sa.text("status = 'HELD'"),
+    )
+    op.create_index(
+        "ix_stock_reservations_held_expires_at",
+        "stock_reservations",
+        ["expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'HELD'"),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_pending_created_at",
+            "orders",
+            ["created_at"],
+            unique=False,
+            postgresql_where=sa.text("status = 'PENDING_PAYMENT'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_orders_pending_created_at",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_index("ix_stock_reservations_held_expires_at", table_name="stock_reservations")
+    op.drop_index("ix_stock_reservations_held_product", table_name="stock_reservations")
+    op.drop_index("ix_stock_reservations_order_id", table_name="stock_reservations")
+    op.drop_table("stock_reservations")
@@ -0,0 +1,68 @@
+"""stripe event inbox
+
+Revision ID: 0008_stripe_event_inbox
+Revises: 0007_stock_reservations
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_stripe_event_inbox"
+down_revision = "0007_stock_reservations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("stripe_events", sa.Column("event_type", sa.String(length=255), nullable=True))
+    op.add_column("stripe_events", sa.Column("payload", postgresql.JSONB(), nullable=True))
+    # Events recorded before the inbox existed were applied synchronously.
+    op.add_column(
+        "stripe_events",
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="DONE"),
+    )
+    op.alter_column("stripe_events", "status", server_default="PENDING")
+    op.add_column("stripe_events", sa.Column("result", sa.String(length=32), nullable=True))
+    op.add_column(
+        "stripe_events",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "stripe_events",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column("stripe_events", sa.Column("last_error", sa.Text(), nullable=True))
+    op.add_column(
+        "stripe_events", sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        "ix_stripe_events_pending_next_attempt",
+        "stripe_events",
+        ["next_attempt_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stripe_events_pending_next_attempt", table_name="stripe_events")
+    for column in (
+        "processed_at",
+        "last_error",
+        "next_attempt_at",
+        "attempts",
+        "result",
+        "status",
+        "payload",
+        "event_type",
+    ):
+        op.drop_column("stripe_events", column)
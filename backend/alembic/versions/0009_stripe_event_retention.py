@@ -0,0 +1,39 @@
+"""stripe event retention index
+
+Revision ID: 0009_stripe_event_retention
+Revises: 0008_stripe_event_inbox
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_stripe_event_retention"
+down_revision = "0008_stripe_event_inbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_stripe_events_done_created_at",
+            "stripe_events",
+            ["created_at"],
+            unique=False,
+            postgresql_where=sa.text("status = 'DONE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_stripe_events_done_created_at",
+            table_name="stripe_events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
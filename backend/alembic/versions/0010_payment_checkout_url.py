@@ -0,0 +1,28 @@
+"""payment checkout url
+
+Revision ID: 0010_payment_checkout_url
+Revises: 0009_stripe_event_retention
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_payment_checkout_url"
+down_revision = "0009_stripe_event_retention"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("payments", sa.Column("checkout_url", sa.Text(), nullable=True))
+    op.add_column(
+        "payments", sa.Column("checkout_expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("payments", "checkout_expires_at")
+    op.drop_column("payments", "checkout_url")
@@ -0,0 +1,43 @@
+"""product image variants
+
+Revision ID: 0011_product_image_variants
+Revises: 0010_payment_checkout_url
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0011_product_image_variants"
+down_revision = "0010_payment_checkout_url"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("product_images", sa.Column("variants", postgresql.JSONB(), nullable=True))
+    # Lets the backfill find images still waiting for derivatives.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_product_images_pending_variants",
+            "product_images",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("variants IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_product_images_pending_variants",
+            table_name="product_images",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("product_images", "variants")
@@ -0,0 +1,53 @@
+"""orders buyer history index
+
+Revision ID: 0012_orders_buyer_history_index
+Revises: 0011_product_image_variants
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0012_orders_buyer_history_index"
+down_revision = "0011_product_image_variants"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (buyer_id, id) serves keyset pages of a buyer's orders and every lookup
+    # the single-column buyer_id index did, so that one is dropped.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_buyer_id_id",
+            "orders",
+            ["buyer_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_orders_buyer_id",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_buyer_id",
+            "orders",
+            ["buyer_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_orders_buyer_id_id",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
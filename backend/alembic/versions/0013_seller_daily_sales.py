@@ -0,0 +1,65 @@
+"""seller daily sales rollup
+
+Revision ID: 0013_seller_daily_sales
+Revises: 0012_orders_buyer_history_index
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0013_seller_daily_sales"
+down_revision = "0012_orders_buyer_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "seller_daily_sales",
+        sa.Column("seller_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("units", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue_cents", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["seller_id"], ["seller_profiles.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("seller_id", "day", "product_id", "currency"),
+    )
+    op.add_column(
+        "orders", sa.Column("sales_rolled_up_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    # Every existing paid order matches until the backfill has run.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_paid_not_rolled_up",
+            "orders",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("status = 'PAID' AND sales_rolled_up_at IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_orders_paid_not_rolled_up",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("orders", "sales_rolled_up_at")
+    op.drop_table("seller_daily_sales")
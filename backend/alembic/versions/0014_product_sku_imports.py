@@ -0,0 +1,73 @@
+"""product sku and bulk imports
+
+Revision ID: 0014_product_sku_imports
+Revises: 0013_seller_daily_sales
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0014_product_sku_imports"
+down_revision = "0013_seller_daily_sales"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("sku", sa.String(length=100), nullable=True))
+    op.create_table(
+        "product_imports",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("seller_id", sa.Integer(), nullable=False),
+        sa.Column("format", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="RUNNING"),
+        sa.Column("rows_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_updated", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "errors",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'[]'::jsonb"),
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["seller_id"], ["seller_profiles.id"]),
+    )
+    op.create_index(
+        "ix_product_imports_seller_id", "product_imports", ["seller_id"], unique=False
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_products_seller_sku",
+            "products",
+            ["seller_id", "sku"],
+            unique=True,
+            postgresql_where=sa.text("sku IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_products_seller_sku",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_index("ix_product_imports_seller_id", table_name="product_imports")
+    op.drop_table("product_imports")
+    op.drop_column("products", "sku")
@@ -0,0 +1,40 @@
+"""
+Build seller_daily_sales from orders paid before the rollup existed.
+
+    python -m app.cli.backfill_sales_rollup
+    python -m app.cli.backfill_sales_rollup --batch-size 500 --pause 0.1
+
+Counts paid orders not yet in the rollup, one committed batch at a time, and
+marks them so a rerun (or an interrupted run) never counts an order twice.
+Safe to run while the API and workers are up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.core.db import SessionLocal
+from app.services.sales_rollup import backfill_batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    total = 0
+    with SessionLocal() as db:
+        while True:
+            counted = backfill_batch(db, batch_size=args.batch_size)
+            total += counted
+            if counted < args.batch_size:
+                break
+            if args.pause:
+                time.sleep(args.pause)
+    print(f"orders_rolled_up={total}")
+
+
+if __name__ == "__main__":
+    main()
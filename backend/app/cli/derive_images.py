@@ -0,0 +1,56 @@
+"""
+Render missing image variants (thumbnails, WebP/AVIF).
+
+    python -m app.cli.derive_images
+    python -m app.cli.derive_images --batch-size 20 --limit 1000
+
+Picks up images attached before the pipeline existed and any whose background
+render was lost (process restart, S3 outage). Images whose original could not
+be decoded are recorded with no variants and not retried.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import select
+
+from app.core.db import SessionLocal
+from app.models.product_image import ProductImage
+from app.services.images import derive_images, shutdown_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many images")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    last_id = 0
+    seen = done = 0
+    try:
+        while args.limit is None or seen < args.limit:
+            size = args.batch_size
+            if args.limit is not None:
+                size = min(size, args.limit - seen)
+            with SessionLocal() as db:
+                ids = db.scalars(
+                    select(ProductImage.id)
+                    .where(ProductImage.variants.is_(None), ProductImage.id > last_id)
+                    .order_by(ProductImage.id)
+                    .limit(size)
+                ).all()
+            if not ids:
+                break
+            last_id = ids[-1]
+            seen += len(ids)
+            done += derive_images(ids)
+            print(f"processed={seen} derived={done}")
+    finally:
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Write the active catalog feed to a file (or stdout) for shopping/ad partners.
+
+    python -m app.cli.export_feed --output catalog.ndjson
+    python -m app.cli.export_feed --format csv.gz --output catalog.csv.gz
+
+Same output as GET /products/feed.ndjson and /products/feed.csv.gz: rows are
+read through a server-side cursor and written chunk by chunk, so memory stays
+flat whatever the catalog size. Prints rows per second when done.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app.services.feed import feed_metrics, stream_feed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--format", choices=["ndjson", "csv.gz"], default="ndjson")
+    parser.add_argument("--output", default="-", help="file path, or - for stdout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")  # noqa: SIM115
+    try:
+        for chunk in stream_feed(args.format):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    last = feed_metrics.stats()["last"]
+    print(
+        f"rows={last['rows']} seconds={time.perf_counter() - start:.2f} "
+        f"rows_per_second={last['rows_per_second']}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
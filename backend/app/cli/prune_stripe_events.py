@@ -0,0 +1,47 @@
+"""
+Delete processed Stripe events past the retention window.
+
+    python -m app.cli.prune_stripe_events
+    python -m app.cli.prune_stripe_events --days 14 --batch-size 5000 --pause 0.1
+
+Only DONE events are removed: PENDING and DEAD ones stay until they are
+handled. Keep the window longer than Stripe's retry period (3 days), or a late
+redelivery of a pruned event would be applied again. Safe to run from cron
+while the API and workers are up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.stripe_inbox import prune_events, table_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=float, default=settings.stripe_event_retention_days)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+    if args.days < 3:
+        parser.error("--days must cover Stripe's 3 day retry window")
+
+    older_than = timedelta(days=args.days)
+    total = 0
+    with SessionLocal() as db:
+        while True:
+            deleted = prune_events(db, older_than=older_than, batch_size=args.batch_size)
+            total += deleted
+            if deleted < args.batch_size:
+                break
+            if args.pause:
+                time.sleep(args.pause)
+        print(f"deleted={total} {table_stats(db)}")
+
+
+if __name__ == "__main__":
+    main()
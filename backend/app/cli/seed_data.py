@@ -0,0 +1,475 @@
+"""
+Fill the database with deterministic, production-sized marketplace data.
+
+    python -m app.cli.seed_data --products 1000000 --images-per-product 5 --orders 10000000
+    python -m app.cli.seed_data --seed 7 --orders 100000 --workers 4 --skip-fk-checks
+
+Generates users, seller profiles, addresses, products, product images,
+orders, order items and payments, and streams them in with COPY. Each table is
+loaded in chunks of `--chunk-rows` by `--workers` processes, with tables in
+foreign key order. A row's content depends only on `--seed`, `--end` and the
+ids it is given, so the same arguments on an empty database give the same
+data whatever the worker count. Ids continue after the current maximum, so
+seeding a non-empty database adds to it.
+
+Sellers' catalog sizes follow a power law, and a few hot products and repeat
+buyers take most orders. Paid orders are added to seller_daily_sales
+afterwards (unless --no-rollup). --skip-fk-checks (superuser only) skips FK
+triggers during COPY, which is safe because every reference is generated
+in range.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import time
+from collections.abc import Callable, Iterator
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import psycopg
+from sqlalchemy import func, make_url, select, text
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.address import Address
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.product_image import ProductImage
+from app.models.seller_profile import SellerProfile
+from app.models.user import User
+from app.services.images import variant_key
+from app.services.sales_rollup import roll_up_orders
+
+TABLES = [User, SellerProfile, Address, Product, ProductImage, Order, OrderItem, Payment]
+
+ADJECTIVES = [
+    "red", "blue", "vintage", "compact", "wireless", "organic", "leather", "wooden",
+    "modern", "classic", "handmade", "portable", "waterproof", "minimal", "oversized", "smart",
+]  # fmt: skip
+NOUNS = [
+    "lamp", "jacket", "speaker", "teapot", "backpack", "chair", "watch", "notebook",
+    "sneakers", "blender", "guitar", "scarf", "tent", "mug", "headphones", "desk",
+]  # fmt: skip
+CITIES = ["Springfield", "Riverton", "Fairview", "Lakewood", "Georgetown", "Salem", "Ashland"]
+STREETS = ["Main St", "Oak Ave", "Maple Dr", "Cedar Ln", "Park Rd", "Hill St", "Lake Blvd"]
+
+# Orders are PAID or EXPIRED (abandoned checkouts); the last day also has
+# some still PENDING_PAYMENT.
+PAID_SHARE = 0.85
+PENDING_WINDOW = timedelta(days=1)
+# Skew exponents: a uniform u in [0, 1) raised to these lands near 0 more
+# often, i.e. on the few hottest products and most frequent buyers.
+HOT_PRODUCT_SKEW = 3.0
+SELLER_PRODUCT_SKEW = 2.0
+REPEAT_BUYER_SKEW = 3.0
+SELLER_SIZE_EXPONENT = 1.1
+
+NULL = "\\N"
+
+
+class Plan:
+    """
+    Row counts, first ids and the seller catalog layout: everything a worker
+    needs to generate any chunk of any table without reading the database.
+    Seller i owns products [product_starts[i], product_starts[i + 1]).
+    """
+
+    def __init__(self, args: argparse.Namespace, first_ids: dict[str, int]) -> None:
+        self.seed = args.seed
+        self.users = args.users
+        self.sellers = args.sellers
+        self.buyers = args.users - args.sellers
+        self.products = args.products
+        self.images_per_product = args.images_per_product
+        self.orders = args.orders
+        self.max_items = args.max_items
+        self.variants = args.variants
+        self.first = first_ids
+        self.end = datetime.combine(args.end, datetime.min.time(), tzinfo=timezone.utc)
+        self.span = timedelta(days=args.days)
+        self.widths = sorted(settings.image_variant_widths)
+        self.formats = ["webp", "avif"] if settings.image_avif else ["webp"]
+
+        weights = [1 / (i + 1) ** SELLER_SIZE_EXPONENT for i in range(self.sellers)]
+        scale = (self.products - self.sellers) / sum(weights)
+        sizes = [1 + int(w * scale) for w in weights]
+        sizes[0] += self.products - sum(sizes)
+        self.product_starts = [0, *itertools.accumulate(sizes)]
+
+    def seller_of(self, product: int) -> int:
+        return bisect.bisect_right(self.product_starts, product) - 1
+
+    def timestamp(self, fraction: float) -> str:
+        """A point in the seeded period; ids created later get later timestamps."""
+        return (self.end - self.span + self.span * fraction).isoformat(sep=" ")
+
+
+def _scatter(i: int, n: int) -> int:
+    """A fixed permutation of range(n), so hot items are spread across the id space."""
+    step = 1_000_003
+    while math.gcd(step, n) != 1:
+        step += 2
+    return (i * step) % n
+
+
+def _product_hash(seed: int, product: int) -> int:
+    return ((product + 1) * 2654435761 + seed * 40503) % 2**32
+
+
+def product_title(seed: int, product: int) -> str:
+    h = _product_hash(seed, product)
+    return f"{ADJECTIVES[h % len(ADJECTIVES)]} {NOUNS[(h >> 4) % len(NOUNS)]} {product}"
+
+
+def product_price(seed: int, product: int) -> int:
+    # Roughly log-uniform between $1 and $1000.
+    h = _product_hash(seed, product)
+    return int(100 * 10 ** (3 * ((h >> 8) % 10_000) / 10_000))
+
+
+def _row(*values: Any) -> str:
+    # Generated values never contain tabs, newlines or backslashes.
+    return "\t".join(NULL if v is None else str(v) for v in values) + "\n"
+
+
+def _users(plan: Plan, rng: random.Random, start: int, stop: int) -> Iterator[str]:
+    first = plan.first["users"]
+    for i in range(start, stop):
+        uid = f"seed{plan.seed}-{first + i}"
+        created = plan.timestamp(i / plan.users * 0.5)
+        yield _row(first + i, uid, f"{uid}@seed.invalid", f"User {first + i}", created, created)
+
+
+def _seller_profiles(plan: Plan, rng: random.Random, start: int, stop: int) -> Iterator[str]:
+    # Sellers are the first `sellers` users.
+    for i in range(start, stop):
+        created = plan.timestamp(i / plan.users * 0.5)
+        yield _row(
+            plan.first["seller_profiles"] + i,
+            plan.first["users"] + i,
+            f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} Co {i}",
+            "ACTIVE",
+            created,
+            created,
+        )
+
+
+def _addresses(plan: Plan, rng: random.Random, start: int, stop: int) -> Iterator[str]:
+    # One per buyer; buyer k is user `sellers + k`.
+    for k in range(start, stop):
+        yield _row(
+            plan.first["addresses"] + k,
+            plan.first["users"] + plan.sellers + k,
+            f"Buyer {k}",
+            f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            None,
+            rng.choice(CITIES),
+            None,
+            f"{rng.randint(10000, 99999)}",
+            "US",
+            None,
+            plan.timestamp((plan.sellers + k) / plan.users * 0.5),
+        )
+
+
+def _products(plan: Plan, rng: random.Random, start: int, stop: int) -> Iterator[str]:
+    for p in range(start, stop):
+        product_id = plan.first["products"] + p
+        created = plan.timestamp(0.5 * p / plan.products)
+        yield _row(
+            product_id,
+            plan.first["seller_profiles"] + plan.seller_of(p),
+            f"SKU-{product_id}",
+            product_title(plan.seed, p),
+            f"Seeded product {p}. {rng.choice(ADJECTIVES)} and {rng.choice(ADJECTIVES)}.",
+            product_price(plan.seed, p),
+            "USD",
+            0 if rng.random() < 0.1 else rng.randint(1, 500),
+            "f" if rng.random() < 0.03 else "t",
+            created,
+            created,
+        )
+
+
+def _product_images(plan: Plan, rng: random.Random, start: int, stop: int) -> Iterator[str]:
+    for i in range(start, stop):
+        p, sort_order = divmod(i, plan.images_per_product)
+        product_id = plan.first["products"] + p
+        key = f"products/{product_id}/{rng.getrandbits(64):016x}.jpg"
+        variants = (
+            json.dumps(
+                [
+                    {"key": variant_key(key, w, fmt), "width": w, "format": fmt}
+                    for w in plan.widths
+                    for fmt in plan.formats
+                ],
+                separators=(",", ":"),
+            )
+            if plan.variants
+            else None
+        )
+        yield _row(
+            plan.first["product_images"] + i,
+            product_id,
+            key,
+            sort_order,
+            variants,
+            plan.timestamp(0.5 * p / plan.products),
+        )
+
+
+def _orders(plan: Plan, rng: random.Random, start: int, stop: int) -> tuple[str, str, str]:
+    """Orders with their items and payments, which are generated together."""
+    orders, items, payments = [], [], []
+    pending_after = 1 - PENDING_WINDOW / plan.span
+    for o in range(start, stop):
+        order_id = plan.first["orders"] + o
+        fraction = 0.5 + 0.5 * (o + rng.random()) / plan.orders
+        created = plan.timestamp(fraction)
+
+        buyer = _scatter(int(plan.buyers * rng.random() ** REPEAT_BUYER_SKEW), plan.buyers)
+        hot = _scatter(int(plan.products * rng.random() ** HOT_PRODUCT_SKEW), plan.products)
+        seller = plan.seller_of(hot)
+        first, last = plan.product_starts[seller], plan.product_starts[seller + 1]
+        lines = {hot: rng.randint(1, 3)}
+        for _ in range(rng.randint(1, plan.max_items) - 1):
+            n = last - first
+            p = first + _scatter(int(n * rng.random() ** SELLER_PRODUCT_SKEW), n)
+            lines.setdefault(p, rng.randint(1, 2))
+
+        subtotal = 0
+        for j, (p, quantity) in enumerate(lines.items()):
+            price = product_price(plan.seed, p)
+            subtotal += price * quantity
+            items.append(
+                _row(
+                    # Item ids leave room for max_items per order: gaps, but no lookups.
+                    plan.first["order_items"] + o * plan.max_items + j,
+                    order_id,
+                    plan.first["products"] + p,
+                    product_title(plan.seed, p),
+                    price,
+                    quantity,
+                    price * quantity,
+                )
+            )
+
+        if fraction > pending_after and rng.random() < 0.5:
+            status = "PENDING_PAYMENT"
+        else:
+            status = "PAID" if rng.random() < PAID_SHARE else "EXPIRED"
+        orders.append(
+            _row(
+                order_id,
+                plan.first["users"] + plan.sellers + buyer,
+                plan.first["seller_profiles"] + seller,
+                plan.first["addresses"] + buyer,
+                status,
+                "USD",
+                subtotal,
+                subtotal,
+                created,
+                created,
+            )
+        )
+        if status == "PAID":
+            payments.append(
+                _row(
+                    plan.first["payments"] + o,
+                    order_id,
+                    f"cs_seed_{order_id}",
+                    f"pi_seed_{order_id}",
+                    "PAID",
+                    created,
+                )
+            )
+    return "".join(orders), "".join(items), "".join(payments)
+
+
+COLUMNS: dict[str, list[str]] = {
+    "users": ["id", "firebase_uid", "email", "display_name", "created_at", "updated_at"],
+    "seller_profiles": ["id", "user_id", "store_name", "status", "created_at", "updated_at"],
+    "addresses": [
+        "id", "user_id", "full_name", "line1", "line2", "city", "state", "postal_code",
+        "country", "phone", "created_at",
+    ],
+    "products": [
+        "id", "seller_id", "sku", "title", "description", "price_cents", "currency",
+        "stock_qty", "is_active", "created_at", "updated_at",
+    ],
+    "product_images": ["id", "product_id", "s3_key", "sort_order", "variants", "created_at"],
+    "orders": [
+        "id", "buyer_id", "seller_id", "shipping_address_id", "status", "currency",
+        "subtotal_cents", "total_cents", "created_at", "updated_at",
+    ],
+    "order_items": [
+        "id", "order_id", "product_id", "title", "unit_price_cents", "quantity",
+        "line_total_cents",
+    ],
+    "payments": [
+        "id", "order_id", "stripe_session_id", "stripe_payment_intent_id", "status",
+        "created_at",
+    ],
+}  # fmt: skip
+
+GENERATORS: dict[str, Callable[..., Iterator[str]]] = {
+    "users": _users,
+    "seller_profiles": _seller_profiles,
+    "addresses": _addresses,
+    "products": _products,
+    "product_images": _product_images,
+}
+
+# Tables in a phase only reference tables loaded in earlier phases.
+PHASES = [["users"], ["seller_profiles", "addresses"], ["products"], ["product_images", "orders"]]
+
+_plan: Plan | None = None
+_conninfo = ""
+_skip_fk_checks = False
+
+
+def _init_worker(plan: Plan, conninfo: str, skip_fk_checks: bool) -> None:
+    global _plan, _conninfo, _skip_fk_checks
+    _plan, _conninfo, _skip_fk_checks = plan, conninfo, skip_fk_checks
+
+
+def _copy(cur: psycopg.Cursor, table: str, data: str) -> None:
+    if data:
+        with cur.copy(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN") as copy:
+            copy.write(data)
+
+
+def _load_chunk(task: tuple[str, int, int, int]) -> dict[str, int]:
+    """Generate and COPY one chunk in its own transaction. Returns rows per table."""
+    table, chunk, start, stop = task
+    plan = _plan
+    assert plan is not None
+    rng = random.Random(f"{plan.seed}:{table}:{chunk}")
+    with psycopg.connect(_conninfo) as conn, conn.cursor() as cur:
+        if _skip_fk_checks:
+            cur.execute("SET session_replication_role = replica")
+        if table == "orders":
+            orders, items, payments = _orders(plan, rng, start, stop)
+            _copy(cur, "orders", orders)
+            _copy(cur, "order_items", items)
+            _copy(cur, "payments", payments)
+            return {
+                "orders": stop - start,
+                "order_items": items.count("\n"),
+                "payments": payments.count("\n"),
+            }
+        _copy(cur, table, "".join(GENERATORS[table](plan, rng, start, stop)))
+    return {table: stop - start}
+
+
+def _first_ids() -> dict[str, int]:
+    with SessionLocal() as db:
+        return {
+            model.__tablename__: db.scalar(select(func.coalesce(func.max(model.id), 0))) + 1
+            for model in TABLES
+        }
+
+
+def _row_counts(plan: Plan) -> dict[str, int]:
+    return {
+        "users": plan.users,
+        "seller_profiles": plan.sellers,
+        "addresses": plan.buyers,
+        "products": plan.products,
+        "product_images": plan.products * plan.images_per_product,
+        "orders": plan.orders,
+    }
+
+
+def _finish(plan: Plan, *, rollup: bool) -> None:
+    with SessionLocal() as db:
+        for model in TABLES:
+            table = model.__tablename__
+            db.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT max(id) FROM {table}))"
+                )
+            )
+        db.commit()
+        if rollup:
+            started = time.perf_counter()
+            first = plan.first["orders"]
+            for start in range(first, first + plan.orders, 20_000):
+                roll_up_orders(db, list(range(start, min(start + 20_000, first + plan.orders))))
+                db.commit()
+            print(f"seller_daily_sales rolled up in {time.perf_counter() - started:.1f}s")
+        for model in TABLES:
+            db.execute(text(f"ANALYZE {model.__tablename__}"))
+        db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, default=100_000, help="sellers included")
+    parser.add_argument("--sellers", type=int, default=2_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--images-per-product", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--max-items", type=int, default=4, help="lines per order, at most")
+    parser.add_argument("--days", type=int, default=365, help="period the data is spread over")
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=datetime.now(timezone.utc).date(),
+        help="last day of that period, YYYY-MM-DD (default: today, UTC)",
+    )
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--skip-fk-checks", action="store_true")
+    parser.add_argument("--no-variants", dest="variants", action="store_false")
+    parser.add_argument("--no-rollup", dest="rollup", action="store_false")
+    args = parser.parse_args()
+    if not 0 < args.sellers < args.users or args.products < args.sellers:
+        parser.error("need 0 < --sellers < --users and --products >= --sellers")
+
+    plan = Plan(args, _first_ids())
+    counts = _row_counts(plan)
+    conninfo = make_url(settings.database_url).set(drivername="postgresql")
+    conninfo_str = conninfo.render_as_string(hide_password=False)
+
+    totals: dict[str, int] = {}
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(
+        args.workers, initializer=_init_worker, initargs=(plan, conninfo_str, args.skip_fk_checks)
+    ) as pool:
+        for phase in PHASES:
+            phase_started = time.perf_counter()
+            tasks = [
+                (table, chunk, start, min(start + args.chunk_rows, counts[table]))
+                for table in phase
+                for chunk, start in enumerate(range(0, counts[table], args.chunk_rows))
+            ]
+            phase_rows: dict[str, int] = {}
+            for loaded in pool.imap_unordered(_load_chunk, tasks):
+                for table, rows in loaded.items():
+                    phase_rows[table] = phase_rows.get(table, 0) + rows
+            elapsed = time.perf_counter() - phase_started
+            for table, rows in phase_rows.items():
+                print(f"{table:16s} {rows:>12,d} rows")
+            print(f"{'':16s} {sum(phase_rows.values()) / elapsed:>12,.0f} rows/s")
+            totals.update(phase_rows)
+
+    _finish(plan, rollup=args.rollup)
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    print(f"total={rows} seconds={elapsed:.1f} rows_per_second={rows / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
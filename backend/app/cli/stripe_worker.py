@@ -0,0 +1,75 @@
+"""
+Apply queued Stripe webhook events outside the API processes.
+
+    python -m app.cli.stripe_worker --threads 4
+    python -m app.cli.stripe_worker --once
+    python -m app.cli.stripe_worker --requeue-dead
+
+Set STRIPE_INBOX_WORKERS=0 on the API when running this instead. Several
+workers (threads or processes) can run at once: each claims its own batch
+with FOR UPDATE SKIP LOCKED.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.stripe_inbox import drain, inbox_metrics, requeue_dead
+
+logger = logging.getLogger(__name__)
+
+
+def _run(batch_size: int, poll_seconds: float, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            if drain(batch_size) == 0:
+                stop.wait(poll_seconds)
+        except Exception:  # noqa: BLE001
+            logger.warning("Stripe inbox drain failed", exc_info=True)
+            stop.wait(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=max(settings.stripe_inbox_workers, 1))
+    parser.add_argument("--batch-size", type=int, default=settings.stripe_inbox_batch_size)
+    parser.add_argument("--poll-seconds", type=float, default=settings.stripe_inbox_poll_seconds)
+    parser.add_argument("--once", action="store_true", help="drain due events and exit")
+    parser.add_argument(
+        "--requeue-dead", action="store_true", help="retry dead-lettered events and exit"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.requeue_dead:
+        with SessionLocal() as db:
+            print(f"requeued={requeue_dead(db)}")
+        return
+    if args.once:
+        print(f"claimed={drain(args.batch_size)} {inbox_metrics.stats()}")
+        return
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_run, args=(args.batch_size, args.poll_seconds, stop), daemon=True)
+        for _ in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info("stripe inbox %s", inbox_metrics.stats())
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    main()
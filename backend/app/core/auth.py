@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Any
 
 import firebase_admin
 from fastapi import Depends, Header, HTTPException
 from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
-from app.core.db import get_db
+from app.core.db import DbRunner
+from app.core.metrics import timed_call
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 
 @lru_cache(maxsize=1)
 def _init_firebase() -> None:
@@ -36,6 +48,87 @@ def _init_firebase() -> None:
     firebase_admin.initialize_app(cred)
 
 
+def firebase_configured() -> bool:
+    return bool(settings.firebase_service_account_path or settings.firebase_service_account_json)
+
+
+def refresh_signing_certificates() -> None:
+    """
+    Re-fetch Google's ID token signing certificates into firebase_admin's HTTP
+    cache, so token verification never waits on that fetch. Blocking.
+    """
+    _init_firebase()
+    # firebase_admin has no public hook for this; if its internals move, skip
+    # the warm-up and let verification fetch the certificates itself.
+    try:
+        from firebase_admin import _token_gen
+
+        fetch = firebase_auth._get_client(None)._token_verifier.request
+        cert_uri = _token_gen.ID_TOKEN_CERT_URI
+    except (AttributeError, ImportError):
+        logger.warning("firebase_admin internals changed; not pre-fetching signing certificates")
+        return
+    with timed_call("firebase", "fetch_certificates"):
+        fetch(url=cert_uri, headers={"Cache-Control": "no-cache"})
+
+
+def _verify_id_token(token: str) -> dict[str, Any]:
+    with timed_call("firebase", "verify_id_token"):
+        return firebase_auth.verify_id_token(token)
+
+
+async def keep_signing_certificates_warm(interval_seconds: float) -> None:
+    while True:
+        try:
+            await run_in_threadpool(refresh_signing_certificates)
+        except Exception:  # noqa: BLE001
+            logger.warning("Failed to refresh Firebase signing certificates", exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    id: int
+    firebase_uid: str
+    email: str | None
+    display_name: str | None
+
+
+class _BoundedCache:
+    """Thread-safe LRU map whose entries carry an absolute (wall clock) expiry."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, value: Any, *, expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# sha256(token) -> verified claims, kept until the token's own `exp`.
+_verified_tokens = _BoundedCache(settings.auth_token_cache_size)
+# firebase_uid -> AuthenticatedUser, so steady-state requests skip the users table.
+_known_users = _BoundedCache(settings.auth_user_cache_size)
+
+
 def _parse_bearer(authorization: str | None) -> str | None:
     if not authorization:
         return None
@@ -48,19 +141,52 @@ def _parse_bearer(authorization: str | None) -> str | None:
     return token
 
 
-def get_current_user(
+def _resolve_user(
+    db: Session, uid: str, email: str | None, name: str | None
+) -> AuthenticatedUser:
+    user = db.scalar(select(User).where(User.firebase_uid == uid))
+    if user is None:
+        user = User(firebase_uid=uid, email=email, display_name=name)
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent first request for this uid inserted it first.
+            db.rollback()
+            user = db.scalars(select(User).where(User.firebase_uid == uid)).one()
+    elif (email and email != user.email) or (name and name != user.display_name):
+        user.email = email or user.email
+        user.display_name = name or user.display_name
+        db.commit()
+
+    return AuthenticatedUser(
+        id=user.id,
+        firebase_uid=user.firebase_uid,
+        email=user.email,
+        display_name=user.display_name,
+    )
+
+
+async def get_current_user(
+    runner: DbRunner,
     authorization: Annotated[str | None, Header()] = None,
-    db: Session = Depends(get_db),
-) -> User:
+) -> AuthenticatedUser:
     token = _parse_bearer(authorization)
     if not token:
         raise HTTPException(status_code=401, detail="Missing bearer token")
 
-    _init_firebase()
-    try:
-        decoded = firebase_auth.verify_id_token(token)
-    except Exception as e:  # noqa: BLE001
-        raise HTTPException(status_code=401, detail=f"Invalid token: {e}") from e
+    token_key = hashlib.sha256(token.encode("utf-8")).digest()
+    decoded = _verified_tokens.get(token_key)
+    if decoded is None:
+        _init_firebase()
+        # Verification may fetch Google's signing certificates: keep it off the loop.
+        try:
+            decoded = await run_in_threadpool(_verify_id_token, token)
+        except Exception as e:  # noqa: BLE001
+            raise HTTPException(status_code=401, detail=f"Invalid token: {e}") from e
+        exp = decoded.get("exp")
+        if isinstance(exp, (int, float)):
+            _verified_tokens.set(token_key, decoded, expires_at=float(exp))
 
     uid = decoded.get("uid")
     if not uid:
@@ -68,22 +194,17 @@ def get_current_user(
 
     email = decoded.get("email")
     name = decoded.get("name")
-
-    existing = db.scalar(select(User).where(User.firebase_uid == uid))
-    if existing:
-        existing.email = email or existing.email
-        existing.display_name = name or existing.display_name
-        db.add(existing)
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    user = User(firebase_uid=uid, email=email, display_name=name)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    known = _known_users.get(uid)
+    if known is not None and (not email or email == known.email) and (
+        not name or name == known.display_name
+    ):
+        return known
+
+    user = await runner.run(_resolve_user, uid, email, name)
+    _known_users.set(
+        uid, user, expires_at=time.time() + settings.auth_user_cache_ttl_seconds
+    )
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
-
+CurrentUser = Annotated[AuthenticatedUser, Depends(get_current_user)]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,20 +9,110 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     database_url: str
+    # Serve the hot routers through an async engine (psycopg async or asyncpg).
+    db_async: bool = False
+    async_database_url: str | None = None
+
+    # Read replicas for read-only routes (comma-separated URLs, same driver as
+    # DATABASE_URL). Unhealthy or absent replicas fall back to the primary.
+    database_replica_urls: str = ""
+    replica_check_interval_seconds: float = 5.0
+    # After a successful write, that client's reads stay on the primary this
+    # long so they see their own changes. Also how long after a catalog cache
+    # invalidation replica reads are served but not cached.
+    replica_read_after_write_seconds: float = 5.0
+    # Signs the client's "primary until" token; shared by every worker.
+    # Defaults to a key derived from DATABASE_URL.
+    replica_pin_secret: str = ""
+
+    # Connection pool, per engine and process. Checkouts wait up to
+    # db_pool_timeout_seconds once pool_size + max_overflow are in use.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    # Connections older than this are replaced on checkout (-1 keeps them).
+    db_pool_recycle_seconds: int = 1800
+    # always: ping on every checkout; idle: only connections unused for
+    # db_pre_ping_idle_seconds; never: rely on errors and recycling.
+    db_pre_ping: Literal["always", "idle", "never"] = "idle"
+    db_pre_ping_idle_seconds: float = 30.0
+    # Server-side statement_timeout for every connection (0 disables).
+    db_statement_timeout_ms: int = 0
+    # Behind PgBouncer in transaction mode: no client-side pool, no prepared
+    # statements, no startup options (set statement_timeout on the role).
+    db_pgbouncer: bool = False
+    # Bound on the database checks behind /health/ready and the replica checks.
+    health_ready_timeout_seconds: float = 2.0
     allow_origins: str = ""
+    debug: bool = False
+
+    catalog_cache_size: int = 1024
+    catalog_cache_ttl_seconds: float = 30.0
+
+    # Typo-tolerant title matching when full-text search finds nothing (needs pg_trgm).
+    search_trigram_fallback: bool = True
+
+    # Unpaid orders hold their stock this long; the sweeper then releases it.
+    reservation_ttl_seconds: int = 1800
+    # How often each API process sweeps expired holds (0 disables).
+    reservation_sweep_interval_seconds: float = 60.0
+    reservation_sweep_batch_size: int = 500
 
     firebase_service_account_path: str | None = None
     firebase_service_account_json: str | None = None
+    auth_token_cache_size: int = 10_000
+    auth_user_cache_size: int = 10_000
+    auth_user_cache_ttl_seconds: float = 300.0
+    # Re-fetch Google's token signing certificates in the background (0 disables).
+    auth_cert_refresh_seconds: float = 3600.0
 
     s3_bucket: str | None = None
     s3_region: str | None = None
     aws_access_key_id: str | None = None
     aws_secret_access_key: str | None = None
+    # S3-compatible endpoint, e.g. the MinIO service in infra/docker-compose.yml.
+    aws_endpoint_url: str | None = None
+
+    # Resized WebP (and AVIF) variants rendered after images are attached
+    # (an empty list turns this off).
+    image_variant_widths: list[int] = [320, 640, 1280]
+    image_avif: bool = True
+    image_quality: int = 80
+    # Processes rendering variants (0 = one per CPU).
+    image_workers: int = 2
+
+    # Bulk product import: uploads are spooled to disk past 1 MiB and parsed in
+    # chunks, so memory does not grow with the file.
+    product_import_max_bytes: int = 256 * 1024 * 1024
+    product_import_chunk_rows: int = 1000
+    # Row errors kept in an import's report (the failed count is always exact).
+    product_import_max_errors: int = 1000
+
+    # Catalog feed export: rows fetched per server-side cursor round trip, and
+    # the token partners must send as `?token=` (unset: the feed is public).
+    feed_batch_size: int = 2000
+    feed_access_token: str | None = None
 
     stripe_secret_key: str | None = None
     stripe_webhook_secret: str | None = None
     stripe_success_url: str | None = None
     stripe_cancel_url: str | None = None
+    # Point the SDK elsewhere, e.g. at `python -m bench.stripe_stub`.
+    stripe_api_base: str | None = None
+    stripe_connect_timeout_seconds: float = 5.0
+    stripe_read_timeout_seconds: float = 20.0
+    stripe_http_pool_size: int = 10
+    # Webhook events are applied by inbox worker threads in each API process
+    # (0 disables them; run `python -m app.cli.stripe_worker` instead).
+    stripe_inbox_workers: int = 2
+    stripe_inbox_batch_size: int = 50
+    stripe_inbox_poll_seconds: float = 1.0
+    stripe_inbox_max_attempts: int = 8
+    stripe_inbox_backoff_seconds: float = 5.0
+    # Recently received event ids kept per process to drop redeliveries early.
+    stripe_recent_events_size: int = 10_000
+    # Processed events older than this are pruned (Stripe retries for up to 3 days).
+    stripe_event_retention_days: float = 7.0
 
 
 settings = Settings()
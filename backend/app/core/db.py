@@ -1,20 +1,207 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+import math
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import TYPE_CHECKING, Annotated, Any, TypeVar
 
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import create_engine, event, exc, make_url, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .metrics import DB_POOL_WAIT_SECONDS, instrument_engine
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+T = TypeVar("T")
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+class PoolMetrics:
+    """
+    Per-process connection pool gauges, read live from each engine's pool,
+    and how long checkouts waited for a connection (/health/db).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engines: dict[str, Engine] = {}
+        self._waits: dict[str, dict[str, float]] = {}
+
+    def register(self, name: str, engine: Engine) -> None:
+        self._engines[name] = engine
+
+    def record_wait(self, name: str, seconds: float, *, timed_out: bool) -> None:
+        with self._lock:
+            w = self._waits.setdefault(
+                name, {"checkouts": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            w["checkouts"] += 1
+            w["timeouts"] += timed_out
+            w["total_ms"] += seconds * 1000
+            w["max_ms"] = max(w["max_ms"], seconds * 1000)
+        DB_POOL_WAIT_SECONDS.labels(name).observe(seconds)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for name, eng in self._engines.items():
+            pool = eng.pool
+            gauges: dict[str, Any] = {"pool": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                gauges.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=max(pool.overflow(), 0),
+                    max_overflow=settings.db_max_overflow,
+                )
+            with self._lock:
+                w = dict(self._waits.get(name, {}))
+            if w:
+                gauges.update(
+                    checkouts=w["checkouts"],
+                    timeouts=w["timeouts"],
+                    avg_wait_ms=round(w["total_ms"] / w["checkouts"], 2),
+                    max_wait_ms=round(w["max_ms"], 2),
+                )
+            out[name] = gauges
+        return out
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedPool:
+    """Times every checkout: near zero when a connection is idle in the pool."""
+
+    metrics_name = "sync"
+
+    def _do_get(self):  # noqa: ANN202
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_wait(
+                self.metrics_name, time.perf_counter() - start, timed_out=timed_out
+            )
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _timed_pool_class(name: str, *, is_async: bool) -> type[QueuePool]:
+    # A class per engine, not an attribute: dispose() rebuilds the pool from its class.
+    base = TimedAsyncQueuePool if is_async else TimedQueuePool
+    return type(base.__name__, (base,), {"metrics_name": name})
+
+
+def engine_options(url: str, *, name: str, is_async: bool) -> tuple[str, dict[str, Any]]:
+    """URL and create_engine() keyword arguments for an engine built from settings."""
+    asyncpg = make_url(url).drivername.endswith("asyncpg")
+    connect_args: dict[str, Any] = {}
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pre_ping == "always"}
+
+    if settings.db_pgbouncer:
+        # Transaction pooling hands each transaction a different server
+        # connection, so prepared statements and session settings cannot be relied on.
+        options["poolclass"] = NullPool
+        if asyncpg:
+            connect_args["statement_cache_size"] = 0
+            url = str(make_url(url).update_query_dict({"prepared_statement_cache_size": "0"}))
+        else:
+            connect_args["prepare_threshold"] = None
+    else:
+        options.update(
+            poolclass=_timed_pool_class(name, is_async=is_async),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+        if settings.db_statement_timeout_ms > 0:
+            timeout = str(settings.db_statement_timeout_ms)
+            if asyncpg:
+                connect_args["server_settings"] = {"statement_timeout": timeout}
+            else:
+                # libpq startup option: no extra round trip per connection.
+                connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return url, options
+
+
+def _ping_idle_connections(eng: Engine) -> None:
+    """
+    Ping a connection on checkout only if it sat in the pool for
+    db_pre_ping_idle_seconds; busy connections skip the round trip. A failed
+    ping discards the connection and the pool hands out a fresh one.
+    """
+    idle_after = settings.db_pre_ping_idle_seconds
+
+    @event.listens_for(eng, "checkin")
+    def _checked_in(dbapi_connection, record) -> None:  # noqa: ANN001
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(eng, "checkout")
+    def _checked_out(dbapi_connection, record, proxy) -> None:  # noqa: ANN001
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_after:
+            return
+        try:
+            eng.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise exc.DisconnectionError() from e
+
+
+def configure_engine(eng: Engine, name: str) -> None:
+    if settings.db_pre_ping == "idle" and not settings.db_pgbouncer:
+        _ping_idle_connections(eng)
+    pool_metrics.register(name, eng)
+    instrument_engine(eng, name)
+
+
+_url, _options = engine_options(settings.database_url, name="sync", is_async=False)
+engine = create_engine(_url, **_options)
+configure_engine(engine, "sync")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+if settings.db_async:
+    # Imported lazily: sqlalchemy.ext.asyncio needs greenlet (sqlalchemy[asyncio]).
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _url, _options = engine_options(
+        settings.async_database_url or settings.database_url, name="async", is_async=True
+    )
+    async_engine = create_async_engine(_url, **_options)
+    configure_engine(async_engine.sync_engine, "async")
+    # Objects stay usable after commit: expired attributes cannot be lazily
+    # refreshed outside of run_sync() on an async session.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -23,3 +210,106 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is disabled. Set DB_ASYNC=true.")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class SessionRunner:
+    """
+    Runs plain `Session` code from `async def` handlers without blocking the
+    event loop. With DB_ASYNC=true the function runs through
+    AsyncSession.run_sync(), so every query awaits on the async driver. Otherwise
+    it runs on a sync session in Starlette's threadpool.
+
+    The same `fn(db, ...)` works in both modes, so routers keep one implementation.
+    """
+
+    def __init__(self, session: Session | AsyncSession, *, on_replica: bool = False) -> None:
+        self.session = session
+        self.on_replica = on_replica
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if isinstance(self.session, Session):
+            return await run_in_threadpool(fn, self.session, *args, **kwargs)
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+
+def probe_engine(url: str) -> Engine:
+    """
+    A one-connection engine for health checks, apart from the serving pool.
+    Waiting for the connection, connecting and the statement are each bounded
+    by health_ready_timeout_seconds, so a hung database fails the check
+    instead of holding a threadpool thread.
+    """
+    timeout = settings.health_ready_timeout_seconds
+    connect_args: dict[str, Any] = {
+        # libpq counts whole seconds, and at least 2.
+        "connect_timeout": max(2, math.ceil(timeout)),
+        # Unacknowledged writes on an established connection (Linux only).
+        "tcp_user_timeout": int(timeout * 1000),
+    }
+    if settings.db_pgbouncer:
+        connect_args["prepare_threshold"] = None
+    else:
+        connect_args["options"] = f"-c statement_timeout={int(timeout * 1000)}"
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=timeout,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        connect_args=connect_args,
+    )
+
+
+_probe = probe_engine(settings.database_url)
+
+
+def pool_exhausted(eng: Engine) -> bool:
+    """True when every connection the pool may open is checked out."""
+    pool = eng.pool
+    return (
+        isinstance(pool, QueuePool)
+        and pool.checkedout() >= settings.db_pool_size + settings.db_max_overflow
+    )
+
+
+def ping(eng: Engine) -> None:
+    with eng.connect() as conn:
+        conn.execute(text("select 1"))
+
+
+def ping_database() -> None:
+    if pool_exhausted(engine):
+        raise exc.TimeoutError("Connection pool exhausted")
+    ping(_probe)
+
+
+async def ping_async_database() -> None:
+    if async_engine is None:
+        return
+    if pool_exhausted(async_engine.sync_engine):
+        raise exc.TimeoutError("Connection pool exhausted")
+    async with async_engine.connect() as conn:
+        await conn.execute(text("select 1"))
+
+
+async def get_session_runner() -> AsyncGenerator[SessionRunner, None]:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield SessionRunner(session)
+        return
+
+    db = SessionLocal()
+    try:
+        yield SessionRunner(db)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+DbRunner = Annotated[SessionRunner, Depends(get_session_runner)]
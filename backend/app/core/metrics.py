@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Label values are always route templates, engine names, statement verbs or
+# fixed operation names, so series counts stay bounded whatever the traffic.
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Seconds; fine-grained at the low end, where most DB statements land.
+_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body, per route template.",
+    ["method", "route", "status"],
+    buckets=_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled, per route template.",
+    ["method", "route"],
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "Statement execution time as seen by the driver.",
+    ["engine", "operation"],
+    buckets=_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["engine"],
+    buckets=_BUCKETS,
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds",
+    "Calls to Firebase, Stripe and S3.",
+    ["service", "operation", "outcome"],
+    buckets=_BUCKETS,
+)
+
+_OPERATIONS = {"select", "insert", "update", "delete", "with", "copy"}
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+@contextmanager
+def timed_call(service: str, operation: str) -> Iterator[None]:
+    """Observe a dependency call in `external_call_duration_seconds`, ok or error."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation, outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+def instrument_engine(eng: Engine, name: str) -> None:
+    """Time every statement run on `eng`, labelled with the engine and the statement's verb."""
+
+    @event.listens_for(eng, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(eng, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        DB_STATEMENT_SECONDS.labels(name, verb if verb in _OPERATIONS else "other").observe(
+            time.perf_counter() - starts.pop()
+        )
+
+    @event.listens_for(eng, "handle_error")
+    def _on_error(ctx) -> None:  # noqa: ANN001
+        starts = ctx.connection.info.get("metrics_query_start") if ctx.connection else None
+        if starts:
+            starts.pop()
+
+
+class _PoolCollector:
+    """Connection pool gauges, read from the pools at scrape time."""
+
+    _GAUGES = (
+        ("size", "Configured pool size."),
+        ("checked_out", "Connections in use."),
+        ("overflow", "Connections open beyond the pool size."),
+    )
+
+    def _families(self) -> dict[str, GaugeMetricFamily]:
+        return {
+            key: GaugeMetricFamily(f"db_pool_{key}", help_text, labels=["engine"])
+            for key, help_text in self._GAUGES
+        }
+
+    def describe(self):  # noqa: ANN201
+        # Lets the registry check names without calling collect() at import time.
+        return list(self._families().values())
+
+    def collect(self):  # noqa: ANN201
+        from app.core.db import pool_metrics
+
+        families = self._families()
+        for name, stats in pool_metrics.stats().items():
+            for key, family in families.items():
+                if key in stats:
+                    family.add_metric([name], stats[key])
+        yield from families.values()
+
+
+REGISTRY.register(_PoolCollector())
+
+
+def _leaf_routes(routes: Iterable[BaseRoute]) -> Iterator[BaseRoute]:
+    # Recent FastAPI versions keep included routers as one entry wrapping the
+    # original router; older ones copy their routes into the app's list.
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from _leaf_routes(included.routes)
+        else:
+            yield route
+
+
+def route_template(scope: Scope) -> str:
+    app = scope.get("app")
+    for route in _leaf_routes(getattr(getattr(app, "router", None), "routes", ())):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency histogram and in-flight gauge. The route is resolved
+    before the request runs, so in-flight requests are labelled too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _METHODS else "other"
+        route = route_template(scope)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
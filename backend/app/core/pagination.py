@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def encode_cursor(kind: str, *values: Any) -> str:
+    """
+    Opaque keyset cursor. Clients must treat it as a token and send it back
+    unchanged; `kind` ties a cursor to the ordering it was produced for.
+    """
+    raw = json.dumps([kind, *values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    if not isinstance(decoded, list) or not decoded:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return decoded
+
+
+def cursor_kind(cursor: str) -> str:
+    return str(_decode(cursor)[0])
+
+
+def decode_cursor(cursor: str, *, kind: str, size: int) -> list[Any]:
+    decoded = _decode(cursor)
+    if len(decoded) != size + 1 or decoded[0] != kind:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return decoded[1:]
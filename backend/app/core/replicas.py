@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import math
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Annotated, Any
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .db import (
+    AsyncSessionLocal,
+    SessionLocal,
+    SessionRunner,
+    configure_engine,
+    engine_options,
+    ping,
+    probe_engine,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+PIN_COOKIE = "primary_until"
+PIN_HEADER = "x-primary-until"
+
+
+@dataclass
+class Replica:
+    name: str
+    host: str
+    engine: Engine
+    # Health checks only: a single connection with short timeouts.
+    probe: Engine
+    async_engine: AsyncEngine | None = None
+    healthy: bool = False
+    reads: int = 0
+    last_error: str | None = field(default=None)
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out round-robin among the healthy ones. A replica
+    takes reads once a check passes, and is marked down by a failed check or
+    as soon as a query on it hits a dropped connection.
+    """
+
+    def __init__(self, urls: list[str]) -> None:
+        self._lock = threading.Lock()
+        self._turn = 0
+        self.pinned_reads = 0
+        self.members: list[Replica] = []
+        for i, url in enumerate(urls):
+            name = f"replica{i}"
+            sync_url, options = engine_options(url, name=name, is_async=False)
+            replica = Replica(
+                name=name,
+                host=make_url(url).render_as_string(hide_password=True),
+                engine=create_engine(sync_url, **options),
+                probe=probe_engine(url),
+            )
+            configure_engine(replica.engine, name)
+            self._watch(replica, replica.engine)
+            if AsyncSessionLocal is not None:
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                async_url, options = engine_options(url, name=f"{name}-async", is_async=True)
+                replica.async_engine = create_async_engine(async_url, **options)
+                configure_engine(replica.async_engine.sync_engine, f"{name}-async")
+                self._watch(replica, replica.async_engine.sync_engine)
+            self.members.append(replica)
+
+    def _watch(self, replica: Replica, eng: Engine) -> None:
+        @event.listens_for(eng, "handle_error")
+        def _on_error(ctx) -> None:  # noqa: ANN001
+            if ctx.is_disconnect:
+                self.set_health(replica, False, error=type(ctx.original_exception).__name__)
+
+    def pick(self) -> Replica | None:
+        with self._lock:
+            healthy = [m for m in self.members if m.healthy]
+            if not healthy:
+                return None
+            self._turn = (self._turn + 1) % len(healthy)
+            replica = healthy[self._turn]
+            replica.reads += 1
+            return replica
+
+    def count_pinned(self) -> None:
+        with self._lock:
+            self.pinned_reads += 1
+
+    def set_health(self, replica: Replica, healthy: bool, *, error: str | None = None) -> None:
+        with self._lock:
+            changed = replica.healthy != healthy
+            replica.healthy = healthy
+            if error:
+                replica.last_error = error
+        if changed:
+            if healthy:
+                logger.info("Read replica %s (%s) is up", replica.name, replica.host)
+            else:
+                logger.warning("Read replica %s (%s) is down: %s", replica.name, replica.host, error)
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "name": m.name,
+                    "host": m.host,
+                    "healthy": m.healthy,
+                    "reads": m.reads,
+                    "last_error": m.last_error,
+                }
+                for m in self.members
+            ]
+
+
+replicas = ReplicaSet([u.strip() for u in settings.database_replica_urls.split(",") if u.strip()])
+
+
+async def keep_checking_replicas(interval: float) -> None:
+    # The probe engines bound each check themselves; wait_for() is a backstop.
+    # A check it gives up on keeps its thread until then, so the replica is
+    # not probed again before that check ends.
+    running: dict[str, asyncio.Future[None]] = {}
+    while True:
+        for replica in replicas.members:
+            previous = running.get(replica.name)
+            if previous is not None and not previous.done():
+                continue
+            check = running[replica.name] = asyncio.ensure_future(
+                run_in_threadpool(ping, replica.probe)
+            )
+            check.add_done_callback(lambda f: f.cancelled() or f.exception())
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(check), timeout=settings.health_ready_timeout_seconds
+                )
+            except Exception as e:  # noqa: BLE001
+                replicas.set_health(replica, False, error=type(e).__name__)
+            else:
+                replicas.set_health(replica, True)
+        await asyncio.sleep(interval)
+
+
+class PrimaryPin:
+    """
+    Signed "primary until" tokens. After a write the client gets one as a
+    cookie and an X-Primary-Until header, and sends either back: its reads go
+    to the primary until the token expires, whichever worker serves them, so
+    it sees its own changes despite replication lag.
+    """
+
+    def __init__(self, secret: str) -> None:
+        self._key = hashlib.sha256(b"replica-pin:" + secret.encode("utf-8")).digest()
+
+    def _sign(self, until_ms: int) -> str:
+        return hmac.new(self._key, str(until_ms).encode(), hashlib.sha256).hexdigest()[:32]
+
+    def issue(self) -> str:
+        until_ms = int((time.time() + settings.replica_read_after_write_seconds) * 1000)
+        return f"{until_ms}.{self._sign(until_ms)}"
+
+    def valid(self, token: str | None) -> bool:
+        if not token:
+            return False
+        until, _, signature = token.partition(".")
+        if not until.isdigit() or not hmac.compare_digest(signature, self._sign(int(until))):
+            return False
+        return int(until) > time.time() * 1000
+
+
+# Every worker must share the secret; the database URL is one they already share.
+primary_pin = PrimaryPin(settings.replica_pin_secret or settings.database_url)
+
+
+def pinned_to_primary(request: Request) -> bool:
+    return primary_pin.valid(request.cookies.get(PIN_COOKIE) or request.headers.get(PIN_HEADER))
+
+
+class ReadYourWritesMiddleware:
+    """Pins the client to the primary after any successful non-GET request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        authorization = dict(scope["headers"]).get(b"authorization")
+
+        async def send_and_pin(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and authorization
+            ):
+                token = primary_pin.issue()
+                max_age = math.ceil(settings.replica_read_after_write_seconds)
+                cookie = f"{PIN_COOKIE}={token}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                    (PIN_HEADER.encode("latin-1"), token.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_and_pin)
+
+
+def _pick_replica(request: Request | None) -> Replica | None:
+    if request is not None and pinned_to_primary(request):
+        replicas.count_pinned()
+        return None
+    return replicas.pick()
+
+
+def read_session(request: Request | None = None) -> Session:
+    """A sync session on a replica, or on the primary when none can serve it."""
+    replica = _pick_replica(request)
+    return SessionLocal(bind=replica.engine) if replica else SessionLocal()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    db = read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_read_session_runner(request: Request) -> AsyncGenerator[SessionRunner, None]:
+    """Like get_session_runner(), for routes that only read."""
+    replica = _pick_replica(request)
+    if AsyncSessionLocal is not None:
+        bind = replica.async_engine if replica else None
+        async with (AsyncSessionLocal(bind=bind) if bind else AsyncSessionLocal()) as session:
+            yield SessionRunner(session, on_replica=bind is not None)
+        return
+
+    db = SessionLocal(bind=replica.engine) if replica else SessionLocal()
+    try:
+        yield SessionRunner(db, on_replica=replica is not None)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+ReadDbRunner = Annotated[SessionRunner, Depends(get_read_session_runner)]
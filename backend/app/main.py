@@ -1,14 +1,59 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.auth import firebase_configured, keep_signing_certificates_warm
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.replicas import (
+    PIN_HEADER,
+    ReadYourWritesMiddleware,
+    keep_checking_replicas,
+    replicas,
+)
 from app.routers import health, orders, products, seller, stripe_redirects, webhooks
+from app.services.images import shutdown_pool
+from app.services.reservations import keep_sweeping
+from app.services.stripe_inbox import keep_draining
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    tasks: list[asyncio.Task] = []
+    if settings.auth_cert_refresh_seconds > 0 and firebase_configured():
+        tasks.append(
+            asyncio.create_task(keep_signing_certificates_warm(settings.auth_cert_refresh_seconds))
+        )
+    if settings.reservation_sweep_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(keep_sweeping(settings.reservation_sweep_interval_seconds))
+        )
+    if replicas.members and settings.replica_check_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(keep_checking_replicas(settings.replica_check_interval_seconds))
+        )
+    if settings.stripe_inbox_workers > 0:
+        tasks.append(
+            asyncio.create_task(
+                keep_draining(settings.stripe_inbox_workers, settings.stripe_inbox_poll_seconds)
+            )
+        )
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        shutdown_pool()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Marketplace V2 API")
+    app = FastAPI(title="Marketplace V2 API", lifespan=lifespan)
 
     allow_origins = [o.strip() for o in settings.allow_origins.split(",") if o.strip()]
     if allow_origins:
@@ -18,7 +63,15 @@ def create_app() -> FastAPI:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            # Browser clients echo it back to keep reads on the primary after a write.
+            expose_headers=[PIN_HEADER],
         )
+    if settings.debug:
+        app.add_middleware(QueryStatsMiddleware)
+    if replicas.members:
+        app.add_middleware(ReadYourWritesMiddleware)
+    # Outermost, so its timings include the other middleware.
+    app.add_middleware(MetricsMiddleware)
 
     app.include_router(health.router)
     app.include_router(products.router)
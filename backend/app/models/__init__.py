@@ -7,6 +7,9 @@ from .order import Order
 from .order_item import OrderItem
 from .payment import Payment
 from .stripe_event import StripeEvent
+from .stock_reservation import StockReservation
+from .seller_daily_sales import SellerDailySales
+from .product_import import ProductImport
 
 __all__ = [
     "User",
@@ -18,5 +21,8 @@ __all__ = [
     "OrderItem",
     "Payment",
     "StripeEvent",
+    "StockReservation",
+    "SellerDailySales",
+    "ProductImport",
 ]
 
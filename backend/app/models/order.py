@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -10,10 +10,26 @@ from app.core.db import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Lets the reservation sweeper find stale unpaid orders without a scan.
+        Index(
+            "ix_orders_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'PENDING_PAYMENT'"),
+        ),
+        # Order history: one buyer's orders, newest first, seeking by id.
+        Index("ix_orders_buyer_id_id", "buyer_id", "id"),
+        # Lets the sales rollup backfill find paid orders it has not counted.
+        Index(
+            "ix_orders_paid_not_rolled_up",
+            "id",
+            postgresql_where=text("status = 'PAID' AND sales_rolled_up_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    buyer_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    buyer_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     seller_id: Mapped[int] = mapped_column(
         ForeignKey("seller_profiles.id"), nullable=False, index=True
     )
@@ -33,6 +49,10 @@ class Order(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Set when the order's items were added to seller_daily_sales.
+    sales_rolled_up_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     items = relationship(
         "OrderItem",
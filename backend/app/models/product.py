@@ -4,25 +4,80 @@ from datetime import datetime
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
 
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination indexes for the public catalog (active products only).
+        Index(
+            "ix_products_active_created_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_price_id",
+            "price_cents",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_seller_created_id",
+            "seller_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("is_active"),
+        ),
+        # Only present where the pg_trgm extension is installed (see migration 0006).
+        Index(
+            "ix_products_active_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=text("is_active"),
+        ),
+        # Seller-assigned SKUs: the upsert key of bulk imports.
+        Index(
+            "uq_products_seller_sku",
+            "seller_id",
+            "sku",
+            unique=True,
+            postgresql_where=text("sku IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     seller_id: Mapped[int] = mapped_column(
         ForeignKey("seller_profiles.id"), nullable=False, index=True
     )
 
+    sku: Mapped[str | None] = mapped_column(String(100), nullable=True)
     title: Mapped[str] = mapped_column(String(200))
     description: Mapped[str | None] = mapped_column(String(4000), nullable=True)
 
@@ -32,6 +87,10 @@ class Product(Base):
     stock_qty: Mapped[int] = mapped_column(Integer(), default=0)
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True)
 
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR(), Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -39,7 +98,7 @@ class Product(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
-    seller = relationship("SellerProfile", lazy="joined")
+    seller = relationship("SellerProfile")
     images = relationship(
         "ProductImage",
         back_populates="product",
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -10,6 +12,13 @@ from app.core.db import Base
 
 class ProductImage(Base):
     __tablename__ = "product_images"
+    __table_args__ = (
+        Index(
+            "ix_product_images_pending_variants",
+            "id",
+            postgresql_where=text("variants IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     product_id: Mapped[int] = mapped_column(
@@ -18,6 +27,8 @@ class ProductImage(Base):
 
     s3_key: Mapped[str] = mapped_column(String(1024))
     sort_order: Mapped[int] = mapped_column(Integer(), default=0)
+    # [{"key", "width", "format"}, ...] once derivatives are built; NULL until then.
+    variants: Mapped[list[dict[str, Any]] | None] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class ProductImport(Base):
+    """
+    One bulk product upload and its outcome. `errors` lists rejected rows
+    (line number, field, message), capped at PRODUCT_IMPORT_MAX_ERRORS.
+    """
+
+    __tablename__ = "product_imports"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    seller_id: Mapped[int] = mapped_column(
+        ForeignKey("seller_profiles.id"), nullable=False, index=True
+    )
+
+    format: Mapped[str] = mapped_column(String(16))
+    # RUNNING -> DONE, or FAILED when the upload could not be read at all.
+    status: Mapped[str] = mapped_column(String(16), default="RUNNING")
+
+    rows_total: Mapped[int] = mapped_column(Integer(), default=0)
+    rows_created: Mapped[int] = mapped_column(Integer(), default=0)
+    rows_updated: Mapped[int] = mapped_column(Integer(), default=0)
+    rows_failed: Mapped[int] = mapped_column(Integer(), default=0)
+    errors: Mapped[list[dict[str, Any]]] = mapped_column(JSONB(), default=list)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class SellerDailySales(Base):
+    """
+    Paid sales per seller, day (the order's UTC creation date) and product.
+    Maintained incrementally as orders become PAID, so seller reports read a
+    handful of rows instead of scanning orders.
+    """
+
+    __tablename__ = "seller_daily_sales"
+
+    seller_id: Mapped[int] = mapped_column(ForeignKey("seller_profiles.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+
+    # Orders containing the product; an order with several products counts in each.
+    orders: Mapped[int] = mapped_column(Integer(), default=0)
+    units: Mapped[int] = mapped_column(Integer(), default=0)
+    revenue_cents: Mapped[int] = mapped_column(BigInteger(), default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
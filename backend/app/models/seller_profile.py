@@ -25,5 +25,5 @@ class SellerProfile(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
-    user = relationship("User", lazy="joined")
+    user = relationship("User")
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class StockReservation(Base):
+    """
+    A hold on `quantity` units of a product for an unpaid order. HELD rows that
+    have not expired count against available stock; payment turns them into
+    COMMITTED, the sweeper turns expired ones into RELEASED.
+    """
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # Covers the available-stock aggregate (index-only scan per product).
+        Index(
+            "ix_stock_reservations_held_product",
+            "product_id",
+            "expires_at",
+            postgresql_include=["quantity"],
+            postgresql_where=text("status = 'HELD'"),
+        ),
+        Index(
+            "ix_stock_reservations_held_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'HELD'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    order_id: Mapped[int] = mapped_column(
+        ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    quantity: Mapped[int] = mapped_column(Integer())
+    status: Mapped[str] = mapped_column(String(16), default="HELD")
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
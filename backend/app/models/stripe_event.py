@@ -1,21 +1,53 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import DateTime, String, UniqueConstraint, func
+from sqlalchemy import DateTime, Index, Integer, String, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
 
 
 class StripeEvent(Base):
+    """
+    Inbox of verified Stripe webhook events. The endpoint stores each event as
+    PENDING; the inbox worker applies it and marks it DONE, or retries it with
+    backoff until it is moved to DEAD.
+    """
+
     __tablename__ = "stripe_events"
-    __table_args__ = (UniqueConstraint("event_id", name="uq_stripe_events_event_id"),)
+    __table_args__ = (
+        UniqueConstraint("event_id", name="uq_stripe_events_event_id"),
+        Index(
+            "ix_stripe_events_pending_next_attempt",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_stripe_events_done_created_at",
+            "created_at",
+            postgresql_where=text("status = 'DONE'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    event_type: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+
+    status: Mapped[str] = mapped_column(String(16), default="PENDING")
+    # Outcome of a DONE event: ok, ignored or unhandled.
+    result: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer(), default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    last_error: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
-
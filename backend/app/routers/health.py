@@ -1,11 +1,106 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import async_engine, get_db, ping_async_database, ping_database, pool_metrics
+from app.core.metrics import render_latest
+from app.core.replicas import replicas
+from app.serializers import ORJSONResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.feed import feed_metrics
+from app.services.stripe_inbox import backlog, inbox_metrics, recent_events, table_stats
+from app.services.stripe_service import stripe_metrics
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
 @router.get("/health")
 def health() -> dict[str, str]:
+    # Liveness only: answers while the process runs, whatever its dependencies.
     return {"status": "ok"}
 
+
+async def _check(probe: Awaitable[None]) -> dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe, timeout=settings.health_ready_timeout_seconds)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": "timeout"}
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Readiness check failed: %s", e)
+        return {"ok": False, "error": type(e).__name__}
+    return {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+@router.get("/health/ready")
+async def ready() -> Response:
+    """
+    Readiness: 200 only if every database engine answers `select 1` within
+    HEALTH_READY_TIMEOUT_SECONDS, 503 otherwise. An exhausted pool counts as
+    not ready. The sync check runs on its own connection, so it never waits
+    behind the serving pool.
+    """
+    checks = {"database": await _check(run_in_threadpool(ping_database))}
+    if async_engine is not None:
+        checks["database_async"] = await _check(ping_async_database())
+    ok = all(c["ok"] for c in checks.values())
+    return ORJSONResponse(
+        status_code=200 if ok else 503,
+        content={"status": "ready" if ok else "unavailable", "checks": checks},
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus text format; counters and histograms cover this process only."""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get("/health/db")
+def db_pool_stats() -> dict[str, dict[str, Any]]:
+    return pool_metrics.stats()
+
+
+@router.get("/health/replicas")
+def replica_stats() -> dict[str, Any]:
+    # Not part of readiness: reads fall back to the primary while replicas are down.
+    return {"replicas": replicas.stats(), "pinned_reads": replicas.pinned_reads}
+
+
+@router.get("/health/cache")
+def cache_stats() -> dict[str, int]:
+    return catalog_cache.stats()
+
+
+@router.get("/health/stripe-inbox")
+def stripe_inbox_stats(db: Session = Depends(get_db)) -> dict[str, Any]:
+    # Backlog and table size are shared by all workers; the counters cover this
+    # process only.
+    return {
+        **backlog(db),
+        "table": table_stats(db),
+        "worker": inbox_metrics.stats(),
+        "dedup": recent_events.stats(),
+    }
+
+
+@router.get("/health/stripe")
+def stripe_api_stats() -> dict[str, dict[str, float]]:
+    return stripe_metrics.stats()
+
+
+@router.get("/health/feed")
+def feed_export_stats() -> dict[str, Any]:
+    return feed_metrics.stats()
@@ -1,67 +1,99 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.concurrency import run_in_threadpool
 
 from app.core.auth import CurrentUser
-from app.core.db import get_db
+from app.core.db import DbRunner
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.replicas import ReadDbRunner
 from app.models.address import Address
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.payment import Payment
 from app.models.product import Product
-from app.schemas.order import CreateOrderRequest, OrderOut, OrderItemOut
+from app.schemas.order import (
+    CreateOrderRequest,
+    OrderOut,
+    OrderPage,
+    OrderSummaryPage,
+    OrderView,
+)
 from app.schemas.stripe import CheckoutResponse
-from app.services.stripe_service import create_checkout_session
+from app.serializers import ORJSONResponse, order_to_dict
+from app.services.reservations import (
+    CHECKOUT_HOLD,
+    extend_holds,
+    held_quantities,
+    place_holds,
+)
+from app.services.stripe_service import (
+    create_checkout_session,
+    find_checkout_payment,
+    record_checkout_session,
+    retrieve_checkout_session,
+)
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-
-def _order_to_out(o: Order) -> OrderOut:
-    return OrderOut(
-        id=o.id,
-        buyer_id=o.buyer_id,
-        seller_id=o.seller_id,
-        status=o.status,
-        currency=o.currency,
-        subtotal_cents=o.subtotal_cents,
-        total_cents=o.total_cents,
-        created_at=o.created_at,
-        items=[
-            OrderItemOut(
-                id=i.id,
-                product_id=i.product_id,
-                title=i.title,
-                unit_price_cents=i.unit_price_cents,
-                quantity=i.quantity,
-                line_total_cents=i.line_total_cents,
-            )
-            for i in (o.items or [])
-        ],
-    )
+# A stored Checkout URL is not handed out this close to its session's expiry.
+CHECKOUT_URL_MARGIN = timedelta(minutes=1)
 
 
 @router.post("", response_model=OrderOut)
-def create_order(
+async def create_order(
     body: CreateOrderRequest,
     user: CurrentUser,
-    db: Session = Depends(get_db),
-) -> OrderOut:
-    product_ids = [i.product_id for i in body.items]
-    products = db.scalars(select(Product).where(Product.id.in_(product_ids))).all()
+    runner: DbRunner,
+) -> Response:
+    return ORJSONResponse(content=await runner.run(_create_order, user.id, body))
+
+
+def _create_order(db: Session, buyer_id: int, body: CreateOrderRequest) -> dict[str, Any]:
+    """
+    One transaction: lock the products, validate against stock not held by other
+    unpaid orders, then insert the address, the order, its items and its stock
+    holds. Nothing is committed if any step fails.
+    """
+    try:
+        return _insert_order(db, buyer_id, body)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _insert_order(db: Session, buyer_id: int, body: CreateOrderRequest) -> dict[str, Any]:
+    requested: dict[int, int] = {}
+    for req in body.items:
+        if req.quantity < 1:
+            raise HTTPException(status_code=400, detail="Invalid quantity")
+        requested[req.product_id] = requested.get(req.product_id, 0) + req.quantity
+
+    # Row locks taken in id order, so concurrent orders on overlapping products
+    # queue behind each other instead of deadlocking, and every stock check sees
+    # the latest committed quantity and holds.
+    products = db.scalars(
+        select(Product)
+        .where(Product.id.in_(sorted(requested)))
+        .order_by(Product.id)
+        .with_for_update()
+    ).all()
     by_id = {p.id: p for p in products}
+    held = held_quantities(db, by_id)
 
     # Validate items
     seller_id: int | None = None
-    subtotal = 0
-    items: list[OrderItem] = []
-    for req in body.items:
-        p = by_id.get(req.product_id)
+    for product_id, quantity in requested.items():
+        p = by_id.get(product_id)
         if not p or not p.is_active:
-            raise HTTPException(status_code=400, detail=f"Invalid product: {req.product_id}")
-        if req.quantity < 1:
-            raise HTTPException(status_code=400, detail="Invalid quantity")
-        if p.stock_qty < req.quantity:
+            raise HTTPException(status_code=400, detail=f"Invalid product: {product_id}")
+        if p.stock_qty - held.get(p.id, 0) < quantity:
             raise HTTPException(status_code=400, detail=f"Insufficient stock for {p.id}")
 
         if seller_id is None:
@@ -72,27 +104,30 @@ def create_order(
                 detail="MVP limitation: one order can only contain items from one seller",
             )
 
+    assert seller_id is not None
+
+    subtotal = 0
+    item_rows: list[dict[str, Any]] = []
+    for req in body.items:
+        p = by_id[req.product_id]
         line_total = p.price_cents * req.quantity
         subtotal += line_total
-        items.append(
-            OrderItem(
-                product_id=p.id,
-                title=p.title,
-                unit_price_cents=p.price_cents,
-                quantity=req.quantity,
-                line_total_cents=line_total,
-            )
+        item_rows.append(
+            {
+                "product_id": p.id,
+                "title": p.title,
+                "unit_price_cents": p.price_cents,
+                "quantity": req.quantity,
+                "line_total_cents": line_total,
+            }
         )
 
-    assert seller_id is not None
-
-    addr = Address(user_id=user.id, **body.shipping_address.model_dump())
+    addr = Address(user_id=buyer_id, **body.shipping_address.model_dump())
     db.add(addr)
-    db.commit()
-    db.refresh(addr)
+    db.flush()
 
     order = Order(
-        buyer_id=user.id,
+        buyer_id=buyer_id,
         seller_id=seller_id,
         shipping_address_id=addr.id,
         status="PENDING_PAYMENT",
@@ -101,50 +136,160 @@ def create_order(
         total_cents=subtotal,
     )
     db.add(order)
-    db.commit()
-    db.refresh(order)
+    db.flush()
 
-    for it in items:
-        it.order_id = order.id
-        db.add(it)
-    db.commit()
-    db.refresh(order)
+    for row in item_rows:
+        row["order_id"] = order.id
+    items = db.scalars(
+        insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True), item_rows
+    ).all()
+    set_committed_value(order, "items", list(items))
+    place_holds(db, order.id, requested)
 
-    return _order_to_out(order)
+    # Serialize before commit: committing expires the instances, and reading
+    # them back would cost another round trip.
+    out = order_to_dict(order)
+    db.commit()
+    return out
 
 
-@router.get("", response_model=list[OrderOut])
-def list_my_orders(
+@router.get("", response_model=OrderPage | OrderSummaryPage)
+async def list_my_orders(
     user: CurrentUser,
-    db: Session = Depends(get_db),
-) -> list[OrderOut]:
-    orders = (
-        db.scalars(select(Order).where(Order.buyer_id == user.id).order_by(Order.id.desc()))
-        .unique()
-        .all()
+    runner: ReadDbRunner,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    view: OrderView = "full",
+) -> Response:
+    return ORJSONResponse(
+        content=await runner.run(_list_orders, user.id, limit=limit, cursor=cursor, view=view)
     )
-    return [_order_to_out(o) for o in orders]
 
 
-@router.post("/{order_id}/checkout", response_model=CheckoutResponse)
-def checkout_order(
+def _list_orders(
+    db: Session, buyer_id: int, *, limit: int, cursor: str | None, view: OrderView
+) -> dict[str, Any]:
+    """
+    Newest first, seeking past the cursor's order id: a range scan of
+    ix_orders_buyer_id_id however many orders the buyer has. The full view
+    loads the page's items in one more query; the summary view counts them
+    in SQL instead.
+    """
+    if view == "summary":
+        item_count = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+        stmt = select(
+            Order.id,
+            Order.seller_id,
+            Order.status,
+            Order.currency,
+            Order.total_cents,
+            Order.created_at,
+            item_count.label("item_count"),
+        )
+    else:
+        stmt = select(Order)
+
+    stmt = stmt.where(Order.buyer_id == buyer_id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, kind="orders", size=1)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(Order.id < last_id)
+    # Fetch one extra row to learn whether another page exists.
+    stmt = stmt.order_by(Order.id.desc()).limit(limit + 1)
+
+    if view == "summary":
+        items = [dict(r) for r in db.execute(stmt).mappings()]
+    else:
+        orders = db.scalars(stmt.options(selectinload(Order.items))).all()
+        items = [order_to_dict(o) for o in orders]
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor("orders", items[-1]["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/{order_id}", response_model=OrderOut)
+async def get_my_order(
     order_id: int,
     user: CurrentUser,
-    db: Session = Depends(get_db),
-) -> CheckoutResponse:
-    order = db.get(Order, order_id)
-    if not order or order.buyer_id != user.id:
+    runner: ReadDbRunner,
+) -> Response:
+    return ORJSONResponse(content=await runner.run(_get_order, order_id, user.id))
+
+
+def _get_order(db: Session, order_id: int, buyer_id: int) -> dict[str, Any]:
+    order = db.scalar(
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.id == order_id, Order.buyer_id == buyer_id)
+    )
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order_to_dict(order)
+
+
+def _load_payable_order(
+    db: Session, order_id: int, buyer_id: int
+) -> tuple[Order, Payment | None, datetime | None]:
+    """
+    Returns the order, its payment and, when a new Checkout Session is needed,
+    the time its stock holds now last until (the session must expire by then).
+    An unexpired session on the payment is reused.
+    """
+    order = db.get(Order, order_id, options=[selectinload(Order.items)])
+    if not order or order.buyer_id != buyer_id:
         raise HTTPException(status_code=404, detail="Order not found")
     if order.status != "PENDING_PAYMENT":
         raise HTTPException(status_code=400, detail=f"Order not payable (status={order.status})")
+    payment = find_checkout_payment(db, order.id)
+    if payment and payment.stripe_session_id:
+        expires_at = payment.checkout_expires_at
+        if expires_at is None or expires_at - CHECKOUT_URL_MARGIN > datetime.now(timezone.utc):
+            return order, payment, None
 
-    payment = create_checkout_session(db=db, order=order)
-    # Fetch session url from Stripe (we didn't store it).
-    import stripe  # local import to avoid import-time config
+    held_until = extend_holds(db, order.id, CHECKOUT_HOLD)
+    if held_until is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Order reservation expired")
+    # Detached instances keep their loaded state; commit would expire them.
+    db.expunge(order)
+    if payment:
+        db.expunge(payment)
+    db.commit()
+    return order, payment, held_until
 
-    session = stripe.checkout.Session.retrieve(payment.stripe_session_id)
-    url = session.get("url")
-    if not url:
+
+@router.post("/{order_id}/checkout", response_model=CheckoutResponse)
+async def checkout_order(
+    order_id: int,
+    user: CurrentUser,
+    runner: DbRunner,
+) -> CheckoutResponse:
+    order, payment, held_until = await runner.run(_load_payable_order, order_id, user.id)
+    if held_until is None and payment.checkout_url:
+        # Repeat checkout: served from the database without calling Stripe.
+        return CheckoutResponse(
+            checkout_url=payment.checkout_url, stripe_session_id=payment.stripe_session_id
+        )
+
+    # Stripe calls are blocking HTTP: run them in the threadpool, DB work through the runner.
+    if held_until is None:
+        # Session created before URLs were stored: fetch it once and keep the URL.
+        session = await run_in_threadpool(retrieve_checkout_session, payment.stripe_session_id)
+    else:
+        session = await run_in_threadpool(create_checkout_session, order, held_until)
+    payment = await runner.run(record_checkout_session, order.id, session)
+
+    if not payment.checkout_url:
         raise HTTPException(status_code=500, detail="Stripe session missing url")
-    return CheckoutResponse(checkout_url=url, stripe_session_id=payment.stripe_session_id or "")
+    return CheckoutResponse(
+        checkout_url=payment.checkout_url, stripe_session_id=payment.stripe_session_id or ""
+    )
 
@@ -1,49 +1,320 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import hmac
+import re
+from collections.abc import Callable, Hashable
+from datetime import datetime
+from typing import Any
 
-from app.core.db import get_db
-from app.models.product import Product
-from app.schemas.product import ProductOut, ProductImageOut
-from app.services.s3 import public_url_for_key
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.pagination import cursor_kind, decode_cursor, encode_cursor
+from app.core.replicas import ReadDbRunner, pinned_to_primary
+from app.models.product import SEARCH_CONFIG, Product
+from app.schemas.product import ProductOut, ProductPage, ProductSort
+from app.serializers import ORJSONResponse, dumps, product_to_dict, products_to_dicts
+from app.services.catalog_cache import CachedPayload, catalog_cache, etag_for
+from app.services.feed import MEDIA_TYPES, FeedFormat, stream_feed
+from app.services.reservations import held_for_product, held_quantities
+from app.services.s3 import public_url_prefix
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
-def _product_to_out(p: Product) -> ProductOut:
-    return ProductOut(
-        id=p.id,
-        seller_id=p.seller_id,
-        title=p.title,
-        description=p.description,
-        price_cents=p.price_cents,
-        currency=p.currency,
-        stock_qty=p.stock_qty,
-        is_active=p.is_active,
-        images=[
-            ProductImageOut(
-                id=img.id,
-                s3_key=img.s3_key,
-                sort_order=img.sort_order,
-                url=public_url_for_key(img.s3_key),
-            )
-            for img in (p.images or [])
-        ],
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def _cached_json(
+    request: Request,
+    runner: ReadDbRunner,
+    key: Hashable,
+    build: Callable[..., Any],
+    **kwargs: Any,
+) -> Response:
+    """
+    Serve `key` from the catalog cache, running `build(db, **kwargs)` and storing
+    the result on a miss. Clients revalidating with a matching If-None-Match get
+    an empty 304. Cache hits never touch the database. Clients that just wrote
+    bypass the cache, which may hold a replica's older view.
+
+    Right after an invalidation a replica may not have the write yet, so what
+    it returns is served but not cached; otherwise everyone would get the old
+    rows for the whole TTL.
+    """
+    if pinned_to_primary(request):
+        body = dumps(await runner.run(build, **kwargs))
+        cached = CachedPayload(body=body, etag=etag_for(body))
+    elif (cached := catalog_cache.get(key)) is None:
+        generation = catalog_cache.generation
+        body = dumps(await runner.run(build, **kwargs))
+        if runner.on_replica and catalog_cache.invalidated_within(
+            settings.replica_read_after_write_seconds
+        ):
+            cached = CachedPayload(body=body, etag=etag_for(body))
+        else:
+            cached = catalog_cache.set(key, body, generation=generation)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content=cached.body, headers=headers)
+
+
+def _apply_keyset(stmt: Select, sort: ProductSort, cursor: str | None) -> Select:
+    """
+    Order by (sort key, id) and seek past the cursor. Each ordering is backed by
+    a partial index on active products, so every page is an index range scan.
+    """
+    if sort == "newest":
+        key, descending = Product.created_at, True
+    elif sort == "price_asc":
+        key, descending = Product.price_cents, False
+    else:
+        key, descending = Product.price_cents, True
+
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, kind=sort, size=2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if sort == "newest":
+            try:
+                last_key = datetime.fromisoformat(last_key)
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail="Invalid cursor") from e
+        elif not isinstance(last_key, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        seek = tuple_(key, Product.id)
+        stmt = stmt.where(seek < (last_key, last_id) if descending else seek > (last_key, last_id))
+
+    if descending:
+        return stmt.order_by(key.desc(), Product.id.desc())
+    return stmt.order_by(key.asc(), Product.id.asc())
+
+
+def _next_cursor(sort: ProductSort, last: Product) -> str:
+    if sort == "newest":
+        return encode_cursor(sort, last.created_at.isoformat(), last.id)
+    return encode_cursor(sort, last.price_cents, last.id)
+
+
+@router.get("", response_model=ProductPage)
+async def list_products(
+    request: Request,
+    runner: ReadDbRunner,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    sort: ProductSort = "newest",
+    seller_id: int | None = None,
+    min_price_cents: int | None = Query(default=None, ge=0),
+    max_price_cents: int | None = Query(default=None, ge=0),
+    in_stock: bool = False,
+) -> Response:
+    key = (
+        "list",
+        limit,
+        cursor,
+        sort,
+        seller_id,
+        min_price_cents,
+        max_price_cents,
+        in_stock,
+    )
+    return await _cached_json(
+        request,
+        runner,
+        key,
+        _load_page,
+        limit=limit,
+        cursor=cursor,
+        sort=sort,
+        seller_id=seller_id,
+        min_price_cents=min_price_cents,
+        max_price_cents=max_price_cents,
+        in_stock=in_stock,
+    )
+
+
+def _load_page(
+    db: Session,
+    *,
+    limit: int,
+    cursor: str | None,
+    sort: ProductSort,
+    seller_id: int | None,
+    min_price_cents: int | None,
+    max_price_cents: int | None,
+    in_stock: bool,
+) -> dict[str, Any]:
+    stmt = (
+        select(Product)
+        .options(selectinload(Product.images))
+        .where(Product.is_active == True)  # noqa: E712
+    )
+    if seller_id is not None:
+        stmt = stmt.where(Product.seller_id == seller_id)
+    if min_price_cents is not None:
+        stmt = stmt.where(Product.price_cents >= min_price_cents)
+    if max_price_cents is not None:
+        stmt = stmt.where(Product.price_cents <= max_price_cents)
+    if in_stock:
+        # Same rule as available_qty: stock not held by unpaid orders.
+        stmt = stmt.where(Product.stock_qty > 0, Product.stock_qty > held_for_product(Product.id))
+
+    # Fetch one extra row to learn whether another page exists.
+    stmt = _apply_keyset(stmt, sort, cursor).limit(limit + 1)
+    rows = db.scalars(stmt).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _next_cursor(sort, rows[-1])
+    held = held_quantities(db, (p.id for p in rows))
+    return {"items": products_to_dicts(rows, held), "next_cursor": next_cursor}
+
+
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+_trigram_available: bool | None = None
+
+
+def _prefix_tsquery(q: str) -> str | None:
+    """
+    Build a to_tsquery() expression that ANDs the terms and prefix-matches the
+    last one, so "red sne" matches "red sneakers" while the user is typing.
+    """
+    terms = _SEARCH_TERM.findall(q.lower())[:8]
+    if not terms:
+        return None
+    if len(terms[-1]) >= 2:
+        terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def _trigram_enabled(db: Session) -> bool:
+    global _trigram_available
+    if not settings.search_trigram_fallback:
+        return False
+    if _trigram_available is None:
+        _trigram_available = bool(
+            db.scalar(text("select exists(select 1 from pg_extension where extname = 'pg_trgm')"))
+        )
+    return _trigram_available
+
+
+def _search_page(
+    db: Session, *, q: str, limit: int, cursor: str | None, kind: str | None = None
+) -> dict[str, Any]:
+    """
+    Rank full-text matches on title (weight A) and description (weight B). When
+    nothing matches, fall back to trigram similarity on the title to absorb typos.
+    """
+    if kind is None:
+        kind = cursor_kind(cursor) if cursor else "search"
+    if kind == "search":
+        tsquery = _prefix_tsquery(q)
+        if tsquery is None:
+            return {"items": [], "next_cursor": None}
+        query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        score = func.ts_rank_cd(Product.search_vector, query)
+        match = Product.search_vector.op("@@")(query)
+    elif kind == "search_fuzzy":
+        score = func.similarity(Product.title, q)
+        match = Product.title.op("%")(q)
+    else:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    stmt = (
+        select(Product, score)
+        .options(selectinload(Product.images))
+        .where(Product.is_active == True, match)  # noqa: E712
     )
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, kind=kind, size=2)
+        if not isinstance(last_score, (int, float)) or not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(score, Product.id) < (last_score, last_id))
+    rows = db.execute(stmt.order_by(score.desc(), Product.id.desc()).limit(limit + 1)).all()
+
+    if not rows and not cursor and kind == "search" and _trigram_enabled(db):
+        return _search_page(db, q=q, limit=limit, cursor=None, kind="search_fuzzy")
 
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_score = rows[-1]
+        next_cursor = encode_cursor(kind, last_score, last.id)
+    products = [p for p, _ in rows]
+    held = held_quantities(db, (p.id for p in products))
+    return {"items": products_to_dicts(products, held), "next_cursor": next_cursor}
 
-@router.get("", response_model=list[ProductOut])
-def list_products(db: Session = Depends(get_db)) -> list[ProductOut]:
-    rows = db.scalars(select(Product).where(Product.is_active == True)).all()  # noqa: E712
-    return [_product_to_out(p) for p in rows]
+
+@router.get("/search", response_model=ProductPage)
+async def search_products(
+    request: Request,
+    runner: ReadDbRunner,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+) -> Response:
+    return await _cached_json(
+        request,
+        runner,
+        ("search", q, limit, cursor),
+        _search_page,
+        q=q,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def _feed_response(fmt: FeedFormat, token: str | None) -> StreamingResponse:
+    expected = settings.feed_access_token
+    if expected and not hmac.compare_digest((token or "").encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid feed token")
+    return StreamingResponse(
+        stream_feed(fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="catalog.{fmt}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/feed.ndjson")
+def catalog_feed_ndjson(token: str | None = None) -> StreamingResponse:
+    """
+    The whole active catalog, one JSON object per line, streamed from a
+    server-side cursor so memory stays flat at any catalog size.
+    """
+    return _feed_response("ndjson", token)
+
+
+@router.get("/feed.csv.gz")
+def catalog_feed_csv_gz(token: str | None = None) -> StreamingResponse:
+    """The same feed as gzip-compressed CSV, compressed chunk by chunk."""
+    return _feed_response("csv.gz", token)
 
 
 @router.get("/{product_id}", response_model=ProductOut)
-def get_product(product_id: int, db: Session = Depends(get_db)) -> ProductOut:
-    p = db.get(Product, product_id)
+async def get_product(product_id: int, request: Request, runner: ReadDbRunner) -> Response:
+    return await _cached_json(
+        request, runner, ("product", product_id), _load_product, product_id=product_id
+    )
+
+
+def _load_product(db: Session, product_id: int) -> dict[str, Any]:
+    p = db.get(Product, product_id, options=[selectinload(Product.images)])
     if not p or not p.is_active:
         raise HTTPException(status_code=404, detail="Product not found")
-    return _product_to_out(p)
+    held = held_quantities(db, [p.id]).get(p.id, 0)
+    return product_to_dict(p, public_url_prefix(), held)
 
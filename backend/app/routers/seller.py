@@ -1,59 +1,73 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
 
 from app.core.auth import CurrentUser
+from app.core.config import settings
 from app.core.db import get_db
+from app.core.replicas import get_read_db
 from app.models.product import Product
 from app.models.product_image import ProductImage
+from app.models.product_import import ProductImport
 from app.models.seller_profile import SellerProfile
 from app.schemas.product import (
     AttachImagesRequest,
+    PresignBatchRequest,
+    PresignBatchResponse,
     PresignRequest,
     PresignResponse,
+    ProductBatchUpdateRequest,
+    ProductBatchUpdateResponse,
     ProductCreate,
+    ProductImportOut,
     ProductOut,
     ProductUpdate,
-    ProductImageOut,
 )
-from app.schemas.seller import SellerProfileOut, SellerProfileUpsert
-from app.services.s3 import build_s3_key, presign_put, public_url_for_key
+from app.schemas.seller import SellerProfileOut, SellerProfileUpsert, SellerStatsOut
+from app.serializers import (
+    ORJSONResponse,
+    product_import_to_dict,
+    product_to_dict,
+    products_to_dicts,
+)
+from app.services.catalog_cache import catalog_cache
+from app.services.images import derive_images
+from app.services.product_batch import batch_update_products
+from app.services.product_import import ImportFormat, import_products
+from app.services.reservations import held_quantities
+from app.services.s3 import build_s3_key, presign_put, public_url_for_key, public_url_prefix
+from app.services.sales_rollup import seller_stats
 
 router = APIRouter(prefix="/seller", tags=["seller"])
 
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366
 
-def _ensure_seller_profile(db: Session, user_id: int) -> SellerProfile | None:
-    return db.scalar(select(SellerProfile).where(SellerProfile.user_id == user_id))
+IMPORT_CONTENT_TYPES: dict[str, ImportFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+# Uploads past this size are spooled to a temporary file instead of memory.
+IMPORT_SPOOL_BYTES = 1024 * 1024
 
 
-def _product_to_out(p: Product) -> ProductOut:
-    return ProductOut(
-        id=p.id,
-        seller_id=p.seller_id,
-        title=p.title,
-        description=p.description,
-        price_cents=p.price_cents,
-        currency=p.currency,
-        stock_qty=p.stock_qty,
-        is_active=p.is_active,
-        images=[
-            ProductImageOut(
-                id=img.id,
-                s3_key=img.s3_key,
-                sort_order=img.sort_order,
-                url=public_url_for_key(img.s3_key),
-            )
-            for img in (p.images or [])
-        ],
-    )
+def _ensure_seller_profile(db: Session, user_id: int) -> SellerProfile | None:
+    return db.scalar(select(SellerProfile).where(SellerProfile.user_id == user_id))
 
 
 @router.get("/profile", response_model=SellerProfileOut | None)
 def get_profile(
     user: CurrentUser,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> SellerProfileOut | None:
     seller = _ensure_seller_profile(db, user.id)
     if not seller:
@@ -85,16 +99,44 @@ def upsert_profile(
     )
 
 
+@router.get("/stats", response_model=SellerStatsOut)
+def get_sales_stats(
+    user: CurrentUser,
+    db: Session = Depends(get_read_db),
+    from_date: date | None = Query(default=None, alias="from"),
+    to_date: date | None = Query(default=None, alias="to"),
+) -> Response:
+    """
+    Paid sales between `from` and `to` (inclusive UTC days, last 30 by
+    default), read from the seller_daily_sales rollup only.
+    """
+    seller = _ensure_seller_profile(db, user.id)
+    if not seller:
+        raise HTTPException(status_code=403, detail="Seller profile required")
+    end = to_date or datetime.now(timezone.utc).date()
+    start = from_date or end - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end - start).days >= STATS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {STATS_MAX_DAYS} days")
+    return ORJSONResponse(content=seller_stats(db, seller.id, start, end))
+
+
 @router.get("/products", response_model=list[ProductOut])
 def list_my_products(
     user: CurrentUser,
-    db: Session = Depends(get_db),
-) -> list[ProductOut]:
+    db: Session = Depends(get_read_db),
+) -> Response:
     seller = _ensure_seller_profile(db, user.id)
     if not seller:
-        return []
-    rows = db.scalars(select(Product).where(Product.seller_id == seller.id)).all()
-    return [_product_to_out(p) for p in rows]
+        return ORJSONResponse(content=[])
+    rows = db.scalars(
+        select(Product)
+        .options(selectinload(Product.images))
+        .where(Product.seller_id == seller.id)
+    ).all()
+    held = held_quantities(db, (p.id for p in rows))
+    return ORJSONResponse(content=products_to_dicts(rows, held))
 
 
 @router.post("/products", response_model=ProductOut)
@@ -102,13 +144,14 @@ def create_product(
     body: ProductCreate,
     user: CurrentUser,
     db: Session = Depends(get_db),
-) -> ProductOut:
+) -> Response:
     seller = _ensure_seller_profile(db, user.id)
     if not seller:
         raise HTTPException(status_code=403, detail="Seller profile required")
 
     p = Product(
         seller_id=seller.id,
+        sku=body.sku,
         title=body.title,
         description=body.description,
         price_cents=body.price_cents,
@@ -117,9 +160,84 @@ def create_product(
         is_active=body.is_active,
     )
     db.add(p)
-    db.commit()
+    _commit_product(db)
+    catalog_cache.invalidate()
     db.refresh(p)
-    return _product_to_out(p)
+    return ORJSONResponse(content=product_to_dict(p, public_url_prefix()))
+
+
+def _commit_product(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if e.orig.diag.constraint_name == "uq_products_seller_sku":
+            raise HTTPException(status_code=409, detail="SKU already in use") from e
+        raise
+
+
+@router.post("/products/import", response_model=ProductImportOut)
+async def import_seller_products(
+    request: Request,
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+    format: ImportFormat | None = None,  # noqa: A002
+) -> Response:
+    """
+    Create or update products in bulk from a CSV (header row) or NDJSON body,
+    keyed by `sku`. The format comes from `?format=` or the Content-Type.
+    Returns the import job with its per-row error report.
+    """
+    seller = await run_in_threadpool(_ensure_seller_profile, db, user.id)
+    if not seller:
+        raise HTTPException(status_code=403, detail="Seller profile required")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415, detail="Send text/csv or application/x-ndjson, or set ?format="
+        )
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.product_import_max_bytes:
+                raise HTTPException(status_code=413, detail="Upload too large")
+            upload.write(chunk)
+        upload.seek(0)
+        job = await run_in_threadpool(import_products, db, seller.id, fmt, upload)
+    return ORJSONResponse(content=product_import_to_dict(job))
+
+
+@router.get("/products/imports/{import_id}", response_model=ProductImportOut)
+def get_product_import(
+    import_id: int,
+    user: CurrentUser,
+    db: Session = Depends(get_read_db),
+) -> Response:
+    seller = _ensure_seller_profile(db, user.id)
+    job = db.get(ProductImport, import_id)
+    if not seller or not job or job.seller_id != seller.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return ORJSONResponse(content=product_import_to_dict(job))
+
+
+@router.patch("/products:batch", response_model=ProductBatchUpdateResponse)
+def update_products_batch(
+    body: ProductBatchUpdateRequest,
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Update up to 1000 of the seller's products at once, e.g. price and stock
+    from an ERP sync. Items that are not the seller's come back `not_found`;
+    the rest are applied together.
+    """
+    seller = _ensure_seller_profile(db, user.id)
+    if not seller:
+        raise HTTPException(status_code=403, detail="Seller profile required")
+    return ORJSONResponse(content=batch_update_products(db, seller.id, body.items))
 
 
 @router.patch("/products/{product_id}", response_model=ProductOut)
@@ -128,12 +246,12 @@ def update_product(
     body: ProductUpdate,
     user: CurrentUser,
     db: Session = Depends(get_db),
-) -> ProductOut:
+) -> Response:
     seller = _ensure_seller_profile(db, user.id)
     if not seller:
         raise HTTPException(status_code=403, detail="Seller profile required")
 
-    p = db.get(Product, product_id)
+    p = db.get(Product, product_id, options=[selectinload(Product.images)])
     if not p or p.seller_id != seller.id:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -143,9 +261,11 @@ def update_product(
         setattr(p, field, value)
 
     db.add(p)
-    db.commit()
+    _commit_product(db)
+    catalog_cache.invalidate()
     db.refresh(p)
-    return _product_to_out(p)
+    held = held_quantities(db, [p.id]).get(p.id, 0)
+    return ORJSONResponse(content=product_to_dict(p, public_url_prefix(), held))
 
 
 @router.post("/products/{product_id}/images/presign", response_model=PresignResponse)
@@ -172,13 +292,43 @@ def presign_product_image_upload(
     )
 
 
+@router.post("/products/{product_id}/images/presign-batch", response_model=PresignBatchResponse)
+def presign_product_image_uploads(
+    product_id: int,
+    body: PresignBatchRequest,
+    user: CurrentUser,
+    db: Session = Depends(get_db),
+) -> PresignBatchResponse:
+    """Presign every photo of a product in one round trip (up to 20)."""
+    seller = _ensure_seller_profile(db, user.id)
+    if not seller:
+        raise HTTPException(status_code=403, detail="Seller profile required")
+
+    p = db.get(Product, product_id)
+    if not p or p.seller_id != seller.id:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    uploads = []
+    for f in body.files:
+        s3_key = build_s3_key(product_id=p.id, filename=f.filename)
+        uploads.append(
+            PresignResponse(
+                s3_key=s3_key,
+                upload_url=presign_put(s3_key=s3_key, content_type=f.content_type),
+                public_url=public_url_for_key(s3_key),
+            )
+        )
+    return PresignBatchResponse(uploads=uploads)
+
+
 @router.post("/products/{product_id}/images/attach", response_model=ProductOut)
 def attach_product_images(
     product_id: int,
     body: AttachImagesRequest,
     user: CurrentUser,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-) -> ProductOut:
+) -> Response:
     seller = _ensure_seller_profile(db, user.id)
     if not seller:
         raise HTTPException(status_code=403, detail="Seller profile required")
@@ -192,12 +342,24 @@ def attach_product_images(
     ).all()
     next_sort = (existing[-1].sort_order + 1) if existing else 0
 
+    images = []
     for key in body.s3_keys:
         img = ProductImage(product_id=p.id, s3_key=key, sort_order=next_sort)
         next_sort += 1
         db.add(img)
+        images.append(img)
 
+    db.flush()
+    image_ids = [img.id for img in images]
     db.commit()
+    catalog_cache.invalidate()
+    # Thumbnails and WebP/AVIF variants are rendered after the response is sent.
+    background_tasks.add_task(derive_images, image_ids)
     db.refresh(p)
-    return _product_to_out(p)
+    held = held_quantities(db, [p.id]).get(p.id, 0)
+    content = product_to_dict(p, public_url_prefix(), held)
+    # Dependency teardown waits for background tasks: hand the connection back
+    # now rather than after every variant is rendered.
+    db.close()
+    return ORJSONResponse(content=content)
 
@@ -1,17 +1,12 @@
 from __future__ import annotations
 
+import orjson
 import stripe
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Header, HTTPException, Request
 
 from app.core.config import settings
-from app.core.db import get_db
-from app.models.order import Order
-from app.models.payment import Payment
-from app.models.product import Product
-from app.models.stripe_event import StripeEvent
+from app.core.db import DbRunner
+from app.services.stripe_inbox import enqueue_event, notify_worker, recent_events
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
@@ -19,66 +14,32 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 @router.post("/stripe")
 async def stripe_webhook(
     request: Request,
+    runner: DbRunner,
     stripe_signature: str | None = Header(default=None, alias="Stripe-Signature"),
-    db: Session = Depends(get_db),
 ) -> dict[str, str]:
+    """
+    Verify and store the event, then acknowledge. Its effects are applied by
+    the inbox worker (app.services.stripe_inbox), so Stripe retry bursts do not
+    hold request workers.
+    """
     if not settings.stripe_webhook_secret:
         raise HTTPException(status_code=500, detail="Stripe webhook not configured")
 
     payload = await request.body()
     try:
-        event = stripe.Webhook.construct_event(
-            payload=payload,
-            sig_header=stripe_signature,
-            secret=settings.stripe_webhook_secret,
+        stripe.WebhookSignature.verify_header(
+            payload, stripe_signature, settings.stripe_webhook_secret
         )
+        event = orjson.loads(payload)
+        event_id = event["id"]
     except Exception as e:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=f"Invalid webhook: {e}") from e
 
-    # Idempotency: store event id (unique)
-    try:
-        db.add(StripeEvent(event_id=event["id"]))
-        db.commit()
-    except IntegrityError:
-        db.rollback()
+    if recent_events.seen(event_id):
         return {"status": "duplicate"}
-
-    if event["type"] == "checkout.session.completed":
-        session_obj = event["data"]["object"]
-        session_id = session_obj.get("id")
-        payment_intent = session_obj.get("payment_intent")
-        order_id = session_obj.get("metadata", {}).get("order_id")
-
-        if not order_id:
-            return {"status": "ignored"}
-
-        order = db.get(Order, int(order_id))
-        if not order:
-            return {"status": "ignored"}
-
-        payment = db.scalar(select(Payment).where(Payment.order_id == order.id))
-        if not payment:
-            payment = Payment(order_id=order.id, stripe_session_id=session_id, status="PAID")
-            db.add(payment)
-        else:
-            payment.stripe_session_id = payment.stripe_session_id or session_id
-            payment.stripe_payment_intent_id = payment_intent
-            payment.status = "PAID"
-            db.add(payment)
-
-        if order.status != "PAID":
-            order.status = "PAID"
-            db.add(order)
-
-            # Reduce stock (best-effort)
-            for it in order.items or []:
-                p = db.get(Product, it.product_id)
-                if p:
-                    p.stock_qty = max(0, p.stock_qty - it.quantity)
-                    db.add(p)
-
-        db.commit()
-        return {"status": "ok"}
-
-    return {"status": "unhandled"}
-
+    queued = await runner.run(enqueue_event, event_id, event.get("type"), event)
+    recent_events.remember(event_id, duplicate=not queued)
+    if not queued:
+        return {"status": "duplicate"}
+    notify_worker()
+    return {"status": "queued"}
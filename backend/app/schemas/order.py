@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+OrderView = Literal["full", "summary"]
+
 
 class AddressIn(BaseModel):
     full_name: str = Field(min_length=1, max_length=200)
@@ -46,3 +49,23 @@ class OrderOut(BaseModel):
     created_at: datetime
     items: list[OrderItemOut]
 
+
+class OrderSummaryOut(BaseModel):
+    id: int
+    seller_id: int
+    status: str
+    currency: str
+    total_cents: int
+    created_at: datetime
+    # Units across all lines, counted in SQL; items are not loaded.
+    item_count: int
+
+
+class OrderPage(BaseModel):
+    items: list[OrderOut]
+    next_cursor: str | None = None
+
+
+class OrderSummaryPage(BaseModel):
+    items: list[OrderSummaryOut]
+    next_cursor: str | None = None
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+ProductSort = Literal["newest", "price_asc", "price_desc"]
+
 
 class ProductCreate(BaseModel):
+    # Seller's own stock-keeping code, unique per seller.
+    sku: str | None = Field(default=None, min_length=1, max_length=100)
     title: str = Field(min_length=1, max_length=200)
     description: str | None = Field(default=None, max_length=4000)
     price_cents: int = Field(ge=0)
@@ -13,6 +20,7 @@ class ProductCreate(BaseModel):
 
 
 class ProductUpdate(BaseModel):
+    sku: str | None = Field(default=None, min_length=1, max_length=100)
     title: str | None = Field(default=None, min_length=1, max_length=200)
     description: str | None = Field(default=None, max_length=4000)
     price_cents: int | None = Field(default=None, ge=0)
@@ -21,25 +29,62 @@ class ProductUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class ProductBatchUpdateItem(BaseModel):
+    id: int
+    fields: ProductUpdate
+
+
+class ProductBatchUpdateRequest(BaseModel):
+    items: list[ProductBatchUpdateItem] = Field(min_length=1, max_length=1000)
+
+
+class ProductBatchUpdateResult(BaseModel):
+    id: int
+    # updated | not_found | invalid
+    status: str
+    detail: str | None = None
+
+
+class ProductBatchUpdateResponse(BaseModel):
+    updated: int
+    results: list[ProductBatchUpdateResult]
+
+
+class ImageVariantOut(BaseModel):
+    url: str
+    width: int
+    format: str
+
+
 class ProductImageOut(BaseModel):
     id: int
     s3_key: str
     sort_order: int
     url: str | None = None
+    # Resized copies, narrowest first (srcset-style); empty until they are built.
+    variants: list[ImageVariantOut] = []
 
 
 class ProductOut(BaseModel):
     id: int
     seller_id: int
+    sku: str | None = None
     title: str
     description: str | None
     price_cents: int
     currency: str
     stock_qty: int
+    # Stock not held by unpaid orders.
+    available_qty: int
     is_active: bool
     images: list[ProductImageOut] = []
 
 
+class ProductPage(BaseModel):
+    items: list[ProductOut]
+    next_cursor: str | None = None
+
+
 class PresignRequest(BaseModel):
     content_type: str = Field(min_length=1, max_length=200)
     filename: str = Field(min_length=1, max_length=512)
@@ -51,6 +96,38 @@ class PresignResponse(BaseModel):
     public_url: str | None = None
 
 
+class PresignBatchRequest(BaseModel):
+    files: list[PresignRequest] = Field(min_length=1, max_length=20)
+
+
+class PresignBatchResponse(BaseModel):
+    uploads: list[PresignResponse]
+
+
 class AttachImagesRequest(BaseModel):
     s3_keys: list[str] = Field(min_length=1)
 
+
+class ProductImportRow(ProductCreate):
+    """A bulk import row: like ProductCreate, but the SKU is the upsert key."""
+
+    sku: str = Field(min_length=1, max_length=100)
+
+
+class ImportRowError(BaseModel):
+    line: int
+    field: str | None = None
+    message: str
+
+
+class ProductImportOut(BaseModel):
+    id: int
+    format: str
+    status: str
+    rows_total: int
+    rows_created: int
+    rows_updated: int
+    rows_failed: int
+    errors: list[ImportRowError]
+    created_at: datetime
+    finished_at: datetime | None = None
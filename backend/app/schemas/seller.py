@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import date
+
 from pydantic import BaseModel, Field
 
 
@@ -13,3 +15,32 @@ class SellerProfileOut(BaseModel):
     store_name: str
     status: str
 
+
+class SalesTotalOut(BaseModel):
+    currency: str
+    units: int
+    revenue_cents: int
+
+
+class DailySalesOut(BaseModel):
+    day: date
+    currency: str
+    units: int
+    revenue_cents: int
+
+
+class ProductSalesOut(BaseModel):
+    product_id: int
+    currency: str
+    orders: int
+    units: int
+    revenue_cents: int
+
+
+class SellerStatsOut(BaseModel):
+    from_date: date
+    to_date: date
+    totals: list[SalesTotalOut]
+    days: list[DailySalesOut]
+    # Best sellers by revenue, at most 20.
+    products: list[ProductSalesOut]
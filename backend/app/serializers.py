@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from app.services.s3 import public_url_prefix
+
+# Serializers accept ORM instances or `Row` results: anything exposing the
+# columns as attributes. They build plain dicts that orjson encodes directly,
+# so list endpoints skip constructing and re-validating Pydantic models.
+# The `app.schemas` models still document the shapes (response_model).
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def product_image_to_dict(img: Any, url_prefix: str | None) -> dict[str, Any]:
+    if url_prefix is None:
+        return {
+            "id": img.id,
+            "s3_key": img.s3_key,
+            "sort_order": img.sort_order,
+            "url": None,
+            "variants": [],
+        }
+    return {
+        "id": img.id,
+        "s3_key": img.s3_key,
+        "sort_order": img.sort_order,
+        "url": f"{url_prefix}{img.s3_key}",
+        "variants": [
+            {"url": f"{url_prefix}{v['key']}", "width": v["width"], "format": v["format"]}
+            for v in (img.variants or [])
+        ],
+    }
+
+
+def product_to_dict(p: Any, url_prefix: str | None = None, held: int = 0) -> dict[str, Any]:
+    return {
+        "id": p.id,
+        "seller_id": p.seller_id,
+        "sku": p.sku,
+        "title": p.title,
+        "description": p.description,
+        "price_cents": p.price_cents,
+        "currency": p.currency,
+        "stock_qty": p.stock_qty,
+        "available_qty": max(p.stock_qty - held, 0),
+        "is_active": p.is_active,
+        "images": [product_image_to_dict(img, url_prefix) for img in (p.images or [])],
+    }
+
+
+def products_to_dicts(
+    products: Iterable[Any], held: Mapping[int, int] | None = None
+) -> list[dict[str, Any]]:
+    url_prefix = public_url_prefix()
+    held = held or {}
+    return [product_to_dict(p, url_prefix, held.get(p.id, 0)) for p in products]
+
+
+def order_item_to_dict(i: Any) -> dict[str, Any]:
+    return {
+        "id": i.id,
+        "product_id": i.product_id,
+        "title": i.title,
+        "unit_price_cents": i.unit_price_cents,
+        "quantity": i.quantity,
+        "line_total_cents": i.line_total_cents,
+    }
+
+
+def order_to_dict(o: Any) -> dict[str, Any]:
+    return {
+        "id": o.id,
+        "buyer_id": o.buyer_id,
+        "seller_id": o.seller_id,
+        "status": o.status,
+        "currency": o.currency,
+        "subtotal_cents": o.subtotal_cents,
+        "total_cents": o.total_cents,
+        "created_at": o.created_at,
+        "items": [order_item_to_dict(i) for i in (o.items or [])],
+    }
+
+
+def product_import_to_dict(job: Any) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "format": job.format,
+        "status": job.status,
+        "rows_total": job.rows_total,
+        "rows_created": job.rows_created,
+        "rows_updated": job.rows_updated,
+        "rows_failed": job.rows_failed,
+        "errors": job.errors,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
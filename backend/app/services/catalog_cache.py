@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class CatalogCache:
+    """
+    Bounded LRU + TTL cache of serialized catalog responses.
+
+    The cache is per process: writes made through this worker invalidate it
+    immediately, writes made through other workers become visible once the
+    TTL expires.
+    """
+
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, CachedPayload]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._invalidated_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidated_within(self, seconds: float) -> bool:
+        return time.monotonic() - self._invalidated_at < seconds
+
+    def get(self, key: Hashable) -> CachedPayload | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, body: bytes, *, generation: int) -> CachedPayload:
+        """
+        Store `body` unless the cache was invalidated after `generation` was read,
+        so a payload built from pre-write rows never outlives the write.
+        """
+        payload = CachedPayload(body=body, etag=etag_for(body))
+        if self.maxsize <= 0:
+            return payload
+        with self._lock:
+            if generation != self._generation:
+                return payload
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return payload
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated_at = time.monotonic()
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.catalog_cache_size,
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+)
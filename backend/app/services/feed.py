@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from typing import Any, Literal
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.replicas import read_session
+from app.models.product import Product
+from app.models.product_image import ProductImage
+from app.models.stock_reservation import StockReservation
+from app.services.s3 import public_url_prefix
+
+logger = logging.getLogger(__name__)
+
+FeedFormat = Literal["ndjson", "csv.gz"]
+
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "csv.gz": "application/gzip"}
+
+CSV_COLUMNS = [
+    "id",
+    "seller_id",
+    "sku",
+    "title",
+    "description",
+    "price_cents",
+    "currency",
+    "available_qty",
+    "image_url",
+    "additional_image_urls",
+]
+
+
+class FeedMetrics:
+    """Per-process feed export counters and the last export's throughput (/health/feed)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._exports = 0
+        self._failed = 0
+        self._last: dict[str, Any] = {}
+
+    def record(self, fmt: str, rows: int, seconds: float, *, failed: bool) -> None:
+        with self._lock:
+            self._exports += 1
+            self._failed += failed
+            self._last = {
+                "format": fmt,
+                "rows": rows,
+                "seconds": round(seconds, 2),
+                "rows_per_second": round(rows / seconds) if seconds else 0,
+                "completed": not failed,
+            }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"exports": self._exports, "failed": self._failed, "last": dict(self._last)}
+
+
+feed_metrics = FeedMetrics()
+
+
+def _feed_query():
+    """
+    Every active product with its image keys (in display order) and unheld
+    stock, in one pass: both are correlated lookups on indexed child rows, so
+    rows can be streamed as soon as they are produced.
+    """
+    image_keys = (
+        select(
+            func.array_agg(aggregate_order_by(ProductImage.s3_key, ProductImage.sort_order))
+        )
+        .where(ProductImage.product_id == Product.id)
+        .scalar_subquery()
+    )
+    held = (
+        select(func.coalesce(func.sum(StockReservation.quantity), 0))
+        .where(
+            StockReservation.product_id == Product.id,
+            StockReservation.status == "HELD",
+            StockReservation.expires_at > func.now(),
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Product.id,
+            Product.seller_id,
+            Product.sku,
+            Product.title,
+            Product.description,
+            Product.price_cents,
+            Product.currency,
+            func.greatest(Product.stock_qty - held, 0).label("available_qty"),
+            image_keys.label("image_keys"),
+        )
+        .where(Product.is_active == True)  # noqa: E712
+        .order_by(Product.id)
+    )
+
+
+def iter_feed_rows(db: Session) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield the catalog in batches of FEED_BATCH_SIZE rows. Rows come from a
+    server-side cursor, so only one batch is in memory at a time.
+    """
+    url_prefix = public_url_prefix()
+    result = db.execute(_feed_query().execution_options(yield_per=settings.feed_batch_size))
+    for partition in result.mappings().partitions():
+        batch = []
+        for row in partition:
+            item = dict(row)
+            keys = item.pop("image_keys") or []
+            item["image_urls"] = [f"{url_prefix}/{k}" for k in keys] if url_prefix else []
+            batch.append(item)
+        yield batch
+
+
+def _ndjson_chunks(batches: Iterator[list[dict[str, Any]]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(item) + b"\n" for item in batch)
+
+
+def _csv_gz_chunks(batches: Iterator[list[dict[str, Any]]]) -> Iterator[bytes]:
+    # wbits=31: gzip container, so the output is a regular .csv.gz file.
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    for batch in batches:
+        for item in batch:
+            urls = item["image_urls"]
+            writer.writerow(
+                [
+                    item["id"],
+                    item["seller_id"],
+                    item["sku"] or "",
+                    item["title"],
+                    item["description"] or "",
+                    item["price_cents"],
+                    item["currency"],
+                    item["available_qty"],
+                    urls[0] if urls else "",
+                    ",".join(urls[1:]),
+                ]
+            )
+        chunk = gz.compress(buf.getvalue().encode("utf-8"))
+        buf.seek(0)
+        buf.truncate()
+        if chunk:
+            yield chunk
+    tail = gz.compress(buf.getvalue().encode("utf-8")) + gz.flush()
+    if tail:
+        yield tail
+
+
+def stream_feed(fmt: FeedFormat) -> Iterator[bytes]:
+    """
+    Encoded feed chunks on a session of its own (on a read replica when one is
+    up), which stays open for as long as the consumer keeps reading. Throughput is logged and kept in
+    `feed_metrics` whether or not the export finishes.
+    """
+    rows = 0
+    failed = True
+    start = time.perf_counter()
+
+    def counted(batches: Iterator[list[dict[str, Any]]]) -> Iterator[list[dict[str, Any]]]:
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    try:
+        with read_session() as db:
+            batches = counted(iter_feed_rows(db))
+            yield from _ndjson_chunks(batches) if fmt == "ndjson" else _csv_gz_chunks(batches)
+        failed = False
+    finally:
+        elapsed = time.perf_counter() - start
+        feed_metrics.record(fmt, rows, elapsed, failed=failed)
+        logger.info(
+            "Feed export (%s): %d rows in %.1fs (%d rows/s)%s",
+            fmt,
+            rows,
+            elapsed,
+            rows / elapsed if elapsed else 0,
+            "" if not failed else ", incomplete",
+        )
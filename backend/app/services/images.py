@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import posixpath
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.product_image import ProductImage
+from app.services.catalog_cache import catalog_cache
+from app.services.s3 import get_object_bytes, put_object_bytes
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+_pool: ProcessPoolExecutor | None = None
+# Background tasks ask for the pool from threadpool threads.
+_pool_lock = threading.Lock()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the API process runs threads (threadpool, DB
+            # pool, inbox workers) whose held locks a forked child would inherit.
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.image_workers or None,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_variants(
+    original: bytes, widths: list[int], formats: list[str], quality: int
+) -> list[tuple[int, str, bytes]]:
+    """
+    Resize `original` to each width (never upscaling) and encode it in each
+    format. Runs in a worker process: CPU-bound and free of app state.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(original)) as src:
+        img = ImageOps.exif_transpose(src)
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    out: list[tuple[int, str, bytes]] = []
+    targets = sorted({min(w, img.width) for w in widths})
+    for width in targets:
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            buf = io.BytesIO()
+            resized.save(buf, format=fmt.upper(), quality=quality)
+            out.append((width, fmt, buf.getvalue()))
+    return out
+
+
+def variant_key(s3_key: str, width: int, fmt: str) -> str:
+    """products/1/abc.jpg -> products/1/abc/w320.webp"""
+    stem, _ = posixpath.splitext(s3_key)
+    return f"{stem}/w{width}.{fmt}"
+
+
+def _formats() -> list[str]:
+    formats = ["webp"]
+    if settings.image_avif:
+        from PIL import features
+
+        if features.check("avif"):
+            formats.append("avif")
+    return formats
+
+
+def _store_variants(s3_key: str, future: Future) -> list[dict[str, Any]] | None:
+    """
+    Upload a finished render. Returns the variant list to record: empty when
+    the original is not a readable image, None when it should be retried.
+    """
+    try:
+        rendered = future.result()
+    except BrokenProcessPool:
+        logger.warning("Image worker died while rendering %s", s3_key)
+        shutdown_pool()
+        return None
+    except Exception:  # noqa: BLE001
+        logger.warning("Could not render variants for %s", s3_key, exc_info=True)
+        return []
+
+    variants = []
+    for width, fmt, data in rendered:
+        key = variant_key(s3_key, width, fmt)
+        try:
+            put_object_bytes(key, data, CONTENT_TYPES[fmt])
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not upload variant %s", key, exc_info=True)
+            return None
+        variants.append({"key": key, "width": width, "format": fmt})
+    return variants
+
+
+def derive_images(image_ids: Iterable[int]) -> int:
+    """
+    Build and record variants for the given images. Meant to run off the
+    request path (BackgroundTasks or the backfill CLI). Originals are fetched
+    here and rendered in parallel in the process pool. Returns how many
+    images got variants recorded.
+    """
+    if not settings.s3_bucket or not settings.image_variant_widths:
+        return 0
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(ProductImage.id, ProductImage.s3_key).where(
+                ProductImage.id.in_(list(image_ids)), ProductImage.variants.is_(None)
+            )
+        ).all()
+
+    formats = _formats()
+    jobs: list[tuple[int, str, Future]] = []
+    for image_id, s3_key in rows:
+        try:
+            original = get_object_bytes(s3_key)
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not fetch original %s", s3_key, exc_info=True)
+            continue
+        future = _process_pool().submit(
+            render_variants,
+            original,
+            settings.image_variant_widths,
+            formats,
+            settings.image_quality,
+        )
+        jobs.append((image_id, s3_key, future))
+
+    done = 0
+    for image_id, s3_key, future in jobs:
+        variants = _store_variants(s3_key, future)
+        if variants is None:
+            continue
+        with SessionLocal() as db:
+            db.execute(
+                update(ProductImage).where(ProductImage.id == image_id).values(variants=variants)
+            )
+            db.commit()
+        done += 1
+
+    if done:
+        catalog_cache.invalidate()
+    return done
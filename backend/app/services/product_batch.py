@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Column, select, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.schemas.product import ProductBatchUpdateItem
+from app.services.catalog_cache import catalog_cache
+
+# Columns a batch may not set to null.
+_REQUIRED = {"title", "price_cents", "currency", "stock_qty", "is_active"}
+
+
+def batch_update_products(
+    db: Session, seller_id: int, items: list[ProductBatchUpdateItem]
+) -> dict[str, Any]:
+    """
+    Apply many product updates for one seller in a single transaction.
+    Ownership is checked, and the rows locked, with one query; items changing
+    the same set of fields share one UPDATE ... FROM (VALUES ...). Results come
+    back in request order and the catalog cache is invalidated once.
+    """
+    ids = [item.id for item in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Each product may appear once per batch")
+
+    # Every owned row is locked here, once and in id order like the order path
+    # locks them, so a batch and concurrent orders queue instead of deadlocking.
+    owned = set(
+        db.scalars(
+            select(Product.id)
+            .where(Product.id.in_(ids), Product.seller_id == seller_id)
+            .order_by(Product.id)
+            .with_for_update()
+        ).all()
+    )
+
+    results: dict[int, dict[str, Any]] = {}
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for item in items:
+        changes = item.fields.model_dump(exclude_unset=True)
+        if item.id not in owned:
+            results[item.id] = {"id": item.id, "status": "not_found", "detail": None}
+            continue
+        nulls = sorted(name for name, value in changes.items() if value is None and name in _REQUIRED)
+        if nulls:
+            detail = f"Cannot be null: {', '.join(nulls)}"
+            results[item.id] = {"id": item.id, "status": "invalid", "detail": detail}
+            continue
+        if changes.get("currency"):
+            changes["currency"] = changes["currency"].upper()
+        results[item.id] = {"id": item.id, "status": "updated", "detail": None}
+        if changes:
+            groups.setdefault(tuple(sorted(changes)), []).append({"id": item.id, **changes})
+
+    try:
+        for fields, rows in groups.items():
+            _update_from_values(db, fields, rows)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if e.orig.diag.constraint_name == "uq_products_seller_sku":
+            raise HTTPException(status_code=409, detail="SKU already in use") from e
+        raise
+    if groups:
+        catalog_cache.invalidate()
+
+    ordered = [results[item.id] for item in items]
+    return {
+        "updated": sum(1 for r in ordered if r["status"] == "updated"),
+        "results": ordered,
+    }
+
+
+def _update_from_values(db: Session, fields: tuple[str, ...], rows: list[dict[str, Any]]) -> None:
+    columns = Product.__table__.c
+    data = values(
+        Column("id", columns.id.type),
+        *(Column(name, columns[name].type) for name in fields),
+        name="v",
+    ).data([tuple(row.get(name) for name in ("id", *fields)) for row in rows])
+    db.execute(
+        update(Product)
+        .where(Product.id == data.c.id)
+        .values({name: data.c[name] for name in fields})
+    )
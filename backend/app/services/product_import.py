@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from collections.abc import Iterator
+from itertools import islice
+from typing import IO, Any, Literal
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import distinct_on, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.product_import import ProductImport
+from app.schemas.product import ProductImportRow
+from app.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# (line, fields or None, problem) per record in the upload.
+Record = tuple[int, dict[str, Any] | None, str | None]
+
+# Per-transaction scratch table: valid rows are COPYed here, then upserted into
+# products in one statement. Dropped on commit.
+_staging = Table(
+    "product_import_staging",
+    MetaData(),
+    Column("line", Integer(), nullable=False),
+    Column("sku", String(100), nullable=False),
+    Column("title", String(200), nullable=False),
+    Column("description", String(4000)),
+    Column("price_cents", Integer(), nullable=False),
+    Column("currency", String(3), nullable=False),
+    Column("stock_qty", Integer(), nullable=False),
+    Column("is_active", Boolean(), nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+_STAGING_COLUMNS = [c.name for c in _staging.columns]
+_UPDATED_COLUMNS = ["title", "description", "price_cents", "currency", "stock_qty", "is_active"]
+
+
+def _csv_records(upload: IO[bytes]) -> Iterator[Record]:
+    reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""))
+    for record in reader:
+        # Empty cells fall back to the field defaults; cells past the header are dropped.
+        fields = {k: v for k, v in record.items() if k is not None and v not in ("", None)}
+        yield reader.line_num, fields, None
+
+
+def _ndjson_records(upload: IO[bytes]) -> Iterator[Record]:
+    for line, raw in enumerate(upload, start=1):
+        if not raw.strip():
+            continue
+        try:
+            fields = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            yield line, None, "Invalid JSON"
+            continue
+        if not isinstance(fields, dict):
+            yield line, None, "Expected a JSON object"
+            continue
+        yield line, fields, None
+
+
+def _validate(
+    chunk: list[Record], errors: list[dict[str, Any]]
+) -> tuple[list[tuple[Any, ...]], int]:
+    """Staging rows for the valid records; problems are appended to `errors`."""
+    rows: list[tuple[Any, ...]] = []
+    failed = 0
+    for line, fields, problem in chunk:
+        if problem is None:
+            try:
+                row = ProductImportRow.model_validate(fields)
+            except ValidationError as e:
+                failed += 1
+                for err in e.errors():
+                    field = ".".join(str(part) for part in err["loc"]) or None
+                    _add_error(errors, line, field, err["msg"])
+                continue
+            rows.append(
+                (
+                    line,
+                    row.sku,
+                    row.title,
+                    row.description,
+                    row.price_cents,
+                    row.currency.upper(),
+                    row.stock_qty,
+                    row.is_active,
+                )
+            )
+        else:
+            failed += 1
+            _add_error(errors, line, None, problem)
+    return rows, failed
+
+
+def _add_error(errors: list[dict[str, Any]], line: int, field: str | None, message: str) -> None:
+    if len(errors) < settings.product_import_max_errors:
+        errors.append({"line": line, "field": field, "message": message})
+
+
+def _copy_rows(db: Session, rows: list[tuple[Any, ...]]) -> None:
+    # COPY goes through the psycopg connection underneath the session, inside
+    # the session's transaction.
+    raw = db.connection().connection.driver_connection
+    columns = ", ".join(_STAGING_COLUMNS)
+    with raw.cursor() as cur, cur.copy(f"COPY {_staging.name} ({columns}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _upsert_staged(db: Session, seller_id: int) -> tuple[int, int]:
+    """
+    Insert or update the seller's products from the staging table. A SKU that
+    appears on several lines takes its last line. Returns (created, updated).
+    """
+    latest = (
+        select(
+            literal(seller_id),
+            *(_staging.c[name] for name in _STAGING_COLUMNS if name != "line"),
+        )
+        .ext(distinct_on(_staging.c.sku))
+        .order_by(_staging.c.sku, _staging.c.line.desc())
+    )
+    stmt = insert(Product).from_select(
+        ["seller_id", *(name for name in _STAGING_COLUMNS if name != "line")], latest
+    )
+    upserted = (
+        stmt.on_conflict_do_update(
+            index_elements=["seller_id", "sku"],
+            index_where=Product.sku.is_not(None),
+            set_={
+                **{name: stmt.excluded[name] for name in _UPDATED_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+        # xmax is 0 only on freshly inserted row versions.
+        .returning(literal_column("xmax = 0").label("created"))
+        .cte("upserted")
+    )
+    created, total = db.execute(
+        select(
+            func.count().filter(upserted.c.created),
+            func.count(),
+        ).select_from(upserted)
+    ).one()
+    return created, total - created
+
+
+def _load(db: Session, seller_id: int, fmt: ImportFormat, upload: IO[bytes]) -> dict[str, Any]:
+    records = _csv_records(upload) if fmt == "csv" else _ndjson_records(upload)
+    _staging.create(db.connection())
+
+    report: dict[str, Any] = {"rows_total": 0, "rows_failed": 0, "errors": []}
+    while chunk := list(islice(records, settings.product_import_chunk_rows)):
+        rows, failed = _validate(chunk, report["errors"])
+        report["rows_total"] += len(chunk)
+        report["rows_failed"] += failed
+        if rows:
+            _copy_rows(db, rows)
+
+    report["rows_created"], report["rows_updated"] = _upsert_staged(db, seller_id)
+    return report
+
+
+def import_products(
+    db: Session, seller_id: int, fmt: ImportFormat, upload: IO[bytes]
+) -> ProductImport:
+    """
+    Load a seller's CSV or NDJSON upload, `PRODUCT_IMPORT_CHUNK_ROWS` records
+    at a time: each chunk is validated and its valid rows are COPYed into a
+    staging table, then all of them are upserted on (seller_id, sku) at once.
+    Invalid rows are reported and skipped; valid ones land in one transaction.
+    The job row is committed first so the outcome is recorded either way.
+    """
+    job = ProductImport(seller_id=seller_id, format=fmt, status="RUNNING", errors=[])
+    db.add(job)
+    db.commit()
+
+    try:
+        report = _load(db, seller_id, fmt, upload)
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        _finish(db, job, status="FAILED", errors=[{"line": 0, "field": None, "message": str(e)}])
+        raise HTTPException(status_code=400, detail=f"Could not read upload: {e}") from e
+    except Exception:
+        db.rollback()
+        logger.exception("Product import %s failed", job.id)
+        _finish(db, job, status="FAILED")
+        raise
+
+    _finish(db, job, status="DONE", **report)
+    if report["rows_created"] or report["rows_updated"]:
+        catalog_cache.invalidate()
+    return job
+
+
+def _finish(db: Session, job: ProductImport, *, status: str, **fields: Any) -> None:
+    job.status = status
+    job.finished_at = func.now()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+
+from sqlalchemy import ColumnElement, ScalarSelect, and_, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.order import Order
+from app.models.stock_reservation import StockReservation
+
+logger = logging.getLogger(__name__)
+
+# Stripe requires a Checkout Session to stay open for at least 30 minutes, so
+# starting checkout stretches the holds to cover the whole session.
+CHECKOUT_HOLD = timedelta(minutes=31)
+
+
+def _live_hold():
+    return and_(StockReservation.status == "HELD", StockReservation.expires_at > func.now())
+
+
+def held_quantities(db: Session, product_ids: Iterable[int]) -> dict[int, int]:
+    """Units held by unexpired reservations, per product (index-only scan)."""
+    ids = sorted(set(product_ids))
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(StockReservation.product_id, func.sum(StockReservation.quantity))
+        .where(StockReservation.product_id.in_(ids), _live_hold())
+        .group_by(StockReservation.product_id)
+    ).all()
+    return {product_id: int(total) for product_id, total in rows}
+
+
+def held_for_product(product_id: ColumnElement[int]) -> ScalarSelect[int]:
+    """Correlated sum of the live holds on `product_id`, for use inside a query."""
+    return (
+        select(func.coalesce(func.sum(StockReservation.quantity), 0))
+        .where(StockReservation.product_id == product_id, _live_hold())
+        .scalar_subquery()
+    )
+
+
+def place_holds(db: Session, order_id: int, quantities: Mapping[int, int]) -> None:
+    """Hold stock for `order_id`. The caller must have locked the product rows."""
+    expires_at = func.now() + timedelta(seconds=settings.reservation_ttl_seconds)
+    db.execute(
+        insert(StockReservation).values(expires_at=expires_at),
+        [
+            {"order_id": order_id, "product_id": product_id, "quantity": quantity, "status": "HELD"}
+            for product_id, quantity in sorted(quantities.items())
+        ],
+    )
+
+
+def extend_holds(db: Session, order_id: int, duration: timedelta) -> datetime | None:
+    """
+    Keep the order's live holds for at least `duration` from now. Returns the new
+    expiry, or None when the holds have already lapsed.
+    """
+    expiries = db.scalars(
+        update(StockReservation)
+        .where(StockReservation.order_id == order_id, _live_hold())
+        .values(expires_at=func.greatest(StockReservation.expires_at, func.now() + duration))
+        .returning(StockReservation.expires_at)
+    ).all()
+    return min(expiries) if expiries else None
+
+
+def commit_holds(db: Session, order_id: int) -> int:
+    """
+    Mark the order's holds as consumed; the caller decrements stock in the same
+    transaction. Returns how many holds were still live.
+    """
+    return len(
+        db.scalars(
+            update(StockReservation)
+            .where(StockReservation.order_id == order_id, StockReservation.status == "HELD")
+            .values(status="COMMITTED")
+            .returning(StockReservation.id)
+        ).all()
+    )
+
+
+def release_expired(db: Session, *, batch_size: int) -> int:
+    """
+    Release one batch of expired holds and expire the unpaid orders they
+    belonged to, plus unpaid orders left without any hold. Rows locked by a
+    concurrent sweeper or webhook are skipped, so several processes can sweep
+    at once. Returns the size of the larger of the two batches.
+    """
+    expired_holds = (
+        select(StockReservation.id)
+        .where(StockReservation.status == "HELD", StockReservation.expires_at <= func.now())
+        .order_by(StockReservation.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    released = db.scalars(
+        update(StockReservation)
+        .where(StockReservation.id.in_(expired_holds.scalar_subquery()))
+        .values(status="RELEASED")
+        .returning(StockReservation.order_id)
+    ).all()
+    if released:
+        # The webhook locks the order before its holds; skipping locked orders
+        # keeps the opposite lock order here from deadlocking with it. Orders
+        # skipped now are picked up as stale below on a later sweep.
+        unpaid = (
+            select(Order.id)
+            .where(Order.id.in_(sorted(set(released))), Order.status == "PENDING_PAYMENT")
+            .with_for_update(skip_locked=True)
+        )
+        db.execute(
+            update(Order).where(Order.id.in_(unpaid.scalar_subquery())).values(status="EXPIRED")
+        )
+
+    # Unpaid orders with no holds left, e.g. placed before reservations existed.
+    has_hold = exists().where(
+        StockReservation.order_id == Order.id, StockReservation.status == "HELD"
+    )
+    stale_orders = (
+        select(Order.id)
+        .where(
+            Order.status == "PENDING_PAYMENT",
+            Order.created_at <= func.now() - timedelta(seconds=settings.reservation_ttl_seconds),
+            ~has_hold,
+        )
+        .order_by(Order.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    stale = db.scalars(
+        update(Order)
+        .where(Order.id.in_(stale_orders.scalar_subquery()))
+        .values(status="EXPIRED")
+        .returning(Order.id)
+    ).all()
+
+    db.commit()
+    return max(len(released), len(stale))
+
+
+def sweep_expired(batch_size: int) -> int:
+    """Run `release_expired` until both of its batches come back short."""
+    total = 0
+    with SessionLocal() as db:
+        while True:
+            changed = release_expired(db, batch_size=batch_size)
+            total += changed
+            if changed < batch_size:
+                return total
+
+
+async def keep_sweeping(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(sweep_expired, settings.reservation_sweep_batch_size)
+        except Exception:  # noqa: BLE001
+            logger.warning("Reservation sweep failed", exc_info=True)
@@ -2,18 +2,33 @@ from __future__ import annotations
 
 import os
 import uuid
+from functools import lru_cache
 
 import boto3
+from botocore.config import Config
 
 from app.core.config import settings
+from app.core.metrics import timed_call
 
 
+@lru_cache(maxsize=1)
 def _s3_client():
-    return boto3.client(
+    """
+    One client per process: building one resolves credentials and loads the
+    service model, which costs far more than signing a URL. Clients are
+    thread-safe; the default boto3 session is not, so use a private one.
+    """
+    config = Config(signature_version="s3v4")
+    if settings.aws_endpoint_url:
+        # MinIO and most S3-compatible servers only support path-style URLs.
+        config = config.merge(Config(s3={"addressing_style": "path"}))
+    return boto3.session.Session().client(
         "s3",
         region_name=settings.s3_region,
+        endpoint_url=settings.aws_endpoint_url,
         aws_access_key_id=settings.aws_access_key_id,
         aws_secret_access_key=settings.aws_secret_access_key,
+        config=config,
     )
 
 
@@ -27,29 +42,60 @@ def presign_put(*, s3_key: str, content_type: str, expires_seconds: int = 900) -
     if not settings.s3_bucket or not settings.s3_region:
         raise RuntimeError("S3 is not configured. Set S3_BUCKET and S3_REGION.")
 
-    client = _s3_client()
-    return client.generate_presigned_url(
-        ClientMethod="put_object",
-        Params={
-            "Bucket": settings.s3_bucket,
-            "Key": s3_key,
-            "ContentType": content_type,
-        },
-        ExpiresIn=expires_seconds,
-    )
+    with timed_call("s3", "presign_put"):
+        return _s3_client().generate_presigned_url(
+            ClientMethod="put_object",
+            Params={
+                "Bucket": settings.s3_bucket,
+                "Key": s3_key,
+                "ContentType": content_type,
+            },
+            ExpiresIn=expires_seconds,
+        )
 
 
-def public_url_for_key(s3_key: str) -> str | None:
+def get_object_bytes(s3_key: str) -> bytes:
+    with timed_call("s3", "get_object"):
+        return _s3_client().get_object(Bucket=settings.s3_bucket, Key=s3_key)["Body"].read()
+
+
+def put_object_bytes(s3_key: str, data: bytes, content_type: str) -> None:
+    # Derived keys are never rewritten, so clients and CDNs may cache forever.
+    with timed_call("s3", "put_object"):
+        _s3_client().put_object(
+            Bucket=settings.s3_bucket,
+            Key=s3_key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+
+@lru_cache(maxsize=1)
+def public_url_prefix() -> str | None:
     """
-    If your bucket is public (or fronted by CloudFront), this URL will resolve.
-    For private buckets you should serve via signed GET or a CDN.
+    Base URL that object keys are appended to; computed once per process since
+    it only depends on settings.
     """
     if not settings.s3_bucket or not settings.s3_region:
         return None
 
     region = settings.s3_region
     bucket = settings.s3_bucket
+    if settings.aws_endpoint_url:
+        return f"{settings.aws_endpoint_url.rstrip('/')}/{bucket}/"
     if region == "us-east-1":
-        return f"https://{bucket}.s3.amazonaws.com/{s3_key}"
-    return f"https://{bucket}.s3.{region}.amazonaws.com/{s3_key}"
+        return f"https://{bucket}.s3.amazonaws.com/"
+    return f"https://{bucket}.s3.{region}.amazonaws.com/"
+
+
+def public_url_for_key(s3_key: str) -> str | None:
+    """
+    If your bucket is public (or fronted by CloudFront), this URL will resolve.
+    For private buckets you should serve via signed GET or a CDN.
+    """
+    prefix = public_url_prefix()
+    if prefix is None:
+        return None
+    return f"{prefix}{s3_key}"
 
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Date, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.seller_daily_sales import SellerDailySales
+
+
+def roll_up_orders(db: Session, order_ids: Sequence[int]) -> None:
+    """
+    Add the items of the given PAID orders to seller_daily_sales and mark the
+    orders as counted, in one statement and without committing. Orders that
+    are not PAID or were already counted are skipped, so calling this twice is
+    harmless. Callers hold the orders' row locks.
+    """
+    if not order_ids:
+        return
+    marked = (
+        update(Order)
+        .where(
+            Order.id.in_(order_ids),
+            Order.status == "PAID",
+            Order.sales_rolled_up_at.is_(None),
+        )
+        .values(sales_rolled_up_at=func.now())
+        .returning(Order.id, Order.seller_id, Order.currency, Order.created_at)
+        .cte("marked")
+    )
+    day = cast(func.timezone("UTC", marked.c.created_at), Date)
+    totals = (
+        select(
+            marked.c.seller_id,
+            day,
+            OrderItem.product_id,
+            marked.c.currency,
+            func.count(func.distinct(marked.c.id)),
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.line_total_cents),
+        )
+        .join(OrderItem, OrderItem.order_id == marked.c.id)
+        .group_by(marked.c.seller_id, day, OrderItem.product_id, marked.c.currency)
+        # Rollup rows are locked in key order, so concurrent payments and the
+        # backfill queue behind each other instead of deadlocking.
+        .order_by(marked.c.seller_id, day, OrderItem.product_id, marked.c.currency)
+    )
+    stmt = insert(SellerDailySales).from_select(
+        ["seller_id", "day", "product_id", "currency", "orders", "units", "revenue_cents"],
+        totals,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["seller_id", "day", "product_id", "currency"],
+            set_={
+                "orders": SellerDailySales.orders + stmt.excluded.orders,
+                "units": SellerDailySales.units + stmt.excluded.units,
+                "revenue_cents": SellerDailySales.revenue_cents + stmt.excluded.revenue_cents,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def backfill_batch(db: Session, *, batch_size: int) -> int:
+    """
+    Roll up one batch of paid orders that were never counted (paid before the
+    rollup existed) and commit. Returns how many orders were counted. Safe
+    alongside the webhook: orders it is paying are skipped, and they are
+    counted by the webhook itself.
+    """
+    ids = db.scalars(
+        select(Order.id)
+        .where(Order.status == "PAID", Order.sales_rolled_up_at.is_(None))
+        .order_by(Order.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    roll_up_orders(db, ids)
+    db.commit()
+    return len(ids)
+
+
+def seller_stats(
+    db: Session, seller_id: int, start: date, end: date, *, top_products: int = 20
+) -> dict[str, Any]:
+    """Totals, a per-day series and the best-selling products, from the rollup only."""
+    in_range = (
+        SellerDailySales.seller_id == seller_id,
+        SellerDailySales.day >= start,
+        SellerDailySales.day <= end,
+    )
+    days = db.execute(
+        select(
+            SellerDailySales.day,
+            SellerDailySales.currency,
+            func.sum(SellerDailySales.units).label("units"),
+            func.sum(SellerDailySales.revenue_cents).label("revenue_cents"),
+        )
+        .where(*in_range)
+        .group_by(SellerDailySales.day, SellerDailySales.currency)
+        .order_by(SellerDailySales.day, SellerDailySales.currency)
+    ).mappings()
+    products = db.execute(
+        select(
+            SellerDailySales.product_id,
+            SellerDailySales.currency,
+            func.sum(SellerDailySales.orders).label("orders"),
+            func.sum(SellerDailySales.units).label("units"),
+            func.sum(SellerDailySales.revenue_cents).label("revenue_cents"),
+        )
+        .where(*in_range)
+        .group_by(SellerDailySales.product_id, SellerDailySales.currency)
+        .order_by(func.sum(SellerDailySales.revenue_cents).desc(), SellerDailySales.product_id)
+        .limit(top_products)
+    ).mappings()
+
+    day_rows = [
+        {
+            "day": r["day"],
+            "currency": r["currency"],
+            "units": int(r["units"]),
+            "revenue_cents": int(r["revenue_cents"]),
+        }
+        for r in days
+    ]
+    totals: dict[str, dict[str, Any]] = {}
+    for r in day_rows:
+        t = totals.setdefault(
+            r["currency"], {"currency": r["currency"], "units": 0, "revenue_cents": 0}
+        )
+        t["units"] += r["units"]
+        t["revenue_cents"] += r["revenue_cents"]
+    return {
+        "from_date": start,
+        "to_date": end,
+        "totals": list(totals.values()),
+        "days": day_rows,
+        "products": [
+            {
+                "product_id": r["product_id"],
+                "currency": r["currency"],
+                "orders": int(r["orders"]),
+                "units": int(r["units"]),
+                "revenue_cents": int(r["revenue_cents"]),
+            }
+            for r in products
+        ],
+    }
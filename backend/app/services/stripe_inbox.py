@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.stripe_event import StripeEvent
+from app.services.catalog_cache import catalog_cache
+from app.services.reservations import commit_holds
+from app.services.sales_rollup import roll_up_orders
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 3600.0
+
+
+class InboxMetrics:
+    """Per-process counters for the inbox worker, reported by /health/stripe-inbox."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.batches = 0
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def record_batch(
+        self, *, processed: int, retried: int, dead: int, lags_ms: list[float]
+    ) -> None:
+        with self._lock:
+            self.batches += 1
+            self.processed += processed
+            self.retried += retried
+            self.dead_lettered += dead
+            if lags_ms:
+                self.last_lag_ms = lags_ms[-1]
+                self.max_lag_ms = max(self.max_lag_ms, *lags_ms)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            return {
+                "batches": self.batches,
+                "processed": self.processed,
+                "retried": self.retried,
+                "dead_lettered": self.dead_lettered,
+                "processed_per_second": round(self.processed / uptime, 3) if uptime else 0.0,
+                "last_lag_ms": round(self.last_lag_ms, 1),
+                "max_lag_ms": round(self.max_lag_ms, 1),
+            }
+
+
+inbox_metrics = InboxMetrics()
+
+
+class RecentEvents:
+    """
+    Bounded LRU of event ids this process has stored, so Stripe redeliveries
+    are answered without touching the database. A miss is not proof of a new
+    event: the unique index on `event_id` stays the source of truth.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._ids: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.received = 0
+        self.memory_duplicates = 0
+        self.db_duplicates = 0
+
+    def seen(self, event_id: str) -> bool:
+        with self._lock:
+            self.received += 1
+            if event_id in self._ids:
+                self._ids.move_to_end(event_id)
+                self.memory_duplicates += 1
+                return True
+            return False
+
+    def remember(self, event_id: str, *, duplicate: bool) -> None:
+        """Call once the event is committed (or found to be) in the inbox."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if duplicate:
+                self.db_duplicates += 1
+            self._ids[event_id] = None
+            self._ids.move_to_end(event_id)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            duplicates = self.memory_duplicates + self.db_duplicates
+            return {
+                "size": len(self._ids),
+                "maxsize": self.maxsize,
+                "received": self.received,
+                "memory_duplicates": self.memory_duplicates,
+                "db_duplicates": self.db_duplicates,
+                "duplicate_rate": round(duplicates / self.received, 4) if self.received else 0.0,
+            }
+
+
+recent_events = RecentEvents(settings.stripe_recent_events_size)
+
+# Set by the webhook endpoint so the in-process worker wakes up without waiting
+# for its next poll. Created by `keep_draining` on the running loop.
+_wakeup: asyncio.Event | None = None
+
+
+def notify_worker() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def enqueue_event(
+    db: Session, event_id: str, event_type: str | None, payload: dict[str, Any]
+) -> bool:
+    """Store a verified event as PENDING. Returns False if it was already received."""
+    inserted = db.scalar(
+        insert(StripeEvent)
+        .values(event_id=event_id, event_type=event_type, payload=payload)
+        .on_conflict_do_nothing(constraint="uq_stripe_events_event_id")
+        .returning(StripeEvent.id)
+    )
+    db.commit()
+    return inserted is not None
+
+
+def apply_event(db: Session, event: dict[str, Any]) -> tuple[str, bool]:
+    """
+    Apply one event's effects without committing. Returns the outcome and
+    whether product stock changed.
+    """
+    if event.get("type") != "checkout.session.completed":
+        return "unhandled", False
+
+    session_obj = event.get("data", {}).get("object", {})
+    session_id = session_obj.get("id")
+    payment_intent = session_obj.get("payment_intent")
+    order_id = (session_obj.get("metadata") or {}).get("order_id")
+    if not order_id:
+        return "ignored", False
+
+    # Locked so two events for the same order cannot both take its stock.
+    status = db.scalar(select(Order.status).where(Order.id == int(order_id)).with_for_update())
+    if status is None:
+        return "ignored", False
+
+    _upsert_paid_payment(db, int(order_id), session_id, payment_intent)
+
+    stock_changed = status != "PAID"
+    if stock_changed:
+        db.execute(update(Order).where(Order.id == int(order_id)).values(status="PAID"))
+        # Holds become a permanent decrement in this transaction, so available
+        # stock does not move. A payment landing after its holds were released
+        # still takes the stock (best-effort, floored at zero).
+        commit_holds(db, int(order_id))
+        _decrement_stock(db, int(order_id))
+        roll_up_orders(db, [int(order_id)])
+
+    return "ok", stock_changed
+
+
+def _upsert_paid_payment(
+    db: Session, order_id: int, session_id: str | None, payment_intent: str | None
+) -> None:
+    stmt = insert(Payment).values(
+        order_id=order_id,
+        stripe_session_id=session_id,
+        stripe_payment_intent_id=payment_intent,
+        status="PAID",
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_payments_order_id",
+            set_={
+                "stripe_session_id": func.coalesce(
+                    Payment.stripe_session_id, stmt.excluded.stripe_session_id
+                ),
+                "stripe_payment_intent_id": func.coalesce(
+                    stmt.excluded.stripe_payment_intent_id, Payment.stripe_payment_intent_id
+                ),
+                "status": "PAID",
+            },
+        )
+    )
+
+
+def _decrement_stock(db: Session, order_id: int) -> None:
+    """
+    Take the order's quantities off product stock in one statement, floored at
+    zero. Rows are locked in id order first, like `create_order` does, so
+    concurrent payments sharing products cannot deadlock.
+    """
+    quantities = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity).label("quantity"))
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    locked = (
+        select(Product.id)
+        .where(Product.id.in_(select(quantities.c.product_id)))
+        .order_by(Product.id)
+        .with_for_update()
+        .cte("locked")
+    )
+    db.execute(
+        update(Product)
+        .where(Product.id == quantities.c.product_id, Product.id.in_(select(locked.c.id)))
+        .values(stock_qty=func.greatest(Product.stock_qty - quantities.c.quantity, 0))
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(settings.stripe_inbox_backoff_seconds * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def process_batch(db: Session, *, batch_size: int) -> int:
+    """
+    Claim up to `batch_size` due events and apply each in its own savepoint.
+    Rows stay locked until the batch commits, and other workers skip them. A
+    failing event is retried with exponential backoff and moved to DEAD after
+    `STRIPE_INBOX_MAX_ATTEMPTS`. Returns the number of events claimed.
+    """
+    events = db.scalars(
+        select(StripeEvent)
+        .where(StripeEvent.status == "PENDING", StripeEvent.next_attempt_at <= func.now())
+        .order_by(StripeEvent.next_attempt_at, StripeEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        db.rollback()
+        return 0
+
+    now = datetime.now(timezone.utc)
+    processed = retried = dead = 0
+    lags_ms: list[float] = []
+    stock_changed = False
+    for ev in events:
+        ev.attempts += 1
+        try:
+            with db.begin_nested():
+                result, changed = apply_event(db, ev.payload or {})
+        except Exception as e:  # noqa: BLE001
+            ev.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if ev.attempts >= settings.stripe_inbox_max_attempts:
+                ev.status = "DEAD"
+                dead += 1
+                logger.error("Stripe event %s dead-lettered: %s", ev.event_id, ev.last_error)
+            else:
+                ev.next_attempt_at = now + _backoff(ev.attempts)
+                retried += 1
+            continue
+
+        ev.status = "DONE"
+        ev.result = result
+        ev.last_error = None
+        ev.processed_at = now
+        processed += 1
+        stock_changed = stock_changed or changed
+        lags_ms.append((now - ev.created_at).total_seconds() * 1000)
+
+    db.commit()
+    if stock_changed:
+        catalog_cache.invalidate()
+    inbox_metrics.record_batch(processed=processed, retried=retried, dead=dead, lags_ms=lags_ms)
+    return len(events)
+
+
+def drain(batch_size: int) -> int:
+    """Process batches until one comes back short. Returns the events claimed."""
+    total = 0
+    with SessionLocal() as db:
+        while True:
+            claimed = process_batch(db, batch_size=batch_size)
+            total += claimed
+            if claimed < batch_size:
+                return total
+
+
+def requeue_dead(db: Session) -> int:
+    """Give every DEAD event a fresh set of attempts."""
+    rows = db.scalars(
+        update(StripeEvent)
+        .where(StripeEvent.status == "DEAD")
+        .values(status="PENDING", attempts=0, next_attempt_at=func.now())
+        .returning(StripeEvent.id)
+    ).all()
+    db.commit()
+    return len(rows)
+
+
+def backlog(db: Session) -> dict[str, Any]:
+    """Pending/dead counts and the age of the oldest due event."""
+    pending, oldest = db.execute(
+        select(func.count(), func.min(StripeEvent.created_at)).where(
+            StripeEvent.status == "PENDING"
+        )
+    ).one()
+    dead = db.scalar(
+        select(func.count()).select_from(StripeEvent).where(StripeEvent.status == "DEAD")
+    )
+    lag = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    return {"pending": pending, "dead": dead, "oldest_pending_seconds": round(lag, 3)}
+
+
+def prune_events(db: Session, *, older_than: timedelta, batch_size: int) -> int:
+    """
+    Delete one batch of DONE events received before `older_than` ago, oldest
+    first. Commit per batch keeps locks and WAL bursts short on a live table.
+    """
+    doomed = (
+        select(StripeEvent.id)
+        .where(
+            StripeEvent.status == "DONE",
+            StripeEvent.created_at < func.now() - older_than,
+        )
+        .order_by(StripeEvent.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    deleted = db.scalars(
+        delete(StripeEvent)
+        .where(StripeEvent.id.in_(doomed.scalar_subquery()))
+        .returning(StripeEvent.id)
+    ).all()
+    db.commit()
+    return len(deleted)
+
+
+def table_stats(db: Session) -> dict[str, int]:
+    """Planner row estimate and on-disk size (with indexes) of `stripe_events`."""
+    rows, size = db.execute(
+        text(
+            "select reltuples::bigint, pg_total_relation_size(oid) "
+            "from pg_class where oid = 'stripe_events'::regclass"
+        )
+    ).one()
+    return {"rows_estimate": max(rows, 0), "total_bytes": size}
+
+
+async def keep_draining(workers: int, poll_seconds: float) -> None:
+    """
+    Run `workers` drain loops on the threadpool. Each wakes on new events from
+    this process or every `poll_seconds` for events received by other processes
+    and for retries that came due.
+    """
+    global _wakeup
+    _wakeup = wakeup = asyncio.Event()
+
+    async def loop() -> None:
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                await run_in_threadpool(drain, settings.stripe_inbox_batch_size)
+            except Exception:  # noqa: BLE001
+                logger.warning("Stripe inbox drain failed", exc_info=True)
+
+    try:
+        await asyncio.gather(*(loop() for _ in range(workers)))
+    finally:
+        _wakeup = None
@@ -1,22 +1,107 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import requests
 import stripe
 from fastapi import HTTPException
+from requests.adapters import HTTPAdapter
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import timed_call
 from app.models.order import Order
 from app.models.payment import Payment
 
 
+class StripeMetrics:
+    """Per-process call counts and latency per Stripe operation (/health/stripe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ops: dict[str, dict[str, float]] = {}
+
+    @contextmanager
+    def timed(self, operation: str) -> Iterator[None]:
+        start = time.perf_counter()
+        failed = False
+        try:
+            with timed_call("stripe", operation):
+                yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                op = self._ops.setdefault(
+                    operation, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+                )
+                op["calls"] += 1
+                op["errors"] += failed
+                op["total_ms"] += elapsed_ms
+                op["max_ms"] = max(op["max_ms"], elapsed_ms)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": op["calls"],
+                    "errors": op["errors"],
+                    "avg_ms": round(op["total_ms"] / op["calls"], 1),
+                    "max_ms": round(op["max_ms"], 1),
+                }
+                for name, op in self._ops.items()
+            }
+
+
+stripe_metrics = StripeMetrics()
+
+
+@lru_cache(maxsize=1)
+def _http_client() -> stripe.HTTPClient:
+    """
+    One keep-alive connection pool for every Stripe call in the process.
+    Without a shared session the SDK opens a session per thread, and every
+    threadpool worker pays its own TLS handshake.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.stripe_http_pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return stripe.RequestsClient(
+        timeout=(settings.stripe_connect_timeout_seconds, settings.stripe_read_timeout_seconds),
+        session=session,
+    )
+
+
 def _ensure_stripe() -> None:
     if not settings.stripe_secret_key:
         raise HTTPException(status_code=500, detail="Stripe not configured (STRIPE_SECRET_KEY)")
     stripe.api_key = settings.stripe_secret_key
+    stripe.default_http_client = _http_client()
+    if settings.stripe_api_base:
+        stripe.api_base = settings.stripe_api_base
+
+
+def find_checkout_payment(db: Session, order_id: int) -> Payment | None:
+    return db.scalar(select(Payment).where(Payment.order_id == order_id))
 
 
-def create_checkout_session(*, db: Session, order: Order) -> Payment:
+def create_checkout_session(
+    order: Order, expires_at: datetime | None = None
+) -> stripe.checkout.Session:
+    """
+    Calls Stripe (blocking HTTP); `order.items` must already be loaded. Persist
+    the result with `record_checkout_session`. Pass `expires_at` to close the
+    session when the order's stock holds run out.
+    """
     _ensure_stripe()
     if not settings.stripe_success_url or not settings.stripe_cancel_url:
         raise HTTPException(
@@ -24,10 +109,6 @@ def create_checkout_session(*, db: Session, order: Order) -> Payment:
             detail="Stripe redirect URLs not configured (STRIPE_SUCCESS_URL/STRIPE_CANCEL_URL)",
         )
 
-    payment = db.scalar(select(Payment).where(Payment.order_id == order.id))
-    if payment and payment.stripe_session_id:
-        return payment
-
     if not order.items:
         raise HTTPException(status_code=400, detail="Order has no items")
 
@@ -44,24 +125,47 @@ def create_checkout_session(*, db: Session, order: Order) -> Payment:
             }
         )
 
-    session = stripe.checkout.Session.create(
-        mode="payment",
-        line_items=line_items,
-        success_url=settings.stripe_success_url,
-        cancel_url=settings.stripe_cancel_url,
-        client_reference_id=str(order.id),
-        metadata={"order_id": str(order.id)},
-    )
+    extra = {"expires_at": int(expires_at.timestamp())} if expires_at else {}
+    with stripe_metrics.timed("checkout.session.create"):
+        return stripe.checkout.Session.create(
+            mode="payment",
+            line_items=line_items,
+            success_url=settings.stripe_success_url,
+            cancel_url=settings.stripe_cancel_url,
+            client_reference_id=str(order.id),
+            metadata={"order_id": str(order.id)},
+            **extra,
+        )
 
+
+def retrieve_checkout_session(session_id: str) -> stripe.checkout.Session:
+    _ensure_stripe()
+    with stripe_metrics.timed("checkout.session.retrieve"):
+        return stripe.checkout.Session.retrieve(session_id)
+
+
+def record_checkout_session(
+    db: Session, order_id: int, session: stripe.checkout.Session
+) -> Payment:
+    """Store the session id, URL and expiry so repeat checkouts skip Stripe."""
+    expires_at = getattr(session, "expires_at", None)
+    fields = {
+        "stripe_session_id": session["id"],
+        "checkout_url": getattr(session, "url", None),
+        "checkout_expires_at": (
+            datetime.fromtimestamp(expires_at, timezone.utc) if expires_at else None
+        ),
+        "status": "PENDING",
+    }
+    payment = find_checkout_payment(db, order_id)
     if payment:
-        payment.stripe_session_id = session["id"]
-        payment.status = "PENDING"
+        for field, value in fields.items():
+            setattr(payment, field, value)
         db.add(payment)
     else:
-        payment = Payment(order_id=order.id, stripe_session_id=session["id"], status="PENDING")
+        payment = Payment(order_id=order_id, **fields)
         db.add(payment)
 
     db.commit()
     db.refresh(payment)
     return payment
-
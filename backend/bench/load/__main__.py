@@ -0,0 +1,438 @@
+"""
+Load benchmark: scripted journeys against the whole app, reported as JSON.
+
+    python -m bench.load --concurrency 16 --duration 30 --output load.json
+    python -m bench.load --scenarios browse --no-catalog-cache --baseline load.json
+
+Starts the API under uvicorn in a child process against DATABASE_URL
+(Postgres, migrated to head; `docker compose up` in infra/ is enough), so the
+load-generating threads here do not compete with it for the GIL. Firebase and
+S3 are replaced by local fakes and Stripe by bench.stripe_stub, so no
+credentials or network are needed. Each scenario runs for `--duration`
+seconds with `--concurrency` virtual users, after a `--warmup`. The report
+has p50/p95/p99 latency, throughput and DB statements per request, per
+scenario and per step. `--baseline` prints the change against an earlier
+report. Seeding depends on `--seed` only, and a rerun with the same seed
+reuses the catalog. Orders and uploads pile up, though, so compare runs on
+freshly migrated databases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import http.client
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+
+from bench.stripe_stub import start_stub
+
+# seller_upload last: the variant rendering it queues outlasts the scenario.
+SCENARIOS = ("browse", "checkout", "seller_upload")
+WEBHOOK_SECRET = "whsec_bench"
+ADJECTIVES = ["red", "vintage", "compact", "wireless", "organic", "leather", "modern", "classic"]
+NOUNS = ["lamp", "jacket", "speaker", "teapot", "backpack", "chair", "watch", "notebook"]
+CHUNK = 1000
+
+
+def _configure_env(args: argparse.Namespace, stripe_base_url: str, s3_dir: str) -> None:
+    # Settings are read at import, so this runs before anything from app/. The
+    # API process inherits the same environment.
+    os.environ.update(
+        BENCH_S3_DIR=s3_dir,
+        DEBUG="true",  # X-DB-Statements on every response
+        DB_ASYNC="true" if args.db_async else "false",
+        STRIPE_SECRET_KEY="sk_test_bench",
+        STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+        STRIPE_API_BASE=stripe_base_url,
+        AUTH_CERT_REFRESH_SECONDS="0",
+        S3_BUCKET="bench-bucket",
+        S3_REGION="eu-west-1",
+        AWS_ACCESS_KEY_ID="bench",
+        AWS_SECRET_ACCESS_KEY="bench",
+        STRIPE_SUCCESS_URL="http://127.0.0.1/bench/success",
+        STRIPE_CANCEL_URL="http://127.0.0.1/bench/cancel",
+    )
+    os.environ.pop("AWS_ENDPOINT_URL", None)
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT_JSON", "{}")
+    if not args.catalog_cache:
+        os.environ["CATALOG_CACHE_SIZE"] = "0"
+
+
+def _seed(seed: int, sellers: int, products: int) -> tuple[str, dict[str, list[int]]]:
+    """Sellers and their products, created once per seed. Returns the run tag and ids by uid."""
+    from sqlalchemy import insert, select
+
+    from app.core.db import SessionLocal
+    from app.models.product import Product
+    from app.models.seller_profile import SellerProfile
+    from app.models.user import User
+
+    run = f"bench-{seed}"
+    uids = [f"{run}-seller-{i}" for i in range(sellers)]
+    with SessionLocal() as db:
+        existing = db.execute(
+            select(User.firebase_uid, Product.id)
+            .join(SellerProfile, SellerProfile.user_id == User.id)
+            .join(Product, Product.seller_id == SellerProfile.id)
+            # Seeded rows only: products uploaded by earlier runs have little stock.
+            .where(User.firebase_uid.in_(uids), Product.description.like("Benchmark product %"))
+            .order_by(Product.id)
+        ).all()
+        if existing:
+            by_seller: dict[str, list[int]] = defaultdict(list)
+            for uid, product_id in existing:
+                by_seller[uid].append(product_id)
+            return run, dict(by_seller)
+
+        rng = random.Random(seed)
+        user_ids = db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [{"firebase_uid": uid, "email": f"{uid}@bench.invalid"} for uid in uids],
+        ).all()
+        seller_ids = db.scalars(
+            insert(SellerProfile).returning(SellerProfile.id, sort_by_parameter_order=True),
+            [{"user_id": uid, "store_name": f"Store {i}"} for i, uid in enumerate(user_ids)],
+        ).all()
+        uid_by_seller = dict(zip(seller_ids, uids))
+
+        by_seller = defaultdict(list)
+        for start in range(0, products, CHUNK):
+            rows = []
+            for i in range(start, min(start + CHUNK, products)):
+                rows.append(
+                    {
+                        "seller_id": rng.choice(seller_ids),
+                        "title": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+                        "description": f"Benchmark product {i}",
+                        "price_cents": rng.randrange(100, 100_000),
+                        "currency": "USD",
+                        # Enough that checkout never runs out.
+                        "stock_qty": 10**9,
+                    }
+                )
+            for product_id, seller_id in db.execute(
+                insert(Product).returning(
+                    Product.id, Product.seller_id, sort_by_parameter_order=True
+                ),
+                rows,
+            ):
+                by_seller[uid_by_seller[seller_id]].append(product_id)
+        db.commit()
+    return run, dict(by_seller)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "bench.load.server:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ]
+    )  # fmt: skip
+    deadline = time.monotonic() + 30
+    while True:
+        if server.poll() is not None or time.monotonic() > deadline:
+            _stop_server(server)
+            raise SystemExit("API server failed to start")
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)
+
+
+def _stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def _run_scenario(
+    name: str, journey, catalog, *, port: int, args: argparse.Namespace  # noqa: ANN001
+) -> dict[str, Any]:
+    from bench.load.scenarios import BenchError, Client
+
+    sellers = sorted(catalog.products_by_seller)
+
+    def token(worker: int) -> str:
+        if name == "browse":
+            return ""
+        if name == "seller_upload":
+            return sellers[worker % len(sellers)]
+        return f"{catalog.run}-buyer-{worker}"
+
+    clients = [
+        Client("127.0.0.1", port, token(w), random.Random(f"{args.seed}-{name}-{w}"))
+        for w in range(args.concurrency)
+    ]
+    iterations = [0] * len(clients)
+    failures: list[str] = []
+
+    def drive(worker: int, until: float, counted: bool) -> None:
+        client = clients[worker]
+        while time.perf_counter() < until:
+            try:
+                journey(client, catalog)
+            except BenchError as e:
+                if counted and len(failures) < 5:
+                    failures.append(str(e))
+                continue
+            if counted:
+                iterations[worker] += 1
+
+    def phase(seconds: float, counted: bool) -> float:
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=drive, args=(w, start + seconds, counted))
+            for w in range(len(clients))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+
+    first_image = _last_image_id()
+    if args.warmup > 0:
+        phase(args.warmup, counted=False)
+        for client in clients:
+            client.samples.clear()
+        _wait_for_variants(first_image)
+    elapsed = phase(args.duration, counted=True)
+
+    samples = [s for client in clients for s in client.samples]
+    by_step: dict[str, list] = defaultdict(list)
+    for s in samples:
+        by_step[s.step].append(s)
+    result = {
+        "iterations": sum(iterations),
+        "iterations_per_second": round(sum(iterations) / elapsed, 2),
+        **_summarize(samples, elapsed),
+        "steps": {step: _summarize(group, elapsed) for step, group in sorted(by_step.items())},
+    }
+    if name == "seller_upload":
+        # Variant rendering queued by the uploads, still running after the last response.
+        result["background_drain_seconds"] = _wait_for_variants(first_image)
+    if failures:
+        result["sample_errors"] = failures
+    return result
+
+
+def _last_image_id() -> int:
+    from sqlalchemy import func, select
+
+    from app.core.db import SessionLocal
+    from app.models.product_image import ProductImage
+
+    with SessionLocal() as db:
+        return db.scalar(select(func.coalesce(func.max(ProductImage.id), 0)))
+
+
+def _wait_for_variants(after_id: int, timeout: float = 600.0) -> float:
+    """Seconds until images attached after `after_id` all have their variants rendered."""
+    from sqlalchemy import func, select
+
+    from app.core.db import SessionLocal
+    from app.models.product_image import ProductImage
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        with SessionLocal() as db:
+            pending = db.scalar(
+                select(func.count()).where(
+                    ProductImage.id > after_id, ProductImage.variants.is_(None)
+                )
+            )
+        if not pending:
+            break
+        time.sleep(0.5)
+    return round(time.perf_counter() - start, 2)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest rank: always an observed value, stable for small samples.
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _summarize(samples: list, elapsed: float) -> dict[str, Any]:  # noqa: ANN001
+    latencies = sorted(s.seconds * 1000 for s in samples)
+    statements = [s.statements for s in samples if s.statements is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s.status == 0 or s.status >= 400),
+        "requests_per_second": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "db_statements_per_request": (
+            round(sum(statements) / len(statements), 2) if statements else None
+        ),
+    }
+
+
+def _meta(args: argparse.Namespace, catalog) -> dict[str, Any]:  # noqa: ANN001
+    from sqlalchemy import text
+
+    from app.core.db import SessionLocal
+
+    def git(*cmd: str) -> str | None:
+        try:
+            return subprocess.run(
+                ["git", *cmd], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    with SessionLocal() as db:
+        server_version = db.scalar(text("show server_version"))
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "postgres": server_version,
+        "cpus": os.cpu_count(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "db_async": args.db_async,
+            "catalog_cache": args.catalog_cache,
+            "stripe_latency_ms": args.stripe_latency_ms,
+            "products": len(catalog.product_ids),
+            "sellers": len(catalog.products_by_seller),
+        },
+    }
+
+
+def _print_report(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    def delta(new: float, old: float | None) -> str:
+        if not old:
+            return ""
+        return f" ({(new - old) / old * 100:+.0f}%)"
+
+    for name, result in report["scenarios"].items():
+        old = (baseline or {}).get("scenarios", {}).get(name, {})
+        print(
+            f"\n{name}: {result['iterations_per_second']} it/s, "
+            f"{result['requests_per_second']} req/s"
+            f"{delta(result['requests_per_second'], old.get('requests_per_second'))}, "
+            f"{result['errors']} errors"
+        )
+        print(f"  {'step':20s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'stmts':>6s}")
+        for step, s in result["steps"].items():
+            lat = s["latency_ms"]
+            old_p95 = old.get("steps", {}).get(step, {}).get("latency_ms", {}).get("p95")
+            stmts = s["db_statements_per_request"]
+            print(
+                f"  {step:20s} {lat['p50']:9.2f} {lat['p95']:9.2f} {lat['p99']:9.2f} "
+                f"{'-' if stmts is None else stmts:>6}{delta(lat['p95'], old_p95)}"
+            )
+        for error in result.get("sample_errors", []):
+            print(f"  ! {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sellers", type=int, default=50)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--db-async", action="store_true")
+    parser.add_argument("--no-catalog-cache", dest="catalog_cache", action="store_false")
+    parser.add_argument("--stripe-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    stub = start_stub(latency_ms=args.stripe_latency_ms)
+    s3_dir = tempfile.mkdtemp(prefix="bench-s3-")
+    _configure_env(args, stub.base_url, s3_dir)
+
+    from bench.load import fakes, scenarios
+
+    run, by_seller = _seed(args.seed, args.sellers, args.products)
+    catalog = scenarios.Catalog(
+        run=run,
+        product_ids=sorted(pid for ids in by_seller.values() for pid in ids),
+        products_by_seller=by_seller,
+        search_terms=NOUNS,
+        image=fakes.sample_jpeg(),
+    )
+    journeys = {
+        "browse": scenarios.browse,
+        "seller_upload": scenarios.seller_upload,
+        "checkout": functools.partial(scenarios.checkout, webhook_secret=WEBHOOK_SECRET),
+    }
+
+    port = _free_port()
+    server = _start_server(port)
+    report: dict[str, Any] = {"meta": _meta(args, catalog), "scenarios": {}}
+    try:
+        for name in names:
+            print(f"Running {name} ({args.concurrency} users, {args.duration:g}s)...", file=sys.stderr)
+            report["scenarios"][name] = _run_scenario(
+                name, journeys[name], catalog, port=port, args=args
+            )
+    finally:
+        _stop_server(server)
+        stub.shutdown()
+        shutil.rmtree(s3_dir, ignore_errors=True)
+
+    with open(args.output, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS) + b"\n")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "rb") as f:
+            baseline = orjson.loads(f.read())
+    _print_report(report, baseline)
+    print(f"\nWrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Local stand-ins for Firebase and S3; Stripe is bench.stripe_stub.
+
+Import after the environment is set up: installing patches the app modules
+that hold references to the real clients. The S3 stand-in keeps objects in
+BENCH_S3_DIR, so the bench and the API process see the same objects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import io
+import os
+import tempfile
+import time
+from typing import Any
+
+from PIL import Image
+
+TOKEN_TTL_SECONDS = 3600
+
+
+def verify_id_token(token: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
+    """Accepts any token and treats it as the Firebase uid."""
+    return {
+        "uid": token,
+        "email": f"{token}@bench.invalid",
+        "name": token,
+        "exp": int(time.time()) + TOKEN_TTL_SECONDS,
+    }
+
+
+class FakeS3:
+    """Object store in a directory: what a client would PUT to a presigned URL."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _path(self, s3_key: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(s3_key.encode()).hexdigest())
+
+    def get_object_bytes(self, s3_key: str) -> bytes:
+        with open(self._path(s3_key), "rb") as f:
+            return f.read()
+
+    def put_object_bytes(self, s3_key: str, data: bytes, content_type: str = "") -> None:
+        path = self._path(s3_key)
+        # Written aside and renamed, so a reader never sees a partial object.
+        with tempfile.NamedTemporaryFile(dir=self.root, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+
+    def __len__(self) -> int:
+        return len(os.listdir(self.root))
+
+
+fake_s3 = FakeS3(os.environ.get("BENCH_S3_DIR") or tempfile.mkdtemp(prefix="bench-s3-"))
+
+
+def sample_jpeg(width: int = 1600, height: int = 1200) -> bytes:
+    """A photo-sized JPEG, so variant rendering costs what it would for real uploads."""
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def sign_webhook(payload: bytes, secret: str) -> str:
+    """A Stripe-Signature header for `payload`, as Stripe computes it."""
+    timestamp = int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def install() -> None:
+    import app.core.auth as auth
+    import app.services.images as images
+    import app.services.s3 as s3
+
+    auth.firebase_auth.verify_id_token = verify_id_token
+    auth._init_firebase = lambda: None
+    for module in (s3, images):
+        module.get_object_bytes = fake_s3.get_object_bytes
+        module.put_object_bytes = fake_s3.put_object_bytes
@@ -0,0 +1,205 @@
+"""
+Scripted user journeys. Each iteration is one pass through a journey by one
+virtual user; every request in it is recorded under "<scenario>.<step>".
+"""
+
+from __future__ import annotations
+
+import http.client
+import random
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlencode
+
+import orjson
+
+from bench.load.fakes import fake_s3, sign_webhook
+
+
+@dataclass
+class Sample:
+    step: str
+    seconds: float
+    status: int
+    statements: int | None
+
+
+@dataclass
+class Catalog:
+    """What was seeded: ids to pick from and the uids that own them."""
+
+    run: str
+    product_ids: list[int]
+    products_by_seller: dict[str, list[int]]
+    search_terms: list[str]
+    image: bytes
+
+
+class BenchError(Exception):
+    pass
+
+
+@dataclass
+class Client:
+    """One virtual user: a keep-alive connection and its own seeded RNG."""
+
+    host: str
+    port: int
+    token: str
+    rng: random.Random
+    samples: list[Sample] = field(default_factory=list)
+    _conn: http.client.HTTPConnection | None = None
+
+    def request(
+        self,
+        step: str,
+        method: str,
+        path: str,
+        body: Any = None,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        raw: bytes | None = None,
+        auth: bool = True,
+    ) -> Any:
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        data = raw if raw is not None else (orjson.dumps(body) if body is not None else None)
+        sent = {"Content-Type": "application/json", **(headers or {})}
+        if auth and self.token:
+            sent["Authorization"] = f"Bearer {self.token}"
+
+        start = time.perf_counter()
+        for attempt in range(2):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self._conn.request(method, path, body=data, headers=sent)
+                resp = self._conn.getresponse()
+                payload = resp.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self._conn.close()
+                self._conn = None
+                # The server closes idle keep-alive connections: reconnect once.
+                stale = isinstance(
+                    e, (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+                )
+                if reused and stale and attempt == 0:
+                    start = time.perf_counter()
+                    continue
+                self.samples.append(Sample(step, time.perf_counter() - start, 0, None))
+                raise BenchError(f"{method} {path}: connection failed") from None
+        elapsed = time.perf_counter() - start
+
+        statements = resp.getheader("x-db-statements")
+        self.samples.append(
+            Sample(step, elapsed, resp.status, int(statements) if statements else None)
+        )
+        if resp.status >= 400:
+            raise BenchError(f"{method} {path}: {resp.status} {payload[:200]!r}")
+        return orjson.loads(payload) if payload else None
+
+
+def browse(client: Client, catalog: Catalog) -> None:
+    """A shopper (no token): first page, next page, a product, a search, a filtered sort."""
+    page = client.request("list", "GET", "/products", params={"limit": 20})
+    if page["next_cursor"]:
+        client.request(
+            "list_next", "GET", "/products", params={"limit": 20, "cursor": page["next_cursor"]}
+        )
+    client.request("get", "GET", f"/products/{client.rng.choice(catalog.product_ids)}")
+    client.request(
+        "search", "GET", "/products/search", params={"q": client.rng.choice(catalog.search_terms)}
+    )
+    client.request(
+        "list_price_asc",
+        "GET",
+        "/products",
+        params={"limit": 20, "sort": "price_asc", "in_stock": "true"},
+    )
+
+
+def seller_upload(client: Client, catalog: Catalog) -> None:
+    """A seller lists a product with three photos."""
+    product = client.request(
+        "create_product",
+        "POST",
+        "/seller/products",
+        {
+            "title": f"Bench upload {client.rng.randrange(10**9)}",
+            "description": "Uploaded by the load benchmark.",
+            "price_cents": client.rng.randrange(100, 100_000),
+            "currency": "USD",
+            "stock_qty": 10,
+        },
+    )
+    files = [{"filename": f"photo{i}.jpg", "content_type": "image/jpeg"} for i in range(3)]
+    presigned = client.request(
+        "presign_batch",
+        "POST",
+        f"/seller/products/{product['id']}/images/presign-batch",
+        {"files": files},
+    )
+    keys = [upload["s3_key"] for upload in presigned["uploads"]]
+    # Stands in for the client's PUTs to the presigned URLs.
+    for key in keys:
+        fake_s3.put_object_bytes(key, catalog.image, "image/jpeg")
+    client.request(
+        "attach_images",
+        "POST",
+        f"/seller/products/{product['id']}/images/attach",
+        {"s3_keys": keys},
+    )
+
+
+def checkout(client: Client, catalog: Catalog, *, webhook_secret: str) -> None:
+    """Order one to three items from one seller, check out, get paid, look at the history."""
+    seller = client.rng.choice(sorted(catalog.products_by_seller))
+    offered = catalog.products_by_seller[seller]
+    products = client.rng.sample(offered, min(client.rng.randint(1, 3), len(offered)))
+    order = client.request(
+        "create_order",
+        "POST",
+        "/orders",
+        {
+            "items": [{"product_id": pid, "quantity": 1} for pid in products],
+            "shipping_address": {
+                "full_name": "Bench Buyer",
+                "line1": "1 Load Test Way",
+                "city": "Benchville",
+                "postal_code": "00000",
+            },
+        },
+    )
+    session = client.request("checkout", "POST", f"/orders/{order['id']}/checkout")
+    event = orjson.dumps(
+        {
+            # Random, not seeded: a replayed id would be dropped as a duplicate.
+            "id": f"evt_bench_{uuid.uuid4().hex}",
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "id": session["stripe_session_id"],
+                    "payment_intent": f"pi_bench_{order['id']}",
+                    "metadata": {"order_id": str(order["id"])},
+                }
+            },
+        }
+    )
+    client.request(
+        "webhook",
+        "POST",
+        "/webhooks/stripe",
+        raw=event,
+        headers={"Stripe-Signature": sign_webhook(event, webhook_secret)},
+        auth=False,
+    )
+    client.request("order_history", "GET", "/orders", params={"view": "summary", "limit": 20})
+
+
+Journey = Callable[[Client, Catalog], None]
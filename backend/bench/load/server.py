@@ -0,0 +1,12 @@
+"""
+The API with the bench stand-ins installed, for `uvicorn bench.load.server:app`.
+Expects the environment bench.load sets up.
+"""
+
+from bench.load import fakes
+
+fakes.install()
+
+from app.main import app  # noqa: E402
+
+__all__ = ["app"]
@@ -0,0 +1,111 @@
+"""
+Hammer one product with parallel orders and payments; check nothing is oversold.
+
+    python -m bench.order_concurrency --stock 20 --attempts 200 --workers 16
+
+Runs against DATABASE_URL (migrated to head). Each attempt creates an order for
+one unit and, if accepted, immediately applies a checkout.session.completed
+event for it. Exits non-zero if more units were paid for than were in stock or
+if any attempt failed with something other than a 400.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.db import SessionLocal
+from app.models.product import Product
+from app.models.seller_profile import SellerProfile
+from app.models.user import User
+from app.routers.orders import _create_order
+from app.schemas.order import AddressIn, CreateOrderRequest, OrderItemIn
+from app.services.stripe_inbox import apply_event
+
+
+def make_hot_product(stock: int, buyers: int) -> tuple[int, list[int]]:
+    """A product with `stock` units and `buyers` users. Returns their ids."""
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        seller_user = User(firebase_uid=f"bench-seller-{run}")
+        db.add(seller_user)
+        db.flush()
+        seller = SellerProfile(user_id=seller_user.id, store_name=f"bench {run}")
+        db.add(seller)
+        db.flush()
+        product = Product(
+            seller_id=seller.id, title=f"hot item {run}", price_cents=100, stock_qty=stock
+        )
+        db.add(product)
+        buyer_users = [User(firebase_uid=f"bench-buyer-{run}-{i}") for i in range(buyers)]
+        db.add_all(buyer_users)
+        db.commit()
+        return product.id, [u.id for u in buyer_users]
+
+
+def order_and_pay(product_id: int, buyer_id: int) -> str:
+    """Order one unit and pay for it: "paid", "rejected" (a 400) or "error"."""
+    body = CreateOrderRequest(
+        items=[OrderItemIn(product_id=product_id, quantity=1)],
+        shipping_address=AddressIn(full_name="Bench", line1="1 Main", city="X", postal_code="1"),
+    )
+    try:
+        with SessionLocal() as db:
+            order = _create_order(db, buyer_id, body)
+    except HTTPException as e:
+        return "rejected" if e.status_code == 400 else "error"
+    except Exception:  # noqa: BLE001
+        return "error"
+
+    event = {
+        "id": f"evt_bench_{uuid.uuid4().hex}",
+        "type": "checkout.session.completed",
+        "data": {
+            "object": {
+                "id": f"cs_bench_{uuid.uuid4().hex}",
+                "payment_intent": None,
+                "metadata": {"order_id": str(order["id"])},
+            }
+        },
+    }
+    try:
+        with SessionLocal() as db:
+            apply_event(db, event)
+            db.commit()
+    except Exception:  # noqa: BLE001
+        return "error"
+    return "paid"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stock", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    product_id, buyers = make_hot_product(args.stock, args.attempts)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        outcomes = list(pool.map(lambda b: order_and_pay(product_id, b), buyers))
+    elapsed = time.perf_counter() - start
+
+    with SessionLocal() as db:
+        final_stock = db.get(Product, product_id).stock_qty
+
+    paid = outcomes.count("paid")
+    errors = outcomes.count("error")
+    oversold = max(0, paid - args.stock)
+    print(f"attempts={args.attempts} workers={args.workers} elapsed={elapsed:.2f}s")
+    print(f"stock={args.stock} paid={paid} rejected={outcomes.count('rejected')} errors={errors}")
+    print(f"final_stock={final_stock} oversold={oversold}")
+    sys.exit(1 if oversold or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Latency of a heavy buyer's order history: old full list vs keyset pages.
+
+    python -m bench.order_history --orders 10000 --items 3 --limit 20
+
+Runs against DATABASE_URL (migrated to head). Seeds one buyer with `--orders`
+orders of `--items` lines each, then times "before" (every order, items
+loaded with it) against the first and a deep page of GET /orders in the full
+and summary views.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.db import SessionLocal
+from app.core.pagination import encode_cursor
+from app.core.query_stats import track_queries
+from app.models.address import Address
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.seller_profile import SellerProfile
+from app.models.user import User
+from app.routers.orders import _list_orders
+from app.serializers import order_to_dict
+
+CHUNK = 1000
+
+
+def _before(db: Session, buyer_id: int) -> list[dict[str, Any]]:
+    orders = db.scalars(
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.buyer_id == buyer_id)
+        .order_by(Order.id.desc())
+    ).all()
+    return [order_to_dict(o) for o in orders]
+
+
+def _setup(orders: int, items: int) -> tuple[int, list[int]]:
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        seller_user = User(firebase_uid=f"bench-seller-{run}")
+        buyer = User(firebase_uid=f"bench-buyer-{run}")
+        db.add_all([seller_user, buyer])
+        db.flush()
+        seller = SellerProfile(user_id=seller_user.id, store_name=f"bench {run}")
+        db.add(seller)
+        db.flush()
+        product = Product(seller_id=seller.id, title=f"item {run}", price_cents=100, stock_qty=0)
+        addr = Address(user_id=buyer.id, full_name="Bench", line1="1 Main", city="X", postal_code="1")
+        db.add_all([product, addr])
+        db.flush()
+
+        order_ids: list[int] = []
+        for start in range(0, orders, CHUNK):
+            rows = [
+                {
+                    "buyer_id": buyer.id,
+                    "seller_id": seller.id,
+                    "shipping_address_id": addr.id,
+                    "status": "PAID",
+                    "currency": "USD",
+                    "subtotal_cents": 100 * items,
+                    "total_cents": 100 * items,
+                }
+                for _ in range(min(CHUNK, orders - start))
+            ]
+            ids = db.scalars(
+                insert(Order).returning(Order.id, sort_by_parameter_order=True), rows
+            ).all()
+            db.execute(
+                insert(OrderItem),
+                [
+                    {
+                        "order_id": order_id,
+                        "product_id": product.id,
+                        "title": product.title,
+                        "unit_price_cents": 100,
+                        "quantity": 1,
+                        "line_total_cents": 100,
+                    }
+                    for order_id in ids
+                    for _ in range(items)
+                ],
+            )
+            order_ids.extend(ids)
+        db.commit()
+        return buyer.id, order_ids
+
+
+def _measure(fn: Callable[[Session], Any], repeat: int) -> tuple[int, float]:
+    latencies: list[float] = []
+    for _ in range(repeat):
+        with SessionLocal() as db, track_queries() as stats:
+            start = time.perf_counter()
+            fn(db)
+            latencies.append(time.perf_counter() - start)
+    return stats.statements, statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    buyer_id, order_ids = _setup(args.orders, args.items)
+    deep = encode_cursor("orders", order_ids[len(order_ids) // 2])
+    cases: list[tuple[str, Callable[[Session], Any]]] = [
+        ("before (all orders)", lambda db: _before(db, buyer_id)),
+    ]
+    for view in ("full", "summary"):
+        for label, cursor in (("first", None), ("deep", deep)):
+            cases.append(
+                (
+                    f"{view} {label} page",
+                    lambda db, view=view, cursor=cursor: _list_orders(
+                        db, buyer_id, limit=args.limit, cursor=cursor, view=view
+                    ),
+                )
+            )
+
+    print(f"orders={args.orders} items/order={args.items} limit={args.limit}")
+    for label, fn in cases:
+        statements, ms = _measure(fn, args.repeat)
+        print(f"{label:20s} {statements:3d} statements  {ms:8.2f} ms median")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Per-URL cost of presigning S3 uploads.
+
+    python -m bench.s3_presign --urls 200
+
+"before" builds a new boto3 client for every URL, as presign_put used to.
+"after" signs with the process-wide cached client. Signing is local (no
+network), so this runs with dummy credentials.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("S3_BUCKET", "bench-bucket")
+os.environ.setdefault("S3_REGION", "eu-west-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+import boto3  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.s3 import build_s3_key, presign_put  # noqa: E402
+
+
+def _before(s3_key: str) -> str:
+    client = boto3.client(
+        "s3",
+        region_name=settings.s3_region,
+        aws_access_key_id=settings.aws_access_key_id,
+        aws_secret_access_key=settings.aws_secret_access_key,
+    )
+    return client.generate_presigned_url(
+        ClientMethod="put_object",
+        Params={"Bucket": settings.s3_bucket, "Key": s3_key, "ContentType": "image/jpeg"},
+        ExpiresIn=900,
+    )
+
+
+def _after(s3_key: str) -> str:
+    return presign_put(s3_key=s3_key, content_type="image/jpeg")
+
+
+def _per_url_us(fn, urls: int) -> float:  # noqa: ANN001
+    keys = [build_s3_key(product_id=1, filename=f"photo{i}.jpg") for i in range(urls)]
+    fn(keys[0])  # warm up
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / urls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=200)
+    args = parser.parse_args()
+
+    before = _per_url_us(_before, args.urls)
+    after = _per_url_us(_after, args.urls)
+    print(f"urls={args.urls}")
+    print(f"before: {before:9.1f} us/url")
+    print(f"after:  {after:9.1f} us/url  ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
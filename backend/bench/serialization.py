@@ -0,0 +1,114 @@
+"""
+Per-item cost of serializing a product page.
+
+    python -m bench.serialization --items 100 --images 3
+
+"before" replays what list endpoints used to do: build ProductOut models by
+hand, then let FastAPI validate and encode them again via response_model.
+"after" is the shared app.serializers path (plain dicts -> orjson bytes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("S3_BUCKET", "bench-bucket")
+os.environ.setdefault("S3_REGION", "eu-west-1")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.product import Product  # noqa: E402
+from app.models.product_image import ProductImage  # noqa: E402
+from app.schemas.product import ProductImageOut, ProductOut, ProductPage  # noqa: E402
+from app.serializers import dumps, products_to_dicts  # noqa: E402
+from app.services.s3 import public_url_for_key  # noqa: E402
+
+
+def _make_products(n: int, images: int) -> list[Product]:
+    now = datetime.now(timezone.utc)
+    return [
+        Product(
+            id=i,
+            seller_id=i % 50,
+            title=f"Product {i}",
+            description="A reasonably sized product description. " * 4,
+            price_cents=1000 + i,
+            currency="USD",
+            stock_qty=i % 20,
+            is_active=True,
+            created_at=now,
+            images=[
+                ProductImage(id=i * 10 + j, s3_key=f"products/{i}/{j:032x}.jpg", sort_order=j)
+                for j in range(images)
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def _before(products: list[Product], adapter: TypeAdapter) -> bytes:
+    page = ProductPage(
+        items=[
+            ProductOut(
+                id=p.id,
+                seller_id=p.seller_id,
+                title=p.title,
+                description=p.description,
+                price_cents=p.price_cents,
+                currency=p.currency,
+                stock_qty=p.stock_qty,
+                available_qty=p.stock_qty,
+                is_active=p.is_active,
+                images=[
+                    ProductImageOut(
+                        id=img.id,
+                        s3_key=img.s3_key,
+                        sort_order=img.sort_order,
+                        url=public_url_for_key(img.s3_key),
+                    )
+                    for img in p.images
+                ],
+            )
+            for p in products
+        ]
+    )
+    # FastAPI's response_model handling: validate against the field, then dump.
+    validated = adapter.validate_python(page)
+    return adapter.dump_json(validated)
+
+
+def _after(products: list[Product]) -> bytes:
+    return dumps({"items": products_to_dicts(products), "next_cursor": None})
+
+
+def _per_item_us(fn, repeat: int, items: int) -> float:  # noqa: ANN001
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / (repeat * items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    products = _make_products(args.items, args.images)
+    adapter = TypeAdapter(ProductPage)
+
+    before = _per_item_us(lambda: _before(products, adapter), args.repeat, args.items)
+    after = _per_item_us(lambda: _after(products), args.repeat, args.items)
+    print(f"items={args.items} images/item={args.images} repeat={args.repeat}")
+    print(f"before: {before:8.2f} us/item")
+    print(f"after:  {after:8.2f} us/item  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Minimal local stand-in for the Stripe Checkout Sessions API.
+
+    python -m bench.stripe_stub --port 12111 --latency-ms 150
+
+Then run the API with STRIPE_API_BASE=http://127.0.0.1:12111 (any
+STRIPE_SECRET_KEY works). Implements POST /v1/checkout/sessions and
+GET /v1/checkout/sessions/{id}; `--latency-ms` imitates the network round trip
+so checkout timings are realistic. `start_stub()` runs it in-process for tests
+and benchmarks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl
+
+SESSIONS_PATH = "/v1/checkout/sessions"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _StubServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Request-Id", f"req_stub_{uuid.uuid4().hex[:12]}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self) -> None:
+        self._reply(404, {"error": {"type": "invalid_request_error", "message": "No such object"}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.server.received()
+        length = int(self.headers.get("Content-Length") or 0)
+        form = dict(parse_qsl(self.rfile.read(length).decode()))
+        if self.path != SESSIONS_PATH:
+            return self._not_found()
+
+        session_id = f"cs_test_stub_{uuid.uuid4().hex}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "mode": form.get("mode", "payment"),
+            "status": "open",
+            "payment_status": "unpaid",
+            "payment_intent": None,
+            "client_reference_id": form.get("client_reference_id"),
+            "metadata": {
+                key[len("metadata[") : -1]: value
+                for key, value in form.items()
+                if key.startswith("metadata[")
+            },
+            "expires_at": int(form.get("expires_at") or time.time() + 24 * 3600),
+            "url": f"{self.server.base_url}/pay/{session_id}",
+        }
+        with self.server.lock:
+            self.server.sessions[session_id] = session
+        self._reply(200, session)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.received()
+        prefix = SESSIONS_PATH + "/"
+        session_id = self.path[len(prefix) :] if self.path.startswith(prefix) else ""
+        with self.server.lock:
+            session = self.server.sessions.get(session_id)
+        if session is None:
+            return self._not_found()
+        self._reply(200, session)
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, latency_ms: float) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency_ms / 1000
+        self.sessions: dict[str, dict[str, Any]] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def received(self) -> None:
+        """Count the call, then imitate the network round trip."""
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0) -> _StubServer:
+    """Serve in a daemon thread; point STRIPE_API_BASE at `server.base_url`."""
+    server = _StubServer(port, latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = _StubServer(args.port, args.latency_ms)
+    print(f"Stripe stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Statements and latency of applying checkout.session.completed to large orders.
+
+    python -m bench.webhook_apply --items 50 --orders 20
+
+Runs against DATABASE_URL (migrated to head). "before" replays the old
+handler: load the order and its items, read the payment, then get and
+decrement every product in Python. "after" is app.services.stripe_inbox.
+apply_event: an upsert for the payment and one UPDATE ... FROM for all stock.
+Each side pays for its own set of fresh orders.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.db import SessionLocal
+from app.core.query_stats import track_queries
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.seller_profile import SellerProfile
+from app.models.user import User
+from app.routers.orders import _create_order
+from app.schemas.order import AddressIn, CreateOrderRequest, OrderItemIn
+from app.services.stripe_inbox import apply_event
+
+
+def _before(db: Session, event: dict[str, Any]) -> None:
+    session_obj = event["data"]["object"]
+    order_id = int(session_obj["metadata"]["order_id"])
+    order = db.get(Order, order_id, options=[selectinload(Order.items)])
+    payment = db.scalar(select(Payment).where(Payment.order_id == order.id))
+    if not payment:
+        payment = Payment(order_id=order.id, stripe_session_id=session_obj["id"], status="PAID")
+        db.add(payment)
+    else:
+        payment.status = "PAID"
+    if order.status != "PAID":
+        order.status = "PAID"
+        for it in order.items:
+            p = db.get(Product, it.product_id)
+            p.stock_qty = max(0, p.stock_qty - it.quantity)
+            db.add(p)
+    db.flush()
+
+
+def _setup(items: int, orders: int) -> list[int]:
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        seller_user = User(firebase_uid=f"bench-seller-{run}")
+        buyer = User(firebase_uid=f"bench-buyer-{run}")
+        db.add_all([seller_user, buyer])
+        db.flush()
+        seller = SellerProfile(user_id=seller_user.id, store_name=f"bench {run}")
+        db.add(seller)
+        db.flush()
+        products = [
+            Product(seller_id=seller.id, title=f"item {run} {i}", price_cents=100, stock_qty=10**6)
+            for i in range(items)
+        ]
+        db.add_all(products)
+        db.commit()
+        product_ids = [p.id for p in products]
+        buyer_id = buyer.id
+
+    body = CreateOrderRequest(
+        items=[OrderItemIn(product_id=pid, quantity=1) for pid in product_ids],
+        shipping_address=AddressIn(full_name="Bench", line1="1 Main", city="X", postal_code="1"),
+    )
+    order_ids = []
+    for _ in range(orders):
+        with SessionLocal() as db:
+            order_ids.append(_create_order(db, buyer_id, body)["id"])
+    return order_ids
+
+
+def _event(order_id: int) -> dict[str, Any]:
+    return {
+        "id": f"evt_bench_{uuid.uuid4().hex}",
+        "type": "checkout.session.completed",
+        "data": {
+            "object": {
+                "id": f"cs_bench_{uuid.uuid4().hex}",
+                "payment_intent": f"pi_bench_{uuid.uuid4().hex}",
+                "metadata": {"order_id": str(order_id)},
+            }
+        },
+    }
+
+
+def _measure(
+    fn: Callable[[Session, dict[str, Any]], Any], order_ids: list[int]
+) -> tuple[int, float]:
+    statements: list[int] = []
+    latencies: list[float] = []
+    for order_id in order_ids:
+        event = _event(order_id)
+        with SessionLocal() as db, track_queries() as stats:
+            start = time.perf_counter()
+            fn(db, event)
+            db.commit()
+            latencies.append(time.perf_counter() - start)
+        statements.append(stats.statements)
+    return max(statements), statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=20)
+    args = parser.parse_args()
+
+    order_ids = _setup(args.items, 2 * args.orders)
+    before_stmts, before_ms = _measure(_before, order_ids[: args.orders])
+    after_stmts, after_ms = _measure(apply_event, order_ids[args.orders :])
+    print(f"items/order={args.items} orders={args.orders}")
+    print(f"before: {before_stmts:4d} statements  {before_ms:7.2f} ms median")
+    speedup = before_ms / after_ms
+    print(f"after:  {after_stmts:4d} statements  {after_ms:7.2f} ms median  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+The suite runs against a disposable Postgres database named by
+TEST_DATABASE_URL, migrated to head at the start of the session. It is
+skipped when that is not set. Tests create their own users, so they do not
+depend on what else is in the database.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# Settings are read when app/ is first imported, so this runs before that.
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+psycopg://localhost/unused"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.update(
+    FIREBASE_SERVICE_ACCOUNT_JSON="",
+    AUTH_CERT_REFRESH_SECONDS="0",
+    STRIPE_SECRET_KEY="sk_test_stub",
+    STRIPE_SUCCESS_URL="http://127.0.0.1/success",
+    STRIPE_CANCEL_URL="http://127.0.0.1/cancel",
+    STRIPE_INBOX_WORKERS="0",
+    RESERVATION_SWEEP_INTERVAL_SECONDS="0",
+)
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated() -> None:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture(scope="session")
+def client(migrated: None) -> Iterator[Any]:
+    """The app, with bearer tokens taken as Firebase uids."""
+    import app.core.auth as auth
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    def verify(token: str) -> dict[str, Any]:
+        return {"uid": token, "email": f"{token}@test.invalid", "name": token, "exp": 2**40}
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(auth, "_verify_id_token", verify)
+        mp.setattr(auth, "_init_firebase", lambda: None)
+        with TestClient(app) as c:
+            yield c
+
+
+@pytest.fixture
+def uid() -> Callable[[str], str]:
+    """Fresh Firebase uids, so every test starts with users of its own."""
+    run = uuid.uuid4().hex[:12]
+    return lambda name: f"test-{run}-{name}"
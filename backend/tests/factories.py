@@ -0,0 +1,89 @@
+"""Rows for tests, inserted directly and committed."""
+
+from __future__ import annotations
+
+from app.core.db import SessionLocal
+from app.models.address import Address
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.product_image import ProductImage
+from app.models.seller_profile import SellerProfile
+from app.models.user import User
+
+
+def bearer(uid: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {uid}"}
+
+
+def make_user(uid: str) -> int:
+    with SessionLocal() as db:
+        user = User(firebase_uid=uid, email=f"{uid}@test.invalid")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def make_seller(uid: str, *, products: int, images: int) -> tuple[int, int, list[int]]:
+    """
+    A seller with `products` products of `images` images each. Returns the
+    user id, the seller profile id and the product ids.
+    """
+    user_id = make_user(uid)
+    with SessionLocal() as db:
+        seller = SellerProfile(user_id=user_id, store_name=f"Store {uid}")
+        db.add(seller)
+        db.flush()
+        rows = [
+            Product(
+                seller_id=seller.id,
+                title=f"Product {i}",
+                price_cents=100 + i,
+                stock_qty=10,
+                images=[
+                    ProductImage(s3_key=f"products/{uid}/{i}/{j}.jpg", sort_order=j)
+                    for j in range(images)
+                ],
+            )
+            for i in range(products)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return user_id, seller.id, [p.id for p in rows]
+
+
+def make_orders(buyer_id: int, seller_id: int, product_ids: list[int], *, orders: int) -> None:
+    """`orders` paid orders from one seller, each with one item per product."""
+    with SessionLocal() as db:
+        address = Address(
+            user_id=buyer_id,
+            full_name="Test Buyer",
+            line1="1 Test St",
+            city="Testville",
+            postal_code="00000",
+        )
+        db.add(address)
+        db.flush()
+        for _ in range(orders):
+            items = [
+                OrderItem(
+                    product_id=pid,
+                    title="Product",
+                    unit_price_cents=100,
+                    quantity=1,
+                    line_total_cents=100,
+                )
+                for pid in product_ids
+            ]
+            db.add(
+                Order(
+                    buyer_id=buyer_id,
+                    seller_id=seller_id,
+                    shipping_address_id=address.id,
+                    status="PAID",
+                    subtotal_cents=100 * len(items),
+                    total_cents=100 * len(items),
+                    items=items,
+                )
+            )
+        db.commit()
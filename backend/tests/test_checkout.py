@@ -0,0 +1,91 @@
+"""Checkout against the local Stripe stub (bench.stripe_stub)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from factories import bearer
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.payment import Payment
+from app.routers.orders import CHECKOUT_URL_MARGIN
+from bench.stripe_stub import start_stub
+
+
+@pytest.fixture(scope="module")
+def stripe_stub() -> Iterator[Any]:
+    stub = start_stub()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "stripe_api_base", stub.base_url)
+        yield stub
+    stub.shutdown()
+
+
+def _pending_order(client: Any, uid: Callable[[str], str]) -> tuple[int, dict[str, str]]:
+    seller = bearer(uid("seller"))
+    assert client.post("/seller/profile", json={"store_name": "Stub"}, headers=seller).is_success
+    product = client.post(
+        "/seller/products",
+        json={"title": "Lamp", "price_cents": 1500, "stock_qty": 5},
+        headers=seller,
+    ).json()
+    buyer = bearer(uid("buyer"))
+    order = client.post(
+        "/orders",
+        json={
+            "items": [{"product_id": product["id"], "quantity": 1}],
+            "shipping_address": {
+                "full_name": "Test Buyer",
+                "line1": "1 Test St",
+                "city": "Testville",
+                "postal_code": "00000",
+            },
+        },
+        headers=buyer,
+    )
+    assert order.status_code == 200, order.text
+    return order.json()["id"], buyer
+
+
+def test_repeat_checkout_reuses_the_stored_url(
+    client: Any, stripe_stub: Any, uid: Callable[[str], str]
+) -> None:
+    order_id, buyer = _pending_order(client, uid)
+
+    first = client.post(f"/orders/{order_id}/checkout", headers=buyer)
+    assert first.status_code == 200, first.text
+    assert first.json()["checkout_url"].startswith(stripe_stub.base_url)
+    calls = stripe_stub.requests
+
+    again = client.post(f"/orders/{order_id}/checkout", headers=buyer)
+    assert again.status_code == 200, again.text
+    assert again.json() == first.json()
+    assert stripe_stub.requests == calls
+
+
+def test_new_session_near_expiry(
+    client: Any, stripe_stub: Any, uid: Callable[[str], str]
+) -> None:
+    order_id, buyer = _pending_order(client, uid)
+    first = client.post(f"/orders/{order_id}/checkout", headers=buyer).json()
+
+    # Inside the margin: the stored URL would expire before the buyer finishes paying.
+    with SessionLocal() as db:
+        db.execute(
+            update(Payment)
+            .where(Payment.order_id == order_id)
+            .values(checkout_expires_at=datetime.now(timezone.utc) + CHECKOUT_URL_MARGIN / 2)
+        )
+        db.commit()
+    calls = stripe_stub.requests
+
+    renewed = client.post(f"/orders/{order_id}/checkout", headers=buyer)
+    assert renewed.status_code == 200, renewed.text
+    assert renewed.json()["stripe_session_id"] != first["stripe_session_id"]
+    assert renewed.json()["stripe_session_id"] in stripe_stub.sessions
+    assert stripe_stub.requests == calls + 1
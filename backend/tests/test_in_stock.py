@@ -0,0 +1,51 @@
+"""`in_stock` on the product list agrees with `available_qty`."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from factories import bearer
+
+from app.core.db import SessionLocal
+from app.routers.products import _load_page
+
+
+def test_fully_held_product_is_not_in_stock(client: Any, uid: Callable[[str], str]) -> None:
+    seller = bearer(uid("seller"))
+    profile = client.post("/seller/profile", json={"store_name": "Held"}, headers=seller).json()
+    held, free = (
+        client.post(
+            "/seller/products",
+            json={"title": title, "price_cents": 900, "stock_qty": 2},
+            headers=seller,
+        ).json()["id"]
+        for title in ("Held", "Free")
+    )
+    order = client.post(
+        "/orders",
+        json={
+            "items": [{"product_id": held, "quantity": 2}],
+            "shipping_address": {
+                "full_name": "Test Buyer",
+                "line1": "1 Test St",
+                "city": "Testville",
+                "postal_code": "00000",
+            },
+        },
+        headers=bearer(uid("buyer")),
+    )
+    assert order.status_code == 200, order.text
+
+    with SessionLocal() as db:
+        page = _load_page(
+            db,
+            limit=20,
+            cursor=None,
+            sort="newest",
+            seller_id=profile["id"],
+            min_price_cents=None,
+            max_price_cents=None,
+            in_stock=True,
+        )
+    assert [(p["id"], p["available_qty"]) for p in page["items"]] == [(free, 2)]
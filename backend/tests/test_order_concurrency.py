@@ -0,0 +1,27 @@
+"""Parallel orders and payments for one product never oversell it."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.db import SessionLocal
+from app.models.product import Product
+from bench.order_concurrency import make_hot_product, order_and_pay
+
+STOCK = 5
+ATTEMPTS = 40
+WORKERS = 8
+
+
+def test_parallel_orders_do_not_oversell(migrated: None) -> None:
+    product_id, buyers = make_hot_product(STOCK, ATTEMPTS)
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        outcomes = list(pool.map(lambda b: order_and_pay(product_id, b), buyers))
+
+    with SessionLocal() as db:
+        final_stock = db.get(Product, product_id).stock_qty
+
+    assert outcomes.count("error") == 0
+    assert outcomes.count("paid") <= STOCK
+    assert final_stock >= 0
+    assert final_stock == STOCK - outcomes.count("paid")
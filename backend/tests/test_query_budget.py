@@ -0,0 +1,74 @@
+"""
+Statement budgets for the list reads. Each must take the same number of
+statements however many rows it returns, so a regression back to per-row
+queries (N+1) fails here.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from factories import make_orders, make_seller, make_user
+
+from app.core.auth import AuthenticatedUser
+from app.core.db import SessionLocal
+from app.core.query_stats import track_queries
+from app.routers.orders import _list_orders
+from app.routers.products import _load_page
+from app.routers.seller import list_my_products
+
+
+def _statements(read: Callable[..., Any], *args: Any, **kwargs: Any) -> int:
+    # A fresh session each time, so nothing is served from an identity map.
+    with SessionLocal() as db, track_queries() as stats:
+        read(db, *args, **kwargs)
+    return stats.statements
+
+
+def _page(db: Any, seller_id: int, sort: str, limit: int) -> dict[str, Any]:
+    return _load_page(
+        db,
+        limit=limit,
+        cursor=None,
+        sort=sort,
+        seller_id=seller_id,
+        min_price_cents=None,
+        max_price_cents=None,
+        in_stock=False,
+    )
+
+
+@pytest.mark.parametrize("sort", ["newest", "price_asc", "price_desc"])
+def test_product_list(uid: Callable[[str], str], sort: str) -> None:
+    _, small, _ = make_seller(uid("small"), products=2, images=1)
+    _, large, _ = make_seller(uid("large"), products=30, images=3)
+
+    # Products, their images, their stock holds.
+    assert _statements(_page, small, sort, 20) == 3
+    assert _statements(_page, large, sort, 20) == 3
+    assert _statements(_page, large, sort, 100) == 3
+
+
+def test_seller_product_list(uid: Callable[[str], str]) -> None:
+    counts = []
+    for name, products in (("small", 2), ("large", 30)):
+        user_id, _, _ = make_seller(uid(name), products=products, images=3)
+        user = AuthenticatedUser(id=user_id, firebase_uid=uid(name), email=None, display_name=None)
+        counts.append(_statements(lambda db: list_my_products(user=user, db=db)))
+
+    # Seller profile, products, their images, their stock holds.
+    assert counts == [4, 4]
+
+
+@pytest.mark.parametrize(("view", "budget"), [("full", 2), ("summary", 1)])
+def test_order_history(uid: Callable[[str], str], view: str, budget: int) -> None:
+    _, seller_id, product_ids = make_seller(uid("seller"), products=3, images=1)
+    few = make_user(uid("few"))
+    many = make_user(uid("many"))
+    make_orders(few, seller_id, product_ids[:1], orders=1)
+    make_orders(many, seller_id, product_ids, orders=25)
+
+    for buyer in (few, many):
+        assert _statements(_list_orders, buyer, limit=20, cursor=None, view=view) == budget